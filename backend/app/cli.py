@@ -0,0 +1,203 @@
+"""
+Command-line maintenance tasks
+
+Usage:
+    python -m app.cli init-db
+    python -m app.cli recompute-transcripts [--workers N] [--chunk-size N]
+    python -m app.cli import-roster FILE.csv [--chunk-size N]
+    python -m app.cli provision-users FILE.csv [--concurrency N] [--chunk-size N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.database import Base, SessionLocal, engine
+from app.models import Course, CourseResult, TermGpa
+
+settings = get_settings()
+
+
+def _chunks(items: list, size: int) -> List[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _init_worker():
+    # Forked workers must not share the parent's pooled connections
+    engine.dispose(close=False)
+
+
+def _recompute_courses(course_ids: List[int]) -> int:
+    from app.services.transcript import refresh_course_results
+
+    db = SessionLocal()
+    try:
+        return sum(
+            refresh_course_results(db, course_id, refresh_terms=False)
+            for course_id in course_ids
+        )
+    finally:
+        db.close()
+
+
+def _recompute_terms(student_ids: list) -> int:
+    from app.services.transcript import refresh_term_gpas
+
+    db = SessionLocal()
+    try:
+        refresh_term_gpas(db, student_ids)
+        return len(student_ids)
+    finally:
+        db.close()
+
+
+def init_db():
+    """
+    Create missing tables and the search indexes, for local databases
+    without migrations (the API no longer does this at startup)
+    """
+    from app.services.search import create_search_indexes
+
+    Base.metadata.create_all(bind=engine)
+    create_search_indexes(engine)
+    print(f"Schema ready: {len(Base.metadata.tables)} tables")
+
+
+def recompute_transcripts(workers: int, chunk_size: int):
+    """
+    Rebuild course_results for every course, then term_gpas for every student,
+    each phase fanned out over a process pool in chunks
+    """
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        course_ids = list(db.scalars(select(Course.id).order_by(Course.id)))
+    finally:
+        db.close()
+
+    course_chunk = max(1, chunk_size // 50)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        results = sum(pool.map(_recompute_courses, _chunks(course_ids, course_chunk)))
+        print(f"Course results: {results} rows across {len(course_ids)} courses")
+
+        db = SessionLocal()
+        try:
+            # Students left without any result still need their stale term rows cleared
+            student_ids = list(db.scalars(
+                select(CourseResult.student_id).union(select(TermGpa.student_id))
+            ))
+        finally:
+            db.close()
+
+        students = sum(pool.map(_recompute_terms, _chunks(student_ids, chunk_size)))
+        print(f"Term GPAs: {students} students")
+
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+async def _file_chunks(path: str, size: int = 1 << 16):
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+def import_roster_file(path: str, chunk_size: int):
+    """Stream a roster CSV into course enrollments"""
+    from app.services.csv_import import iter_csv_records
+    from app.services.enrollment import import_roster
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        result = asyncio.run(import_roster(db, iter_csv_records(_file_chunks(path)), chunk_size))
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - start
+    rows = result["enrolled"] + result["skipped"] + result["invalid"]
+    print(
+        f"Enrolled {result['enrolled']}, skipped {result['skipped']}, invalid {result['invalid']} "
+        f"({rows} rows in {elapsed:.1f}s, {rows / elapsed if elapsed else 0:.0f} rows/s)"
+    )
+    for error in result["errors"]:
+        print(f"  row {error['row']}: {error['detail']}")
+
+
+def provision_users_file(path: str, concurrency: int, chunk_size: int):
+    """Create accounts from a user CSV through the auth provider's admin API"""
+    from app.services.csv_import import iter_csv_records
+    from app.services.provisioning import provision_users
+    from app.services.supabase import close_http_client
+
+    async def run() -> dict:
+        try:
+            return await provision_users(
+                db, iter_csv_records(_file_chunks(path)), concurrency=concurrency, chunk_size=chunk_size
+            )
+        finally:
+            await close_http_client()
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        result = asyncio.run(run())
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Created {result['created']}, existing {result['existing']}, invalid {result['invalid']}, "
+        f"failed {result['failed']} ({len(result['rows'])} rows in {elapsed:.1f}s)"
+    )
+    for row in result["rows"]:
+        if row["status"] in ("invalid", "failed"):
+            print(f"  row {row['row']} {row['email'] or ''}: {row['status']}: {row['detail']}")
+    if result["failed"]:
+        print("Re-run the same file to retry failed rows")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("init-db", help="Create missing tables and search indexes (local development)")
+
+    recompute = commands.add_parser(
+        "recompute-transcripts",
+        help="Rebuild the course result and term GPA rollups"
+    )
+    recompute.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    recompute.add_argument("--chunk-size", type=int, default=1000, help="Students per chunk")
+
+    roster = commands.add_parser("import-roster", help="Enroll students from a roster CSV")
+    roster.add_argument("path")
+    roster.add_argument("--chunk-size", type=int, default=5000, help="Rows per transaction")
+
+    provision = commands.add_parser("provision-users", help="Create accounts from a user CSV")
+    provision.add_argument("path")
+    provision.add_argument(
+        "--concurrency", type=int, default=settings.PROVISION_CONCURRENCY, help="Auth provider calls in flight"
+    )
+    provision.add_argument("--chunk-size", type=int, default=500, help="Rows per transaction")
+
+    args = parser.parse_args(argv)
+    if args.command == "init-db":
+        init_db()
+    elif args.command == "recompute-transcripts":
+        recompute_transcripts(args.workers, args.chunk_size)
+    elif args.command == "import-roster":
+        import_roster_file(args.path, args.chunk_size)
+    elif args.command == "provision-users":
+        provision_users_file(args.path, args.concurrency, args.chunk_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -28,6 +28,14 @@ class Settings(BaseSettings):
     SUPABASE_ANON_KEY: str = ""
     SUPABASE_SERVICE_KEY: str = ""
     SUPABASE_JWT_SECRET: str = ""
+    SUPABASE_MOCK: bool = False  # in-process mock clients (also used while SUPABASE_URL is empty)
+    SUPABASE_TIMEOUT_SECONDS: float = 10.0
+    SUPABASE_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    SUPABASE_POOL_SIZE: int = 20
+    SUPABASE_MAX_RETRIES: int = 2
+    SUPABASE_BREAKER_FAILURE_THRESHOLD: int = 5
+    SUPABASE_BREAKER_RESET_SECONDS: float = 30.0
+    PROVISION_CONCURRENCY: int = 10
     
     # CORS
     BACKEND_CORS_ORIGINS: Union[List[str], str] = []
@@ -44,6 +52,55 @@ class Settings(BaseSettings):
     STORAGE_BUCKET: str = "unimanager-files"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     
+    # Grade analytics
+    GRADE_STATS_CACHE_SECONDS: int = 300
+    
+    # Course catalog cache
+    CATALOG_CACHE_SECONDS: int = 60
+    CATALOG_CACHE_MAX_PAGES: int = 1024
+    CATALOG_CACHE_CONTROL: str = "public, no-cache"
+    
+    # Conditional GET (per-user resources answered with 304 when unchanged)
+    CONDITIONAL_CACHE_CONTROL: str = "private, no-cache"
+    
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller complete bodies are sent as is
+    
+    # Scheduler
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_POLL_SECONDS: float = 30.0
+    SCHEDULER_LEASE_SECONDS: float = 90.0
+    
+    # Omnibox search index
+    OMNIBOX_REBUILD_TIMEOUT_SECONDS: float = 10.0
+    OMNIBOX_SYNC_SECONDS: float = 5.0
+    
+    # Metrics (GET /metrics; set PROMETHEUS_MULTIPROC_DIR to aggregate workers)
+    METRICS_ENABLED: bool = True
+    METRICS_LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+    
+    # SQL instrumentation (per-request statement counts and timings)
+    SQL_STATS_ENABLED: bool = True
+    SQL_LOG_QUERY_COUNT: int = 50  # log requests running more statements than this
+    SQL_LOG_DB_MS: float = 500.0  # or spending longer than this in the database
+    SQL_REPEAT_LIMIT: Optional[int] = None  # test mode: fail requests repeating one statement more often
+    
+    # Access log (JSON lines on stdout; errors and slow requests are always logged)
+    ACCESS_LOG_ENABLED: bool = True
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0  # fraction of successful requests logged
+    ACCESS_LOG_SLOW_MS: float = 1000.0
+    
+    # Tracing (spans for auth, SQL, provider calls and notification fan-out)
+    TRACING_ENABLED: bool = True
+    TRACING_SAMPLE_RATE: float = 0.01  # fraction of requests traced (an incoming traceparent decides for itself)
+    TRACING_EXPORTER: str = "memory"  # memory, file or none
+    TRACING_FILE: str = "traces.jsonl"  # JSON lines, one trace each (file exporter)
+    TRACING_MEMORY_TRACES: int = 200  # recent traces kept by the memory exporter
+    TRACING_MAX_SPANS: int = 500  # per trace; further spans are counted, not kept
+    
+    # Startup (the schema is managed by Alembic / schema.sql, not at boot)
+    DB_POOL_PREWARM: int = 0  # connections opened at startup; 0 leaves the pool cold
+    
     # Security
     ALGORITHM: str = "HS256"
     
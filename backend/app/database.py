@@ -37,6 +37,29 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def prewarm_pool(connections: int):
+    """Open pooled connections ahead of the first requests (blocking; run in a thread)"""
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+def dialect_insert(db, model):
+    """
+    INSERT construct for the session's dialect, exposing
+    on_conflict_do_nothing / on_conflict_do_update on PostgreSQL and SQLite
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(model)
+
+
 def get_db():
     """Get database session"""
     db = SessionLocal()
@@ -5,14 +5,15 @@ Authentication dependencies and utilities
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from jose import JWTError, jwt
 from typing import Optional
 from uuid import UUID
 import logging
 
 from app.config import get_settings
 from app.database import get_db
-from app.services.supabase import get_supabase_client
+from app.services.supabase import get_async_supabase_client
+from app.services.resilience import ProviderUnavailable
+from app.services.tracing import traced
 from app.models import User
 
 settings = get_settings()
@@ -20,6 +21,7 @@ security = HTTPBearer()
 logger = logging.getLogger(__name__)
 
 
+@traced("auth.get_current_user")
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -36,26 +38,26 @@ async def get_current_user(
     try:
         # Verify token with Supabase
         token = credentials.credentials
-        supabase = get_supabase_client()
+        supabase = get_async_supabase_client()
         
         # Get user from Supabase Auth
-        user_response = supabase.auth.get_user(token)
+        supabase_user = await supabase.get_user(token)
         
-        if not user_response or not user_response.user:
+        if not supabase_user or not supabase_user.get("id"):
             raise credentials_exception
         
-        supabase_user = user_response.user
+        user_metadata = supabase_user.get("user_metadata") or {}
         
         # Get or create user in our database
-        db_user = db.query(User).filter(User.id == UUID(supabase_user.id)).first()
+        db_user = db.query(User).filter(User.id == UUID(supabase_user["id"])).first()
         
         if not db_user:
             # Create user record if doesn't exist
             db_user = User(
-                id=UUID(supabase_user.id),
-                email=supabase_user.email,
-                name=supabase_user.user_metadata.get("name", supabase_user.email),
-                role=supabase_user.user_metadata.get("role", "student"),
+                id=UUID(supabase_user["id"]),
+                email=supabase_user["email"],
+                name=user_metadata.get("name", supabase_user["email"]),
+                role=user_metadata.get("role", "student"),
                 is_active=True
             )
             db.add(db_user)
@@ -70,6 +72,13 @@ async def get_current_user(
         
         return db_user
         
+    except ProviderUnavailable as e:
+        logger.warning(f"Auth provider unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service temporarily unavailable",
+            headers={"Retry-After": str(int(e.retry_after) + 1)},
+        )
     except Exception as e:
         logger.error(f"Auth error: {str(e)}")
         raise credentials_exception
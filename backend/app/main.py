@@ -2,32 +2,85 @@
 UniManager Pro - FastAPI Main Application
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import logging
 import time
 
 from app.config import get_settings
-from app.database import engine, Base
+from app.database import engine, prewarm_pool
 from app.routers import (
     auth, users, courses, assignments, attendance,
-    announcements, notifications, dashboard
+    announcements, notifications, dashboard, search
 )
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from app.services.access_log import AccessLogMiddleware, setup_logging
+from app.services.compression import CompressionMiddleware
+from app.services.metrics import (
+    CONTENT_TYPE_LATEST, MetricsMiddleware, install_pool_metrics, loop_lag_monitor,
+    mark_worker_stopped, render_metrics
 )
+from app.services.query_stats import QueryStatsMiddleware, install_query_stats
+from app.services.resilience import provider_snapshot
+from app.services.scheduler import scheduler
+from app.services.search import init_search
+from app.services.serialization import DefaultJSONResponse
+from app.services.tracing import InMemoryExporter, TracingMiddleware, get_exporter, install_tracing
+from app.services.omnibox import omnibox
+from app.services.supabase import close_http_client
+
+# Configure logging (records are written by a background thread)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Get settings
 settings = get_settings()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Instrument the engine (no connection is opened here; the schema comes from
+# Alembic / schema.sql, or `python -m app.cli init-db` for local databases)
+if settings.SQL_STATS_ENABLED:
+    install_query_stats(engine)
+if settings.METRICS_ENABLED:
+    install_pool_metrics(engine)
+if settings.TRACING_ENABLED:
+    install_tracing(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup and shutdown
+
+    No DDL runs here. Nothing fails boot when the database is unreachable:
+    search falls back to ILIKE, the scheduler registers its jobs once it
+    can connect and the omnibox index is rebuilt on the next search.
+    """
+    await asyncio.to_thread(init_search, engine)
+    if settings.DB_POOL_PREWARM:
+        try:
+            await asyncio.to_thread(prewarm_pool, settings.DB_POOL_PREWARM)
+        except Exception as e:
+            logger.warning(f"Connection pool pre-warm failed: {e}")
+    # One leader across workers runs jobs
+    if settings.SCHEDULER_ENABLED:
+        await scheduler.start()
+    # Startup waits at most OMNIBOX_REBUILD_TIMEOUT_SECONDS for the index
+    await omnibox.start()
+    if settings.METRICS_ENABLED:
+        await loop_lag_monitor.start()
+
+    yield
+
+    # Stop sampling and drop this worker's live gauges
+    await loop_lag_monitor.stop()
+    mark_worker_stopped()
+    # Hand over scheduler leadership, then release pooled provider connections
+    await scheduler.stop()
+    await close_http_client()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -35,7 +88,9 @@ app = FastAPI(
     description="Backend API for UniManager Pro university management system",
     version=settings.VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=DefaultJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -47,24 +102,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large and streamed responses (Accept-Encoding: br, zstd, gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    
-    # Log request
-    logger.info(f"Request: {request.method} {request.url.path}")
-    
-    response = await call_next(request)
-    
-    # Log response
-    duration = time.time() - start_time
-    logger.info(
-        f"Response: {response.status_code} - Duration: {duration:.3f}s"
-    )
-    
-    return response
+# Per-request SQL counts and timings (Server-Timing header, slow request log)
+if settings.SQL_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Request counts, latency histograms and in-flight requests for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Sampled request traces (auth, SQL, provider calls, notification fan-out)
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
+# Request IDs and the sampled JSON access log (outermost, so it sees the final status)
+if settings.ACCESS_LOG_ENABLED:
+    app.add_middleware(AccessLogMiddleware)
 
 
 # Global exception handler
@@ -86,6 +141,7 @@ app.include_router(attendance.router, prefix=settings.API_V1_PREFIX)
 app.include_router(announcements.router, prefix=settings.API_V1_PREFIX)
 app.include_router(notifications.router, prefix=settings.API_V1_PREFIX)
 app.include_router(dashboard.router, prefix=settings.API_V1_PREFIX)
+app.include_router(search.router, prefix=settings.API_V1_PREFIX)
 
 
 @app.get("/")
@@ -108,6 +164,36 @@ async def health_check():
     }
 
 
+@app.get("/health/providers")
+async def provider_health():
+    """Circuit breaker state and call latency for external providers"""
+    return provider_snapshot()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics (aggregated over workers in multiprocess mode)"""
+    body = render_metrics()
+    if body is None:
+        raise HTTPException(status_code=503, detail="prometheus_client is not installed")
+    return Response(content=body, media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/health/traces", include_in_schema=False)
+async def recent_traces(limit: int = 20):
+    """Most recent sampled traces (DEBUG only, memory exporter)"""
+    exporter = get_exporter()
+    if not settings.DEBUG or not isinstance(exporter, InMemoryExporter):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return exporter.recent(limit)
+
+
+@app.get("/health/scheduler")
+async def scheduler_health():
+    """Scheduler leadership and next job run times for this worker"""
+    return scheduler.snapshot()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
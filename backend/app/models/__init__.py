@@ -2,7 +2,10 @@
 Database Models
 """
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text, Date, Numeric, JSON
+from sqlalchemy import (
+    Column, String, Integer, Boolean, DateTime, ForeignKey, Text, Date, Numeric, JSON,
+    UniqueConstraint
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -29,7 +32,7 @@ class User(Base):
     # Relationships
     taught_courses = relationship("Course", back_populates="faculty", foreign_keys="Course.faculty_id")
     enrollments = relationship("CourseEnrollment", back_populates="student")
-    submissions = relationship("Submission", back_populates="student")
+    submissions = relationship("Submission", back_populates="student", foreign_keys="Submission.student_id")
     notifications = relationship("Notification", back_populates="user")
 
 
@@ -65,6 +68,8 @@ class Course(Base):
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True)
     is_active = Column(Boolean, default=True)
+    capacity = Column(Integer, nullable=True)  # None = unlimited
+    seats_taken = Column(Integer, nullable=False, default=0, server_default="0")  # non-dropped enrollments
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -79,6 +84,7 @@ class Course(Base):
 class CourseEnrollment(Base):
     """Course enrollment model"""
     __tablename__ = "course_enrollments"
+    __table_args__ = (UniqueConstraint("course_id", "student_id"),)
     
     id = Column(Integer, primary_key=True, index=True)
     course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
@@ -91,6 +97,17 @@ class CourseEnrollment(Base):
     student = relationship("User", back_populates="enrollments")
 
 
+class CourseWaitlist(Base):
+    """Waitlist entry for a full course, promoted in id (arrival) order"""
+    __tablename__ = "course_waitlists"
+    __table_args__ = (UniqueConstraint("course_id", "student_id"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class Assignment(Base):
     """Assignment model"""
     __tablename__ = "assignments"
@@ -102,11 +119,13 @@ class Assignment(Base):
     instructions = Column(Text, nullable=True)
     due_date = Column(DateTime(timezone=True), nullable=True)
     max_points = Column(Integer, default=100)
+    weight = Column(Numeric(5, 2), default=1)  # relative weight in the course total
     file_url = Column(Text, nullable=True)
     allow_late_submission = Column(Boolean, default=False)
     late_penalty_percent = Column(Integer, default=0)
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     is_published = Column(Boolean, default=False)
+    publish_at = Column(DateTime(timezone=True), nullable=True)  # published by the scheduler
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -129,13 +148,41 @@ class Submission(Base):
     submitted_at = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(String(50), default="pending")  # pending, submitted, graded, late
     grade = Column(Integer, nullable=True)
+    days_late = Column(Integer, default=0)
+    effective_grade = Column(Integer, nullable=True)  # grade after the late penalty
     feedback = Column(Text, nullable=True)
     graded_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     graded_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationships
     assignment = relationship("Assignment", back_populates="submissions")
-    student = relationship("User", back_populates="submissions")
+    student = relationship("User", back_populates="submissions", foreign_keys=[student_id])
+
+
+class AssignmentExtension(Base):
+    """Per-student due date override for an assignment"""
+    __tablename__ = "assignment_extensions"
+    __table_args__ = (UniqueConstraint("assignment_id", "student_id"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    assignment_id = Column(Integer, ForeignKey("assignments.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    due_date = Column(DateTime(timezone=True), nullable=False)
+    reason = Column(Text, nullable=True)
+    granted_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class AssignmentReminder(Base):
+    """Due date reminder already sent to a student (one per lead time)"""
+    __tablename__ = "assignment_reminders"
+    __table_args__ = (UniqueConstraint("assignment_id", "student_id", "lead_hours"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    assignment_id = Column(Integer, ForeignKey("assignments.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    lead_hours = Column(Integer, nullable=False)
+    sent_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class Attendance(Base):
@@ -214,6 +261,38 @@ class Grade(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
+class CourseResult(Base):
+    """Rolled-up final grade of a student in a course (maintained on grade writes)"""
+    __tablename__ = "course_results"
+    __table_args__ = (UniqueConstraint("student_id", "course_id"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
+    term = Column(String(100), nullable=False)
+    year = Column(Integer, nullable=True)
+    credits = Column(Integer, nullable=False)
+    percentage = Column(Numeric(5, 2), nullable=False)
+    letter_grade = Column(String(5), nullable=False)
+    grade_points = Column(Numeric(3, 2), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class TermGpa(Base):
+    """Per-student term GPA rollup (cumulative GPA is the sum over terms)"""
+    __tablename__ = "term_gpas"
+    __table_args__ = (UniqueConstraint("student_id", "term"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    term = Column(String(100), nullable=False)
+    year = Column(Integer, nullable=True)
+    credits = Column(Integer, nullable=False)
+    quality_points = Column(Numeric(8, 2), nullable=False)
+    gpa = Column(Numeric(3, 2), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class SupportTicket(Base):
     """Support ticket model"""
     __tablename__ = "support_tickets"
@@ -230,3 +309,25 @@ class SupportTicket(Base):
     resolved_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ScheduledJob(Base):
+    """Persisted schedule of a recurring background job"""
+    __tablename__ = "scheduled_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False)
+    interval_seconds = Column(Integer, nullable=False)
+    next_run_at = Column(DateTime(timezone=True), nullable=False)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    enabled = Column(Boolean, default=True)
+
+
+class SchedulerLease(Base):
+    """Leader lease: only the holder of an unexpired lease runs jobs"""
+    __tablename__ = "scheduler_leases"
+    
+    name = Column(String(100), primary_key=True)
+    holder = Column(String(255), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,2 +1,2 @@
 # Routers package
-from app.routers import auth, users, courses, assignments, attendance, announcements, notifications, dashboard
+from app.routers import auth, users, courses, assignments, attendance, announcements, notifications, dashboard, search
@@ -4,7 +4,8 @@ Handles announcements and notifications
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Query as ORMQuery, Session
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, timedelta
@@ -12,33 +13,60 @@ from datetime import datetime, timedelta
 from app.database import get_db
 from app.dependencies import get_current_user, require_faculty, require_admin
 from app.schemas import (
-    AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse,
+    AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse, AnnouncementResponseList,
     MessageResponse
 )
 from app.models import Announcement, Notification, User
+from app.services.conditional import conditional_get
 from app.services.notification import create_notification
+from app.services.omnibox import omnibox
+from app.services.read_models import ANNOUNCEMENT_ROWS
+from app.services.serialization import list_response
+from app.services.tracing import span
 
 router = APIRouter(prefix="/announcements", tags=["Announcements"])
 
 
+def _visible_announcements(db: Session, user: User) -> ORMQuery:
+    """Unexpired announcements targeted at the user's role"""
+    query = db.query(Announcement).filter(
+        (Announcement.expires_at == None) | (Announcement.expires_at > datetime.now())
+    )
+    
+    # Filter by user role
+    return query.filter(Announcement.target_roles.contains([user.role]))
+
+
+def _announcements_version(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> tuple:
+    """
+    Count and latest update of the announcements the user can see
+    
+    An expiry drops the count and any edit moves the newest updated_at,
+    so either changes the version.
+    """
+    count, updated_at = _visible_announcements(db, current_user).with_entities(
+        func.count(Announcement.id), func.max(Announcement.updated_at)
+    ).one()
+    return current_user.role, count, updated_at
+
+
 @router.get("/", response_model=List[AnnouncementResponse])
 async def list_announcements(
     pinned_only: bool = Query(False),
     priority: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    validators: dict = Depends(conditional_get(_announcements_version)),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    List announcements for current user
+    List announcements for current user (304 while unchanged, see ETag)
     """
-    query = db.query(Announcement).filter(
-        (Announcement.expires_at == None) | (Announcement.expires_at > datetime.now())
-    )
-    
-    # Filter by user role
-    query = query.filter(Announcement.target_roles.contains([current_user.role]))
+    query = _visible_announcements(db, current_user)
     
     if pinned_only:
         query = query.filter(Announcement.is_pinned == True)
@@ -46,12 +74,12 @@ async def list_announcements(
     if priority:
         query = query.filter(Announcement.priority == priority)
     
-    announcements = query.order_by(
+    announcements = ANNOUNCEMENT_ROWS.fetch(query.order_by(
         Announcement.is_pinned.desc(),
         Announcement.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit))
     
-    return announcements
+    return list_response(AnnouncementResponseList, announcements, headers=validators)
 
 
 @router.post("/", response_model=AnnouncementResponse, status_code=status.HTTP_201_CREATED)
@@ -71,6 +99,7 @@ async def create_announcement(
     db.add(announcement)
     db.commit()
     db.refresh(announcement)
+    omnibox.index_announcement(announcement)
     
     # Create notifications for target users
     # Get all users matching target roles
@@ -79,18 +108,19 @@ async def create_announcement(
         User.is_active == True
     ).all()
     
-    for user in target_users:
-        if str(user.id) != str(current_user.id):  # Don't notify self
-            create_notification(
-                db=db,
-                user_id=user.id,
-                title=f"New Announcement: {announcement_data.title}",
-                message=announcement_data.content[:100] + "..." if len(announcement_data.content) > 100 else announcement_data.content,
-                type="announcement",
-                reference_type="announcement",
-                reference_id=announcement.id,
-                action_url=f"/announcements/{announcement.id}"
-            )
+    with span("notification.fan_out", recipients=len(target_users)):
+        for user in target_users:
+            if str(user.id) != str(current_user.id):  # Don't notify self
+                create_notification(
+                    db=db,
+                    user_id=user.id,
+                    title=f"New Announcement: {announcement_data.title}",
+                    message=announcement_data.content[:100] + "..." if len(announcement_data.content) > 100 else announcement_data.content,
+                    type="announcement",
+                    reference_type="announcement",
+                    reference_id=announcement.id,
+                    action_url=f"/announcements/{announcement.id}"
+                )
     
     return announcement
 
@@ -152,6 +182,7 @@ async def update_announcement(
     
     db.commit()
     db.refresh(announcement)
+    omnibox.index_announcement(announcement)
     
     return announcement
 
@@ -181,5 +212,6 @@ async def delete_announcement(
     
     db.delete(announcement)
     db.commit()
+    omnibox.remove("announcement", announcement_id)
     
     return None
@@ -3,38 +3,50 @@ Assignments Router
 Handles assignment management and submissions
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Request, UploadFile, File
+)
+from pydantic import ValidationError
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Query as ORMQuery, Session, joinedload
 from typing import List, Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timezone
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.dependencies import get_current_user, require_faculty
 from app.schemas import (
     AssignmentCreate, AssignmentUpdate, AssignmentResponse, AssignmentWithCourse,
+    AssignmentWithSubmissionStatus, AssignmentWithSubmissionStatusList,
+    AssignmentExtensionCreate, AssignmentExtensionResponse,
     SubmissionCreate, SubmissionUpdate, SubmissionResponse, SubmissionWithDetails,
-    MessageResponse
+    SubmissionWithDetailsList,
+    BulkGradeItem, BulkGradeError, BulkGradeResult, MessageResponse
 )
-from app.models import Assignment, Submission, Course, CourseEnrollment, User
+from app.models import Assignment, AssignmentExtension, Submission, Course, CourseEnrollment, User
 from app.services.storage import upload_file_to_storage
+from app.services.conditional import conditional_get
+from app.services.csv_import import iter_csv_records
+from app.services.export import export_response
+from app.services.serialization import list_response, schema_columns
+from app.services.grading import apply_bulk_grades
+from app.services.grade_stats import assignment_statistics, invalidate_grade_statistics
+from app.services.lateness import apply_late_penalties, effective_due_date
+from app.services.transcript import refresh_course_results
+from app.services.notification import notify_grades_posted
+from app.services.omnibox import omnibox
 
 router = APIRouter(prefix="/assignments", tags=["Assignments"])
 
 
-@router.get("/", response_model=List[AssignmentWithCourse])
-async def list_assignments(
+def _visible_assignments(
     course_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None, description="Filter by status: upcoming, overdue, all"),
     search: Optional[str] = Query(None),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
-):
-    """
-    List assignments
-    """
+) -> ORMQuery:
+    """Published assignments the user may see, with the list filters applied"""
     query = db.query(Assignment).filter(Assignment.is_published == True)
     
     # Apply filters
@@ -51,27 +63,105 @@ async def list_assignments(
     
     # Students only see assignments for enrolled courses
     if current_user.role == "student":
-        enrolled_course_ids = [
-            enrollment.course_id 
-            for enrollment in db.query(CourseEnrollment).filter(
+        query = query.filter(
+            db.query(CourseEnrollment).filter(
+                CourseEnrollment.course_id == Assignment.course_id,
                 CourseEnrollment.student_id == current_user.id
-            ).all()
-        ]
-        query = query.filter(Assignment.course_id.in_(enrolled_course_ids))
+            ).exists()
+        )
     
     # Faculty only see their course assignments
     elif current_user.role == "faculty":
-        faculty_course_ids = [
-            course.id 
-            for course in db.query(Course).filter(
-                Course.faculty_id == current_user.id
-            ).all()
-        ]
-        query = query.filter(Assignment.course_id.in_(faculty_course_ids))
+        query = query.filter(
+            Assignment.course_id.in_(
+                db.query(Course.id).filter(Course.faculty_id == current_user.id)
+            )
+        )
+    
+    return query
+
+
+def _assignments_version(
+    query: ORMQuery = Depends(_visible_assignments),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> tuple:
+    """
+    Count and latest update of the listed assignments and their courses
+    
+    Students also get their own submissions' count, latest submission and
+    grading times and grade totals, since each item carries that status.
+    The visible set depends on the caller, so the version starts with
+    their id.
+    """
+    version = (current_user.id,) + tuple(
+        query.join(Course, Course.id == Assignment.course_id).with_entities(
+            func.count(Assignment.id), func.max(Assignment.updated_at), func.max(Course.updated_at)
+        ).one()
+    )
+    if current_user.role == "student":
+        version += tuple(
+            db.query(
+                func.count(Submission.id),
+                func.max(Submission.submitted_at),
+                func.max(Submission.graded_at),
+                func.sum(Submission.grade),
+                func.sum(Submission.effective_grade)
+            ).filter(Submission.student_id == current_user.id).one()
+        )
+    return version
+
+
+@router.get("/", response_model=List[AssignmentWithSubmissionStatus])
+async def list_assignments(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    query: ORMQuery = Depends(_visible_assignments),
+    validators: dict = Depends(conditional_get(_assignments_version)),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List assignments (304 while unchanged, see ETag)
     
-    assignments = query.order_by(Assignment.due_date).offset(skip).limit(limit).all()
+    For students each assignment carries their own submission status,
+    grade and submitted_at, so no per-assignment follow-up is needed.
+    """
+    is_student = current_user.role == "student"
+    
+    if is_student:
+        # LEFT JOIN the caller's submission so unsubmitted assignments still appear
+        query = query.outerjoin(
+            Submission,
+            and_(
+                Submission.assignment_id == Assignment.id,
+                Submission.student_id == current_user.id
+            )
+        ).add_columns(
+            Submission.id,
+            Submission.status,
+            Submission.grade,
+            Submission.effective_grade,
+            Submission.submitted_at
+        )
     
-    return assignments
+    rows = query.options(joinedload(Assignment.course)).order_by(
+        Assignment.due_date
+    ).offset(skip).limit(limit).all()
+    
+    if not is_student:
+        return list_response(AssignmentWithSubmissionStatusList, rows, headers=validators)
+    
+    result = []
+    for assignment, submission_id, submission_status, grade, effective_grade, submitted_at in rows:
+        item = AssignmentWithSubmissionStatus.model_validate(assignment)
+        item.submission_id = submission_id
+        item.submission_status = submission_status
+        item.grade = grade
+        item.effective_grade = effective_grade
+        item.submitted_at = submitted_at
+        result.append(item)
+    
+    return list_response(AssignmentWithSubmissionStatusList, result, headers=validators)
 
 
 @router.post("/", response_model=AssignmentResponse, status_code=status.HTTP_201_CREATED)
@@ -106,6 +196,7 @@ async def create_assignment(
     db.add(new_assignment)
     db.commit()
     db.refresh(new_assignment)
+    omnibox.index_assignment(new_assignment)
     
     return new_assignment
 
@@ -169,11 +260,23 @@ async def update_assignment(
             detail="You can only update assignments for courses you teach"
         )
     
-    for field, value in assignment_update.dict(exclude_unset=True).items():
+    changes = assignment_update.dict(exclude_unset=True)
+    for field, value in changes.items():
         setattr(assignment, field, value)
     
     db.commit()
     db.refresh(assignment)
+    omnibox.index_assignment(assignment)
+    
+    # Due date and penalty changes re-price every submission
+    lateness_changed = "due_date" in changes or "late_penalty_percent" in changes
+    if lateness_changed:
+        apply_late_penalties(db, assignment)
+    
+    # Weight, scale and effective grades feed every student's final course grade
+    if lateness_changed or "weight" in changes or "max_points" in changes:
+        invalidate_grade_statistics(assignment.id, assignment.course_id)
+        refresh_course_results(db, assignment.course_id)
     
     return assignment
 
@@ -205,6 +308,10 @@ async def delete_assignment(
     
     db.delete(assignment)
     db.commit()
+    omnibox.remove("assignment", assignment_id)
+    
+    invalidate_grade_statistics(assignment_id, course.id)
+    refresh_course_results(db, course.id)
     
     return None
 
@@ -214,11 +321,15 @@ async def delete_assignment(
 @router.get("/{assignment_id}/submissions", response_model=List[SubmissionWithDetails])
 async def get_submissions(
     assignment_id: int,
+    export_format: str = Query("json", alias="format", pattern="^(json|ndjson|csv)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_faculty)
 ):
     """
     Get all submissions for an assignment (faculty only)
+    
+    `format=ndjson` and `format=csv` stream flat rows (with the student's
+    name and email) instead of nested objects.
     """
     assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
     
@@ -236,11 +347,28 @@ async def get_submissions(
             detail="Access denied"
         )
     
-    submissions = db.query(Submission).filter(
+    if export_format != "json":
+        statement = (
+            select(
+                *schema_columns(Submission, SubmissionResponse),
+                User.name.label("student_name"),
+                User.email.label("student_email")
+            )
+            .join(User, User.id == Submission.student_id)
+            .where(Submission.assignment_id == assignment_id)
+            .order_by(Submission.submitted_at)
+        )
+        return export_response(statement, export_format, f"assignment-{assignment_id}-submissions")
+    
+    # Nested assignment and student are loaded in the same query, not per row
+    submissions = db.query(Submission).options(
+        joinedload(Submission.assignment),
+        joinedload(Submission.student)
+    ).filter(
         Submission.assignment_id == assignment_id
     ).all()
     
-    return submissions
+    return list_response(SubmissionWithDetailsList, submissions)
 
 
 @router.get("/{assignment_id}/my-submission", response_model=Optional[SubmissionResponse])
@@ -318,10 +446,18 @@ async def submit_assignment(
         file_name = upload_result["file_name"]
         file_size = upload_result["file_size"]
     
-    # Determine if late
-    status = "submitted"
-    if assignment.due_date and datetime.now() > assignment.due_date:
-        status = "late"
+    # Determine if late against the student's (possibly extended) due date
+    now = datetime.now(timezone.utc)
+    due_date = effective_due_date(db, assignment, current_user.id)
+    is_late = due_date is not None and now > due_date
+    
+    if is_late and not assignment.allow_late_submission:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The due date has passed and late submissions are not accepted"
+        )
+    
+    submission_status = "late" if is_late else "submitted"
     
     if existing:
         # Update existing submission
@@ -330,9 +466,10 @@ async def submit_assignment(
             existing.file_url = file_url
             existing.file_name = file_name
             existing.file_size = file_size
-        existing.submitted_at = datetime.now()
-        existing.status = status
+        existing.submitted_at = now
+        existing.status = submission_status
         db.commit()
+        apply_late_penalties(db, assignment, [current_user.id])
         db.refresh(existing)
         return existing
     else:
@@ -344,11 +481,13 @@ async def submit_assignment(
             file_name=file_name,
             file_size=file_size,
             comments=comments,
-            status=status
+            submitted_at=now,
+            status=submission_status
         )
         
         db.add(submission)
         db.commit()
+        apply_late_penalties(db, assignment, [current_user.id])
         db.refresh(submission)
         
         return submission
@@ -402,9 +541,214 @@ async def grade_submission(
         submission.status = grade_data.status
     
     submission.graded_by = current_user.id
-    submission.graded_at = datetime.now()
+    submission.graded_at = datetime.now(timezone.utc)
     
     db.commit()
+    apply_late_penalties(db, assignment, [submission.student_id])
     db.refresh(submission)
+    invalidate_grade_statistics(assignment.id, assignment.course_id)
+    refresh_course_results(db, assignment.course_id, [submission.student_id])
     
     return submission
+
+
+def _post_grade_notifications(assignment_title: str, max_points: int, graded: list):
+    """Background task: the request session is closed by the time this runs"""
+    db = SessionLocal()
+    try:
+        notify_grades_posted(db, assignment_title, max_points, graded)
+    finally:
+        db.close()
+
+
+def _get_managed_assignment(db: Session, assignment_id: int, current_user: User) -> Assignment:
+    """Load an assignment the caller may manage (404 / 403 otherwise)"""
+    row = db.query(Assignment, Course.faculty_id).join(
+        Course, Course.id == Assignment.course_id
+    ).filter(Assignment.id == assignment_id).first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Assignment not found"
+        )
+    
+    assignment, faculty_id = row
+    if current_user.role == "faculty" and str(faculty_id) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return assignment
+
+
+@router.post("/{assignment_id}/grades/bulk", response_model=BulkGradeResult)
+async def bulk_grade_submissions(
+    assignment_id: int,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    notify: bool = Query(False, description="Notify students that their grade was posted"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_faculty)
+):
+    """
+    Grade many submissions at once (faculty only)
+    
+    The body is either a JSON array or a CSV file (Content-Type: text/csv)
+    with the columns submission_id | student_id | student_email, grade and
+    feedback. Invalid rows are reported in `errors` and do not abort the batch.
+    """
+    assignment = _get_managed_assignment(db, assignment_id, current_user)
+    
+    if "csv" in request.headers.get("content-type", ""):
+        records = [record async for record in iter_csv_records(request.stream())]
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Expected a JSON array of grades or a CSV body"
+            )
+        records = list(enumerate(body, start=1))
+    
+    items = []
+    errors = []
+    for line, record in records:
+        try:
+            items.append((line, BulkGradeItem.model_validate(record)))
+        except ValidationError as e:
+            errors.append(BulkGradeError(
+                row=line,
+                detail="; ".join(error["msg"] for error in e.errors())
+            ))
+    
+    graded, apply_errors = apply_bulk_grades(db, assignment, items, current_user.id)
+    errors.extend(apply_errors)
+    errors.sort(key=lambda error: error.row)
+    
+    if notify and graded:
+        background_tasks.add_task(
+            _post_grade_notifications, assignment.title, assignment.max_points, graded
+        )
+    
+    return {"updated": len(graded), "errors": errors}
+
+
+@router.get("/{assignment_id}/statistics", response_model=dict)
+async def get_assignment_statistics(
+    assignment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_faculty)
+):
+    """
+    Grade distribution for an assignment: mean, median, std-dev,
+    percentiles, histogram and letter-grade counts
+    """
+    assignment = _get_managed_assignment(db, assignment_id, current_user)
+    
+    return assignment_statistics(db, assignment)
+
+
+# ============== Extension Endpoints ==============
+
+def _reevaluate_student(db: Session, assignment: Assignment, student_id: UUID):
+    """Re-price one student's submission and the rollups fed by it"""
+    if apply_late_penalties(db, assignment, [student_id]):
+        invalidate_grade_statistics(assignment.id, assignment.course_id)
+        refresh_course_results(db, assignment.course_id, [student_id])
+
+
+@router.get("/{assignment_id}/extensions", response_model=List[AssignmentExtensionResponse])
+async def list_extensions(
+    assignment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_faculty)
+):
+    """
+    List per-student due date extensions (faculty only)
+    """
+    _get_managed_assignment(db, assignment_id, current_user)
+    
+    return db.query(AssignmentExtension).filter(
+        AssignmentExtension.assignment_id == assignment_id
+    ).order_by(AssignmentExtension.due_date).all()
+
+
+@router.put("/{assignment_id}/extensions/{student_id}", response_model=AssignmentExtensionResponse)
+async def grant_extension(
+    assignment_id: int,
+    student_id: UUID,
+    extension_data: AssignmentExtensionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_faculty)
+):
+    """
+    Grant or change a student's extended due date (faculty only)
+    
+    The student's submission is re-evaluated against the new due date.
+    """
+    assignment = _get_managed_assignment(db, assignment_id, current_user)
+    
+    enrollment = db.query(CourseEnrollment).filter(
+        CourseEnrollment.course_id == assignment.course_id,
+        CourseEnrollment.student_id == student_id
+    ).first()
+    
+    if not enrollment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student is not enrolled in this course"
+        )
+    
+    extension = db.query(AssignmentExtension).filter(
+        AssignmentExtension.assignment_id == assignment_id,
+        AssignmentExtension.student_id == student_id
+    ).first()
+    
+    if not extension:
+        extension = AssignmentExtension(assignment_id=assignment_id, student_id=student_id)
+        db.add(extension)
+    
+    extension.due_date = extension_data.due_date
+    extension.reason = extension_data.reason
+    extension.granted_by = current_user.id
+    
+    db.commit()
+    _reevaluate_student(db, assignment, student_id)
+    db.refresh(extension)
+    
+    return extension
+
+
+@router.delete("/{assignment_id}/extensions/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_extension(
+    assignment_id: int,
+    student_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_faculty)
+):
+    """
+    Revoke a student's extension (faculty only)
+    """
+    assignment = _get_managed_assignment(db, assignment_id, current_user)
+    
+    extension = db.query(AssignmentExtension).filter(
+        AssignmentExtension.assignment_id == assignment_id,
+        AssignmentExtension.student_id == student_id
+    ).first()
+    
+    if not extension:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Extension not found"
+        )
+    
+    db.delete(extension)
+    db.commit()
+    _reevaluate_student(db, assignment, student_id)
+    
+    return None
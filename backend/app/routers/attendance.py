@@ -12,10 +12,13 @@ from datetime import date, timedelta
 from app.database import get_db
 from app.dependencies import get_current_user, require_faculty
 from app.schemas import (
-    AttendanceCreate, AttendanceResponse, AttendanceBulkCreate,
+    AttendanceCreate, AttendanceResponse, AttendanceResponseList, AttendanceBulkCreate,
     MessageResponse
 )
 from app.models import Attendance, Course, CourseEnrollment, User
+from app.services.export import export_response
+from app.services.read_models import ATTENDANCE_ROWS
+from app.services.serialization import list_response, schema_columns
 
 router = APIRouter(prefix="/attendance", tags=["Attendance"])
 
@@ -25,11 +28,15 @@ async def get_course_attendance(
     course_id: int,
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    export_format: str = Query("json", alias="format", pattern="^(json|ndjson|csv)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_faculty)
 ):
     """
     Get attendance records for a course (faculty only)
+    
+    `format=ndjson` and `format=csv` stream the records instead of
+    building the whole list in memory.
     """
     course = db.query(Course).filter(Course.id == course_id).first()
     
@@ -53,8 +60,17 @@ async def get_course_attendance(
     if end_date:
         query = query.filter(Attendance.date <= end_date)
     
-    records = query.order_by(Attendance.date.desc()).all()
-    return records
+    query = query.order_by(Attendance.date.desc())
+    
+    if export_format != "json":
+        return export_response(
+            query.with_entities(*schema_columns(Attendance, AttendanceResponse)).statement,
+            export_format,
+            f"{course.code}-attendance"
+        )
+    
+    records = ATTENDANCE_ROWS.fetch(query)
+    return list_response(AttendanceResponseList, records)
 
 
 @router.get("/course/{course_id}/date/{attendance_date}", response_model=List[dict])
@@ -239,11 +255,12 @@ async def get_my_attendance(
     course_id: Optional[int] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    export_format: str = Query("json", alias="format", pattern="^(json|ndjson|csv)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get current user's attendance records
+    Get current user's attendance records (`format=ndjson|csv` to stream them)
     """
     query = db.query(Attendance).filter(Attendance.student_id == current_user.id)
     
@@ -254,8 +271,17 @@ async def get_my_attendance(
     if end_date:
         query = query.filter(Attendance.date <= end_date)
     
-    records = query.order_by(Attendance.date.desc()).all()
-    return records
+    query = query.order_by(Attendance.date.desc())
+    
+    if export_format != "json":
+        return export_response(
+            query.with_entities(*schema_columns(Attendance, AttendanceResponse)).statement,
+            export_format,
+            "my-attendance"
+        )
+    
+    records = ATTENDANCE_ROWS.fetch(query)
+    return list_response(AttendanceResponseList, records)
 
 
 @router.get("/course/{course_id}/statistics", response_model=dict)
@@ -10,6 +10,7 @@ from typing import Optional
 
 from app.database import get_db
 from app.dependencies import get_current_user
+from app.services.conditional import conditional_get
 from app.services.supabase import get_supabase_client, get_supabase_admin_client
 from app.schemas import (
     UserCreate, UserResponse, UserLogin, TokenResponse,
@@ -21,6 +22,11 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 security = HTTPBearer()
 
 
+def _profile_version(current_user: User = Depends(get_current_user)) -> tuple:
+    """The profile changes only with updated_at (the row is already loaded)"""
+    return current_user.id, current_user.updated_at
+
+
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
     """
@@ -187,9 +193,13 @@ async def request_password_reset(request: PasswordResetRequest):
         }
 
 
-@router.get("/me", response_model=UserResponse)
+@router.get(
+    "/me",
+    response_model=UserResponse,
+    dependencies=[Depends(conditional_get(_profile_version))]
+)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """
-    Get current authenticated user info
+    Get current authenticated user info (304 while unchanged, see ETag)
     """
     return current_user
@@ -3,24 +3,80 @@ Courses Router
 Handles course management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
 
+from app.config import get_settings
 from app.database import get_db
 from app.dependencies import get_current_user, require_admin, require_faculty
 from app.schemas import (
-    CourseCreate, CourseUpdate, CourseResponse, CourseWithDetails,
-    EnrollmentCreate, EnrollmentResponse, MessageResponse
+    CourseCreate, CourseUpdate, CourseResponse, CourseWithDetails, CourseWithDetailsList,
+    EnrollmentCreate, EnrollmentResponse, EnrollmentImportResult, RegistrationResult,
+    WaitlistEntry, Gradebook
 )
-from app.models import Course, CourseEnrollment, User, Department
+from app.models import Course, CourseEnrollment, CourseWaitlist, User, Department
+from app.services.catalog import CatalogPage, cached_catalog_page, invalidate_catalog
+from app.services.compression import negotiate, representation_etag
+from app.services.conditional import etag_matches
+from app.services.csv_import import iter_csv_records
+from app.services.enrollment import (
+    enroll_students, fill_open_seats, import_roster, register_student, release_seat
+)
+from app.services.grade_stats import course_statistics
+from app.services.read_models import fetch_course_details
+from app.services.search import course_search_filter
+from app.services.gradebook import (
+    ARROW_AVAILABLE, build_gradebook, iter_gradebook_csv, iter_gradebook_arrow
+)
+from app.services.transcript import refresh_course_results
+
+settings = get_settings()
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
+_COURSE_DETAILS = TypeAdapter(CourseWithDetails)
+
+
+def _enrolled_counts(db: Session, course_ids: List[int]) -> dict:
+    """Enrollment count per course, in one grouped query"""
+    if not course_ids:
+        return {}
+    return dict(
+        db.query(CourseEnrollment.course_id, func.count(CourseEnrollment.id))
+        .filter(CourseEnrollment.course_id.in_(course_ids))
+        .group_by(CourseEnrollment.course_id)
+        .all()
+    )
+
+
+def _catalog_response(request: Request, page: CatalogPage) -> Response:
+    """
+    Serve a cached catalog page, or 304 if the client already has it
+
+    Compressed bodies are cached with the page, so repeated hits are not
+    recompressed (and the compression middleware leaves them alone).
+    """
+    encoding = None
+    if len(page.body) >= settings.COMPRESSION_MINIMUM_SIZE:
+        encoding = negotiate(request.headers.get("accept-encoding"))
+    etag = representation_etag(page.etag, encoding)
+    headers = {"ETag": etag, "Cache-Control": settings.CATALOG_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if encoding is None:
+        return Response(content=page.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(content=page.encode(encoding), media_type="application/json", headers=headers)
+
 
 @router.get("/", response_model=List[CourseWithDetails])
 async def list_courses(
+    request: Request,
     department_id: Optional[int] = Query(None),
     faculty_id: Optional[UUID] = Query(None),
     semester: Optional[str] = Query(None),
@@ -33,36 +89,32 @@ async def list_courses(
 ):
     """
     List all courses
+    
+    The catalog is the same for every user, so rendered pages are cached
+    per filter combination and revalidated with ETags.
     """
-    query = db.query(Course).filter(Course.is_active == True)
-    
-    # Apply filters
-    if department_id:
-        query = query.filter(Course.department_id == department_id)
-    if faculty_id:
-        query = query.filter(Course.faculty_id == faculty_id)
-    if semester:
-        query = query.filter(Course.semester == semester)
-    if year:
-        query = query.filter(Course.year == year)
-    if search:
-        query = query.filter(
-            (Course.name.ilike(f"%{search}%")) | 
-            (Course.code.ilike(f"%{search}%"))
+    def render() -> bytes:
+        query = db.query(Course).filter(Course.is_active == True)
+        
+        # Apply filters
+        if department_id:
+            query = query.filter(Course.department_id == department_id)
+        if faculty_id:
+            query = query.filter(Course.faculty_id == faculty_id)
+        if semester:
+            query = query.filter(Course.semester == semester)
+        if year:
+            query = query.filter(Course.year == year)
+        if search:
+            query = query.filter(course_search_filter(db, search))
+        
+        courses = fetch_course_details(query, skip, limit)
+        return CourseWithDetailsList.dump_json(
+            CourseWithDetailsList.validate_python(courses, from_attributes=True)
         )
     
-    courses = query.offset(skip).limit(limit).all()
-    
-    # Enrich with details
-    result = []
-    for course in courses:
-        course_data = CourseWithDetails.from_orm(course)
-        course_data.enrolled_count = db.query(CourseEnrollment).filter(
-            CourseEnrollment.course_id == course.id
-        ).count()
-        result.append(course_data)
-    
-    return result
+    key = ("list", department_id, faculty_id, semester, year, search, skip, limit)
+    return _catalog_response(request, cached_catalog_page(key, render))
 
 
 @router.post("/", response_model=CourseResponse, status_code=status.HTTP_201_CREATED)
@@ -86,6 +138,7 @@ async def create_course(
     db.add(new_course)
     db.commit()
     db.refresh(new_course)
+    invalidate_catalog()
     
     return new_course
 
@@ -93,26 +146,28 @@ async def create_course(
 @router.get("/{course_id}", response_model=CourseWithDetails)
 async def get_course(
     course_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get course by ID
     """
-    course = db.query(Course).filter(Course.id == course_id).first()
-    
-    if not course:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Course not found"
-        )
-    
-    course_data = CourseWithDetails.from_orm(course)
-    course_data.enrolled_count = db.query(CourseEnrollment).filter(
-        CourseEnrollment.course_id == course.id
-    ).count()
+    def render() -> bytes:
+        course = db.query(Course).filter(Course.id == course_id).first()
+        
+        if not course:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Course not found"
+            )
+        
+        course_data = CourseWithDetails.model_validate(course)
+        course_data.enrolled_count = _enrolled_counts(db, [course.id]).get(course.id, 0)
+        
+        return _COURSE_DETAILS.dump_json(course_data)
     
-    return course_data
+    return _catalog_response(request, cached_catalog_page(("course", course_id), render))
 
 
 @router.put("/{course_id}", response_model=CourseResponse)
@@ -141,11 +196,22 @@ async def update_course(
         )
     
     # Update fields
-    for field, value in course_update.dict(exclude_unset=True).items():
+    changes = course_update.dict(exclude_unset=True)
+    for field, value in changes.items():
         setattr(course, field, value)
     
     db.commit()
+    
+    # A larger capacity goes to the waitlist first
+    if "capacity" in changes:
+        fill_open_seats(db, course_id)
+    
+    # Course results copy the term and credits, and term GPAs are built from them
+    if changes.keys() & {"credits", "semester", "year"}:
+        refresh_course_results(db, course_id)
+    
     db.refresh(course)
+    invalidate_catalog()
     
     return course
 
@@ -170,6 +236,7 @@ async def delete_course(
     # Soft delete
     course.is_active = False
     db.commit()
+    invalidate_catalog()
     
     return None
 
@@ -238,31 +305,157 @@ async def enroll_student(
             detail="Course not found"
         )
     
-    # Check if already enrolled
-    existing = db.query(CourseEnrollment).filter(
-        CourseEnrollment.course_id == course_id,
-        CourseEnrollment.student_id == student_id
-    ).first()
+    result = register_student(db, course_id, student_id, waitlist=False)
+    invalidate_catalog()
     
-    if existing:
+    if result["status"] == "already_enrolled":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Student already enrolled in this course"
         )
     
-    enrollment = CourseEnrollment(
-        course_id=course_id,
-        student_id=student_id
-    )
+    if result["status"] == "full":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Course is full"
+        )
+    
+    return db.query(CourseEnrollment).filter(CourseEnrollment.id == result["enrollment_id"]).first()
+
+
+@router.post("/{course_id}/register", response_model=RegistrationResult)
+async def register_for_course(
+    course_id: int,
+    waitlist: bool = Query(True, description="Join the waitlist if the course is full"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Register the current student for a course
+    
+    Takes a seat if one is free, otherwise joins the waitlist and reports
+    the position. Safe under concurrent registrations: seats are taken with
+    a conditional update, never check-then-insert.
+    """
+    if current_user.role != "student":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only students can register for courses"
+        )
+    
+    course = db.query(Course.id).filter(Course.id == course_id, Course.is_active == True).first()
+    
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    result = register_student(db, course_id, current_user.id, waitlist=waitlist)
+    invalidate_catalog()
+    
+    return result
+
+
+@router.get("/{course_id}/waitlist", response_model=List[WaitlistEntry])
+async def get_course_waitlist(
+    course_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_faculty)
+):
+    """
+    Waitlisted students in promotion order
+    """
+    course = db.query(Course).filter(Course.id == course_id).first()
+    
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
     
-    db.add(enrollment)
+    if current_user.role == "faculty" and str(course.faculty_id) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    rows = db.query(CourseWaitlist, User.name, User.email).join(
+        User, User.id == CourseWaitlist.student_id
+    ).filter(CourseWaitlist.course_id == course_id).order_by(CourseWaitlist.id).all()
+    
+    return [
+        {
+            "position": position,
+            "student_id": entry.student_id,
+            "student_name": name,
+            "student_email": email,
+            "created_at": entry.created_at,
+        }
+        for position, (entry, name, email) in enumerate(rows, start=1)
+    ]
+
+
+@router.delete("/{course_id}/waitlist/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def leave_waitlist(
+    course_id: int,
+    student_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Remove a student from a course waitlist (the student, faculty or admin)
+    """
+    if current_user.role == "student" and str(student_id) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    if current_user.role == "faculty":
+        faculty_id = db.query(Course.faculty_id).filter(Course.id == course_id).scalar()
+        if str(faculty_id) != str(current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+    
+    deleted = db.query(CourseWaitlist).filter(
+        CourseWaitlist.course_id == course_id,
+        CourseWaitlist.student_id == student_id
+    ).delete(synchronize_session=False)
     db.commit()
-    db.refresh(enrollment)
     
-    return enrollment
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Waitlist entry not found"
+        )
+    
+    return None
+
+
+@router.post("/enrollments/import", response_model=EnrollmentImportResult)
+async def import_enrollments(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Import a multi-course roster from a CSV body (admin only)
+    
+    Columns: course_code or course_id, and student_email or student_id.
+    The body is streamed and committed in chunks; students already enrolled
+    are counted as skipped, unknown courses or students as invalid.
+    """
+    try:
+        return await import_roster(db, iter_csv_records(request.stream()))
+    finally:
+        # Chunks are committed as they go, so even a failed import changes counts
+        invalidate_catalog()
 
 
-@router.post("/{course_id}/enrollments/bulk", response_model=MessageResponse)
+@router.post("/{course_id}/enrollments/bulk", response_model=EnrollmentImportResult)
 async def bulk_enroll(
     course_id: int,
     student_ids: List[UUID],
@@ -280,27 +473,10 @@ async def bulk_enroll(
             detail="Course not found"
         )
     
-    enrolled_count = 0
-    for student_id in student_ids:
-        existing = db.query(CourseEnrollment).filter(
-            CourseEnrollment.course_id == course_id,
-            CourseEnrollment.student_id == student_id
-        ).first()
-        
-        if not existing:
-            enrollment = CourseEnrollment(
-                course_id=course_id,
-                student_id=student_id
-            )
-            db.add(enrollment)
-            enrolled_count += 1
+    result = enroll_students(db, course_id, student_ids)
+    invalidate_catalog()
     
-    db.commit()
-    
-    return {
-        "message": f"Successfully enrolled {enrolled_count} students",
-        "success": True
-    }
+    return result
 
 
 @router.delete("/{course_id}/enrollments/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -324,7 +500,96 @@ async def unenroll_student(
             detail="Enrollment not found"
         )
     
+    held_seat = enrollment.status != "dropped"
     db.delete(enrollment)
     db.commit()
     
+    # Drop the course from the student's transcript and term GPA
+    refresh_course_results(db, course_id, [student_id])
+    
+    # Pass the seat on to the waitlist
+    if held_seat:
+        release_seat(db, course_id)
+    invalidate_catalog()
+    
     return None
+
+
+# ============== Gradebook Endpoints ==============
+
+@router.get("/{course_id}/gradebook", response_model=Gradebook)
+async def get_gradebook(
+    course_id: int,
+    export_format: str = Query("json", alias="format", pattern="^(json|csv|arrow)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_faculty)
+):
+    """
+    Get the student x assignment grade matrix with weighted totals
+    
+    `format=csv` and `format=arrow` stream the same matrix as a CSV file
+    or an Arrow IPC stream.
+    """
+    course = db.query(Course).filter(Course.id == course_id).first()
+    
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    if current_user.role == "faculty" and str(course.faculty_id) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    if export_format == "arrow" and not ARROW_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Arrow export requires pyarrow to be installed"
+        )
+    
+    gradebook = build_gradebook(db, course_id)
+    
+    if export_format == "csv":
+        return StreamingResponse(
+            iter_gradebook_csv(gradebook),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{course.code}-gradebook.csv"'}
+        )
+    
+    if export_format == "arrow":
+        return StreamingResponse(
+            iter_gradebook_arrow(gradebook),
+            media_type="application/vnd.apache.arrow.stream",
+            headers={"Content-Disposition": f'attachment; filename="{course.code}-gradebook.arrows"'}
+        )
+    
+    return gradebook
+
+
+@router.get("/{course_id}/grade-statistics", response_model=dict)
+async def get_course_grade_statistics(
+    course_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_faculty)
+):
+    """
+    Distribution of weighted course percentages plus per-assignment summaries
+    """
+    course = db.query(Course).filter(Course.id == course_id).first()
+    
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    if current_user.role == "faculty" and str(course.faculty_id) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return course_statistics(db, course_id)
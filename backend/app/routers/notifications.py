@@ -4,36 +4,58 @@ Handles user notifications
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
 
 from app.database import get_db
 from app.dependencies import get_current_user
-from app.schemas import NotificationResponse, NotificationMarkRead, MessageResponse
+from app.schemas import NotificationResponse, NotificationResponseList, NotificationMarkRead, MessageResponse
 from app.models import Notification, User
+from app.services.conditional import conditional_get
+from app.services.read_models import NOTIFICATION_ROWS
+from app.services.serialization import list_response
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 
+def _notifications_version(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> tuple:
+    """
+    The user, and the count, newest and last-read time of their notifications
+
+    The user id keeps two users with the same counts and timestamps from
+    sharing a validator.
+    """
+    return (current_user.id,) + tuple(
+        db.query(
+            func.count(Notification.id), func.max(Notification.created_at), func.max(Notification.read_at)
+        ).filter(Notification.user_id == current_user.id).one()
+    )
+
+
 @router.get("/", response_model=List[NotificationResponse])
 async def get_notifications(
     unread_only: bool = False,
     limit: int = 50,
+    validators: dict = Depends(conditional_get(_notifications_version)),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Get current user's notifications
+    Get current user's notifications (304 while unchanged, see ETag)
     """
     query = db.query(Notification).filter(Notification.user_id == current_user.id)
     
     if unread_only:
         query = query.filter(Notification.read == False)
     
-    notifications = query.order_by(Notification.created_at.desc()).limit(limit).all()
+    notifications = NOTIFICATION_ROWS.fetch(query.order_by(Notification.created_at.desc()).limit(limit))
     
-    return notifications
+    return list_response(NotificationResponseList, notifications, headers=validators)
 
 
 @router.get("/unread-count")
@@ -0,0 +1,73 @@
+"""
+Search Router
+Ranked type-ahead search over the user directory, course catalog,
+announcements and assignments
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_db
+from app.dependencies import get_current_user, require_faculty
+from app.schemas import UserResponse, CourseResponse, SearchHit
+from app.models import User
+from app.services.omnibox import KINDS, omnibox
+from app.services.search import search_users, search_courses
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/", response_model=List[SearchHit])
+async def omnibox_search(
+    q: str = Query(..., min_length=1, description="Words to find; the last one may be a prefix"),
+    kind: Optional[str] = Query(None, description="Only announcement or assignment hits"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Search announcements and assignments visible to the current user
+    """
+    if kind is not None and kind not in KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"kind must be one of: {', '.join(KINDS)}"
+        )
+    
+    if not omnibox.ready:
+        omnibox.retry_build()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Search index is still building, try again shortly",
+            headers={"Retry-After": "5"}
+        )
+    
+    return omnibox.search(db, current_user, q, kinds=(kind,) if kind else None, limit=limit)
+
+
+@router.get("/users", response_model=List[UserResponse])
+async def search_user_directory(
+    q: str = Query(..., min_length=1, description="Name or email, prefixes allowed"),
+    role: Optional[str] = Query(None, description="Filter by role"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_faculty)
+):
+    """
+    Search users by name or email, best matches first (faculty and admin only)
+    """
+    return search_users(db, q, role=role, limit=limit)
+
+
+@router.get("/courses", response_model=List[CourseResponse])
+async def search_course_catalog(
+    q: str = Query(..., min_length=1, description="Course code or name, prefixes allowed"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Search active courses by code or name, best matches first
+    """
+    return search_courses(db, q, limit=limit)
@@ -3,15 +3,29 @@ Users Router
 Handles user management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
 
+from app.config import get_settings
 from app.database import get_db
-from app.dependencies import get_current_user, require_admin, require_faculty
-from app.schemas import UserResponse, UserUpdate, PaginatedResponse
+from app.dependencies import get_current_user, require_admin
+from app.schemas import (
+    UserResponse, UserResponseList, UserUpdate, PaginatedResponse, Transcript, UserProvisionResult
+)
 from app.models import User, CourseEnrollment, Course
+from app.services.catalog import invalidate_catalog
+from app.services.csv_import import iter_csv_records
+from app.services.directory import DIRECTORY_ROLES, visible_users_filter
+from app.services.export import export_response
+from app.services.provisioning import provision_users
+from app.services.search import user_search_filter
+from app.services.read_models import USER_ROWS
+from app.services.serialization import list_response, schema_columns
+from app.services.transcript import get_transcript
+
+settings = get_settings()
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -23,13 +37,18 @@ async def list_users(
     search: Optional[str] = Query(None, description="Search by name or email"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    export_format: str = Query("json", alias="format", pattern="^(json|ndjson|csv)$"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_faculty)
+    current_user: User = Depends(get_current_user)
 ):
     """
-    List all users (faculty and admin only)
+    List users visible to the current user
+    
+    Faculty and admins see everyone; students see the faculty of the
+    courses they are enrolled in. `format=ndjson|csv` streams every
+    matching user (skip and limit apply to JSON only).
     """
-    query = db.query(User)
+    query = db.query(User).filter(visible_users_filter(current_user))
     
     # Apply filters
     if role:
@@ -37,33 +56,34 @@ async def list_users(
     if department:
         query = query.filter(User.department.ilike(f"%{department}%"))
     if search:
-        query = query.filter(
-            (User.name.ilike(f"%{search}%")) | 
-            (User.email.ilike(f"%{search}%"))
+        query = query.filter(user_search_filter(db, search))
+    
+    if export_format != "json":
+        return export_response(
+            query.with_entities(*schema_columns(User, UserResponse)).order_by(User.email).statement,
+            export_format,
+            "users"
         )
     
-    # Students can only see faculty in their courses
-    if current_user.role == "student":
-        # Get student's enrolled courses
-        enrolled_course_ids = [
-            enrollment.course_id 
-            for enrollment in db.query(CourseEnrollment).filter(
-                CourseEnrollment.student_id == current_user.id
-            ).all()
-        ]
-        
-        # Get faculty teaching those courses
-        faculty_ids = [
-            course.faculty_id 
-            for course in db.query(Course).filter(
-                Course.id.in_(enrolled_course_ids)
-            ).all()
-        ]
-        
-        query = query.filter(User.id.in_(faculty_ids))
+    users = USER_ROWS.fetch(query.offset(skip).limit(limit))
+    return list_response(UserResponseList, users)
+
+
+@router.post("/provision", response_model=UserProvisionResult)
+async def provision_user_accounts(
+    request: Request,
+    concurrency: int = Query(settings.PROVISION_CONCURRENCY, ge=1, le=50, description="Auth provider calls in flight"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """
+    Create student and faculty accounts from a CSV body (admin only)
     
-    users = query.offset(skip).limit(limit).all()
-    return users
+    Columns: email, name, and optionally role, department, phone, password.
+    Emails that already have an account are reported as existing, so an
+    interrupted import can be re-run with the same file.
+    """
+    return await provision_users(db, iter_csv_records(request.stream()), concurrency=concurrency)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -76,17 +96,18 @@ async def get_user(
     Get user by ID
     """
     # Users can view their own profile
-    # Faculty can view students in their courses
-    # Admins can view anyone
+    # Students can view the faculty of their courses
+    # Faculty and admins can view anyone
     
-    if str(current_user.id) != str(user_id) and current_user.role not in ["faculty", "admin", "super-admin"]:
+    user = db.query(User).filter(User.id == user_id, visible_users_filter(current_user)).first()
+    
+    # Restricted callers get the same answer for hidden and missing users
+    if not user and current_user.role not in DIRECTORY_ROLES:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
-    
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -128,6 +149,10 @@ async def update_user(
     db.commit()
     db.refresh(user)
     
+    # Course details embed the instructor
+    if user.role == "faculty":
+        invalidate_catalog()
+    
     return user
 
 
@@ -165,6 +190,9 @@ async def delete_user(
 @router.get("/{user_id}/courses", response_model=List[dict])
 async def get_user_courses(
     user_id: UUID,
+    enrollment_status: Optional[str] = Query(
+        None, alias="status", description="Only enrollments with this status: active, dropped, completed"
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -187,25 +215,28 @@ async def get_user_courses(
         )
     
     if user.role == "student":
-        # Get enrolled courses
-        enrollments = db.query(CourseEnrollment).filter(
-            CourseEnrollment.student_id == user_id
-        ).all()
+        # Enrolled courses with their enrollment, in one joined query
+        query = db.query(
+            Course.id, Course.name, Course.code, Course.credits,
+            CourseEnrollment.status, CourseEnrollment.enrolled_at
+        ).join(
+            CourseEnrollment, CourseEnrollment.course_id == Course.id
+        ).filter(CourseEnrollment.student_id == user_id)
         
-        courses = []
-        for enrollment in enrollments:
-            course = db.query(Course).filter(Course.id == enrollment.course_id).first()
-            if course:
-                courses.append({
-                    "id": course.id,
-                    "name": course.name,
-                    "code": course.code,
-                    "credits": course.credits,
-                    "status": enrollment.status,
-                    "enrolled_at": enrollment.enrolled_at
-                })
+        if enrollment_status:
+            query = query.filter(CourseEnrollment.status == enrollment_status)
         
-        return courses
+        return [
+            {
+                "id": row.id,
+                "name": row.name,
+                "code": row.code,
+                "credits": row.credits,
+                "status": row.status,
+                "enrolled_at": row.enrolled_at
+            }
+            for row in query.order_by(CourseEnrollment.enrolled_at)
+        ]
     else:
         # Get taught courses
         courses = db.query(Course).filter(Course.faculty_id == user_id).all()
@@ -221,3 +252,21 @@ async def get_user_courses(
             }
             for course in courses
         ]
+
+
+@router.get("/{user_id}/transcript", response_model=Transcript)
+async def get_user_transcript(
+    user_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get a student's transcript: final course grades by term, term and cumulative GPA
+    """
+    if str(current_user.id) != str(user_id) and current_user.role not in ["faculty", "admin", "super-admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return get_transcript(db, user_id)
@@ -4,7 +4,7 @@ Pydantic Schemas for request/response validation
 
 from datetime import datetime, date
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, model_validator
 from uuid import UUID
 
 
@@ -34,6 +34,7 @@ class UserUpdate(BaseModel):
 
 
 class UserResponse(UserBase):
+    email: str  # validated on the way in; re-checking stored addresses dominates list serialization
     id: UUID
     is_active: bool
     created_at: datetime
@@ -43,6 +44,22 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserProvisionRow(BaseModel):
+    row: int
+    email: Optional[str] = None
+    status: str  # created, existing, invalid, failed
+    user_id: Optional[UUID] = None
+    detail: Optional[str] = None
+
+
+class UserProvisionResult(BaseModel):
+    created: int
+    existing: int
+    invalid: int
+    failed: int
+    rows: List[UserProvisionRow] = []
+
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -86,6 +103,7 @@ class CourseBase(BaseModel):
     year: Optional[int] = None
     start_date: Optional[date] = None
     end_date: Optional[date] = None
+    capacity: Optional[int] = Field(None, ge=0)
 
 
 class CourseCreate(CourseBase):
@@ -103,6 +121,7 @@ class CourseUpdate(BaseModel):
     end_date: Optional[date] = None
     is_active: Optional[bool] = None
     faculty_id: Optional[UUID] = None
+    capacity: Optional[int] = Field(None, ge=0)
 
 
 class CourseResponse(CourseBase):
@@ -110,6 +129,7 @@ class CourseResponse(CourseBase):
     department_id: Optional[int]
     faculty_id: Optional[UUID]
     is_active: bool
+    seats_taken: int = 0
     created_at: datetime
     
     class Config:
@@ -140,6 +160,32 @@ class EnrollmentResponse(BaseModel):
         from_attributes = True
 
 
+class RegistrationResult(BaseModel):
+    status: str  # enrolled, waitlisted, already_enrolled, full
+    enrollment_id: Optional[int] = None
+    waitlist_position: Optional[int] = None
+
+
+class WaitlistEntry(BaseModel):
+    position: int
+    student_id: UUID
+    student_name: str
+    student_email: str
+    created_at: datetime
+
+
+class EnrollmentImportError(BaseModel):
+    row: int
+    detail: str
+
+
+class EnrollmentImportResult(BaseModel):
+    enrolled: int
+    skipped: int
+    invalid: int
+    errors: List[EnrollmentImportError] = []
+
+
 # ============== Assignment Schemas ==============
 
 class AssignmentBase(BaseModel):
@@ -148,8 +194,10 @@ class AssignmentBase(BaseModel):
     instructions: Optional[str] = None
     due_date: Optional[datetime] = None
     max_points: int = 100
+    weight: float = Field(1.0, ge=0)
     allow_late_submission: bool = False
     late_penalty_percent: int = 0
+    publish_at: Optional[datetime] = None
 
 
 class AssignmentCreate(AssignmentBase):
@@ -162,9 +210,11 @@ class AssignmentUpdate(BaseModel):
     instructions: Optional[str] = None
     due_date: Optional[datetime] = None
     max_points: Optional[int] = None
+    weight: Optional[float] = Field(None, ge=0)
     allow_late_submission: Optional[bool] = None
     late_penalty_percent: Optional[int] = None
     is_published: Optional[bool] = None
+    publish_at: Optional[datetime] = None
 
 
 class AssignmentResponse(AssignmentBase):
@@ -184,6 +234,14 @@ class AssignmentWithCourse(AssignmentResponse):
     course: Optional[CourseResponse] = None
 
 
+class AssignmentWithSubmissionStatus(AssignmentWithCourse):
+    submission_id: Optional[int] = None
+    submission_status: Optional[str] = None
+    grade: Optional[int] = None
+    effective_grade: Optional[int] = None
+    submitted_at: Optional[datetime] = None
+
+
 # ============== Submission Schemas ==============
 
 class SubmissionBase(BaseModel):
@@ -211,6 +269,8 @@ class SubmissionResponse(BaseModel):
     submitted_at: datetime
     status: str
     grade: Optional[int]
+    days_late: Optional[int] = 0
+    effective_grade: Optional[int] = None
     feedback: Optional[str]
     graded_by: Optional[UUID]
     graded_at: Optional[datetime]
@@ -224,6 +284,46 @@ class SubmissionWithDetails(SubmissionResponse):
     student: Optional[UserResponse] = None
 
 
+class AssignmentExtensionCreate(BaseModel):
+    due_date: datetime
+    reason: Optional[str] = None
+
+
+class AssignmentExtensionResponse(AssignmentExtensionCreate):
+    id: int
+    assignment_id: int
+    student_id: UUID
+    granted_by: Optional[UUID]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class BulkGradeItem(BaseModel):
+    submission_id: Optional[int] = None
+    student_id: Optional[UUID] = None
+    student_email: Optional[str] = None
+    grade: int = Field(..., ge=0)
+    feedback: Optional[str] = None
+    
+    @model_validator(mode="after")
+    def require_reference(self):
+        if self.submission_id is None and self.student_id is None and not self.student_email:
+            raise ValueError("One of submission_id, student_id or student_email is required")
+        return self
+
+
+class BulkGradeError(BaseModel):
+    row: int
+    detail: str
+
+
+class BulkGradeResult(BaseModel):
+    updated: int
+    errors: List[BulkGradeError]
+
+
 # ============== Attendance Schemas ==============
 
 class AttendanceBase(BaseModel):
@@ -351,6 +451,54 @@ class GradeResponse(GradeBase):
         from_attributes = True
 
 
+class TranscriptCourse(BaseModel):
+    course_id: int
+    code: str
+    name: str
+    credits: int
+    percentage: float
+    letter_grade: str
+    grade_points: float
+
+
+class TranscriptTerm(BaseModel):
+    term: str
+    credits: int
+    gpa: float
+    courses: List[TranscriptCourse]
+
+
+class Transcript(BaseModel):
+    student_id: UUID
+    terms: List[TranscriptTerm]
+    total_credits: int
+    cumulative_gpa: Optional[float] = None
+
+
+class GradebookAssignment(BaseModel):
+    id: int
+    title: str
+    max_points: int
+    weight: float
+    due_date: Optional[datetime] = None
+
+
+class GradebookRow(BaseModel):
+    student_id: UUID
+    student_name: str
+    student_email: str
+    scores: List[Optional[int]]
+    total_points: int
+    total_possible: int
+    weighted_percentage: Optional[float] = None
+
+
+class Gradebook(BaseModel):
+    course_id: int
+    assignments: List[GradebookAssignment]
+    students: List[GradebookRow]
+
+
 # ============== Support Ticket Schemas ==============
 
 class SupportTicketBase(BaseModel):
@@ -441,6 +589,17 @@ class PasswordResetConfirm(BaseModel):
     new_password: str = Field(..., min_length=8)
 
 
+# ============== Search Schemas ==============
+
+class SearchHit(BaseModel):
+    kind: str  # announcement, assignment
+    id: int
+    title: str
+    snippet: Optional[str] = None
+    course_id: Optional[int] = None
+    score: float
+
+
 # ============== Generic Response Schemas ==============
 
 class MessageResponse(BaseModel):
@@ -454,3 +613,16 @@ class PaginatedResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+
+
+# ============== List Adapters ==============
+# Built once at import (each compiles a validator and serializer) and used
+# by list endpoints through app.services.serialization.list_response
+
+UserResponseList = TypeAdapter(List[UserResponse])
+CourseWithDetailsList = TypeAdapter(List[CourseWithDetails])
+AssignmentWithSubmissionStatusList = TypeAdapter(List[AssignmentWithSubmissionStatus])
+SubmissionWithDetailsList = TypeAdapter(List[SubmissionWithDetails])
+AttendanceResponseList = TypeAdapter(List[AttendanceResponse])
+AnnouncementResponseList = TypeAdapter(List[AnnouncementResponse])
+NotificationResponseList = TypeAdapter(List[NotificationResponse])
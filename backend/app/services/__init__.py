@@ -1,2 +1,2 @@
 # Services package
-from app.services import supabase, storage, notification
+from app.services import supabase, storage, notification, resilience, gradebook, grading, grade_stats, catalog, lateness, transcript, csv_import, directory, enrollment, export, provisioning, scheduler, search, omnibox, serialization, read_models, compression, conditional, query_stats, metrics, access_log, tracing
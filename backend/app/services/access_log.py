@@ -0,0 +1,159 @@
+"""
+Access Log Service
+Queue-backed logging and a sampled, structured JSON access log with request IDs
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+
+settings = get_settings()
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+ACCESS_LOGGER = "app.access"
+
+# Incoming X-Request-ID values are reused only when they look like an ID
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+access_logger = logging.getLogger(ACCESS_LOGGER)
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonAccessFormatter(logging.Formatter):
+    """One JSON object per access record (runs on the listener thread)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")}
+        entry.update(getattr(record, "access", None) or {"message": record.getMessage()})
+        return json.dumps(entry, separators=(",", ":"))
+
+
+def _is_access(record: logging.LogRecord) -> bool:
+    return record.name == ACCESS_LOGGER
+
+
+def setup_logging(level: int = logging.INFO):
+    """
+    Route all logging through a queue drained by one background thread
+
+    Callers only enqueue records; formatting and writing happen off the
+    event loop. Access records are written as JSON, everything else in
+    the usual text format. Queued records are flushed at exit.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    text_handler = logging.StreamHandler(sys.stderr)
+    text_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    text_handler.addFilter(lambda record: not _is_access(record))
+
+    access_handler = logging.StreamHandler(sys.stdout)
+    access_handler.setFormatter(JsonAccessFormatter())
+    access_handler.addFilter(_is_access)
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(records)]
+    root.setLevel(level)
+    access_logger.setLevel(logging.INFO)
+
+    _listener = QueueListener(records, text_handler, access_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Write out everything still queued and stop the background thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def current_request_id() -> Optional[str]:
+    """ID of the request being handled, for correlating other log lines"""
+    return request_id_var.get()
+
+
+class AccessLogMiddleware:
+    """
+    Assign each request an ID and write one structured access record for it
+
+    The ID comes from a well-formed X-Request-ID header or is generated,
+    and is echoed in the response. Errors (status >= 400) and requests
+    slower than ACCESS_LOG_SLOW_MS are always logged; other responses are
+    sampled at ACCESS_LOG_SAMPLE_RATE. Records carry the SQL statement
+    count and time the query stats middleware collected for the request,
+    and the trace id when the request was sampled for tracing.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = Headers(scope=scope).get("x-request-id")
+        request_id = incoming if incoming and _REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        status = 500
+
+        async def send_with_id(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
+            duration_ms = (time.perf_counter() - started) * 1000
+            always = status >= 400 or duration_ms >= settings.ACCESS_LOG_SLOW_MS
+            if always or random.random() < settings.ACCESS_LOG_SAMPLE_RATE:
+                _log_access(scope, request_id, status, duration_ms, 1.0 if always else settings.ACCESS_LOG_SAMPLE_RATE)
+
+
+def _log_access(scope: Scope, request_id: str, status: int, duration_ms: float, sample_rate: float):
+    route = scope.get("route")
+    entry = {
+        "request_id": request_id,
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": route.path if route is not None else None,
+        "status": status,
+        "duration_ms": round(duration_ms, 2),
+        "client": scope["client"][0] if scope.get("client") else None,
+        "sample_rate": sample_rate,
+    }
+    stats = scope.get("state", {}).get("query_stats")
+    if stats is not None:
+        entry["db_queries"] = stats.count
+        entry["db_ms"] = round(stats.seconds * 1000, 2)
+    trace_id = scope.get("state", {}).get("trace_id")
+    if trace_id is not None:
+        entry["trace_id"] = trace_id
+    access_logger.info("access", extra={"access": entry})
@@ -0,0 +1,81 @@
+"""
+Catalog Cache Service
+Serialized course catalog pages with strong ETags
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable
+
+from app.config import get_settings
+from app.services.compression import compress
+from app.services.conditional import make_etag
+from app.services.metrics import record_cache
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class CatalogPage:
+    body: bytes
+    etag: str
+    encoded: Dict[str, bytes] = field(default_factory=dict, compare=False, repr=False)
+
+    def encode(self, encoding: str) -> bytes:
+        """The body in `encoding`, compressed on first use and kept with the page"""
+        body = self.encoded.get(encoding)
+        if body is None:
+            body = self.encoded[encoding] = compress(self.body, encoding, cached=True)
+        return body
+
+
+class _CatalogCache:
+    """
+    Per-process LRU of rendered catalog pages
+
+    Every catalog write bumps the generation and drops all pages; a page
+    rendered while a write happened is not stored. Writes made by other
+    workers are only seen once CATALOG_CACHE_SECONDS have passed.
+    """
+
+    def __init__(self):
+        self._pages: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._generation = 0
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> CatalogPage:
+        entry = self._pages.get(key)
+        if entry is not None:
+            stored_at, page = entry
+            if time.monotonic() - stored_at <= settings.CATALOG_CACHE_SECONDS:
+                self._pages.move_to_end(key)
+                record_cache("catalog", True)
+                return page
+            del self._pages[key]
+
+        record_cache("catalog", False)
+        generation = self._generation
+        body = render()
+        page = CatalogPage(body, make_etag(body))
+        if generation == self._generation:
+            self._pages[key] = (time.monotonic(), page)
+            while len(self._pages) > settings.CATALOG_CACHE_MAX_PAGES:
+                self._pages.popitem(last=False)
+        return page
+
+    def invalidate(self):
+        self._generation += 1
+        self._pages.clear()
+
+
+_cache = _CatalogCache()
+
+
+def cached_catalog_page(key: Hashable, render: Callable[[], bytes]) -> CatalogPage:
+    """The cached page for `key`, rendering (and caching) it on a miss"""
+    return _cache.get_or_render(key, render)
+
+
+def invalidate_catalog():
+    """Drop cached catalog pages after a course, enrollment or instructor change"""
+    _cache.invalidate()
@@ -0,0 +1,61 @@
+"""
+Conditional GET Service
+ETags and If-None-Match handling, so unchanged resources are answered with 304
+"""
+
+import hashlib
+from typing import Callable, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag: a digest of the exact response bytes"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches `etag` (weak comparison, RFC 9110)"""
+    if not if_none_match:
+        return False
+    etag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def version_etag(request: Request, version) -> str:
+    """
+    Weak ETag for `version` of the resource at the request's URL
+
+    The path and query string are part of the digest, so each filter
+    combination or page gets its own validator.
+    """
+    key = repr((request.url.path, request.url.query, version)).encode()
+    return 'W/"' + hashlib.blake2b(key, digest_size=16).hexdigest() + '"'
+
+
+def conditional_get(version_key: Callable) -> Callable:
+    """
+    Dependency that answers If-None-Match with 304 before the endpoint runs
+
+    `version_key` is itself a dependency returning a cheap value that
+    changes whenever the response would: a count plus the latest
+    created_at/updated_at, a cache generation, and so on. The resolved
+    dependency is the validator headers; they are set on the endpoint's
+    response, and endpoints that build their own Response pass them on.
+    """
+    async def check(request: Request, response: Response, version=Depends(version_key)) -> dict:
+        headers = {"ETag": version_etag(request, version), "Cache-Control": settings.CONDITIONAL_CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return headers
+
+    return check
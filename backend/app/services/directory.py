@@ -0,0 +1,43 @@
+"""
+Directory Service
+Which users a principal may see, as SQL that other queries compose
+"""
+
+from sqlalchemy import Select, or_, select, true
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models import Course, CourseEnrollment, User
+
+# Roles that see the whole user directory
+DIRECTORY_ROLES = ("faculty", "admin", "super-admin")
+
+
+def live_enrollments(student_id) -> Select:
+    """SELECT of the course ids a student holds a non-dropped enrollment in"""
+    return select(CourseEnrollment.course_id).where(
+        CourseEnrollment.student_id == student_id,
+        CourseEnrollment.status != "dropped"
+    )
+
+
+def visible_users_filter(principal: User) -> ColumnElement:
+    """
+    WHERE clause on User for the users `principal` may see
+
+    Students see themselves and the faculty of courses they are enrolled in;
+    the enrollment lookup is a subquery, so callers stay at one statement
+    however many courses the student has.
+    """
+    if principal.role in DIRECTORY_ROLES:
+        return true()
+    return or_(
+        User.id == principal.id,
+        User.id.in_(
+            select(Course.faculty_id).where(Course.id.in_(live_enrollments(principal.id)))
+        )
+    )
+
+
+def visible_users(principal: User) -> Select:
+    """SELECT of the User rows `principal` may see, to refine with further filters"""
+    return select(User).where(visible_users_filter(principal))
@@ -0,0 +1,424 @@
+"""
+Enrollment Service
+Seat allocation and waitlists, set-based bulk enrollment and streaming roster imports
+"""
+
+from collections import Counter
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import bindparam, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models import Course, CourseEnrollment, CourseWaitlist, User
+from app.services.notification import create_notification
+from app.services.tracing import traced
+
+# Rows per INSERT batch and transaction; keeps locks short on large imports
+ENROLLMENT_CHUNK_SIZE = 5000
+
+# Only the first errors are returned so a bad file cannot blow up the response
+MAX_REPORTED_ERRORS = 100
+
+
+# ============== Seat allocation ==============
+#
+# Course.seats_taken counts non-dropped enrollments. A seat is only ever
+# taken with a conditional UPDATE (seats_taken < capacity), which the
+# database serialises on the course row, so concurrent registrations cannot
+# overbook no matter how they interleave.
+
+def _insert_enrollment(db: Session, course_id: int, student_id: UUID) -> Optional[int]:
+    """INSERT ... ON CONFLICT DO NOTHING; the new enrollment id, or None if one exists"""
+    return db.execute(
+        dialect_insert(db, CourseEnrollment)
+        .values(course_id=course_id, student_id=student_id, status="active")
+        .on_conflict_do_nothing(index_elements=["course_id", "student_id"])
+        .returning(CourseEnrollment.id)
+    ).scalar()
+
+
+def _take_seat(db: Session, course_id: int) -> bool:
+    return db.execute(
+        update(Course)
+        .where(
+            Course.id == course_id,
+            or_(Course.capacity.is_(None), Course.seats_taken < Course.capacity)
+        )
+        .values(seats_taken=Course.seats_taken + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount == 1
+
+
+def _waitlist_position(db: Session, course_id: int, student_id: UUID) -> Optional[int]:
+    entry_id = db.scalar(
+        select(CourseWaitlist.id).where(
+            CourseWaitlist.course_id == course_id,
+            CourseWaitlist.student_id == student_id
+        )
+    )
+    if entry_id is None:
+        return None
+    return db.scalar(
+        select(func.count()).where(CourseWaitlist.course_id == course_id, CourseWaitlist.id <= entry_id)
+    )
+
+
+def register_student(db: Session, course_id: int, student_id: UUID, waitlist: bool = True) -> dict:
+    """
+    Enroll a student if a seat is free, otherwise (optionally) waitlist them
+
+    The enrollment row is inserted first and the seat taken second, in one
+    transaction; losing the seat race rolls the insert back. A seat released
+    between that rollback and the waitlist insert found no one to promote,
+    so open seats are filled once the student is on the waitlist. Returns
+    {"status": enrolled | waitlisted | already_enrolled | full, ...}.
+    """
+    enrollment_id = _insert_enrollment(db, course_id, student_id)
+    reactivate = False
+    if enrollment_id is None:
+        existing_id, existing_status = db.execute(
+            select(CourseEnrollment.id, CourseEnrollment.status).where(
+                CourseEnrollment.course_id == course_id,
+                CourseEnrollment.student_id == student_id
+            )
+        ).one()
+        if existing_status != "dropped":
+            db.rollback()
+            return {"status": "already_enrolled", "enrollment_id": existing_id}
+        enrollment_id, reactivate = existing_id, True
+
+    if _take_seat(db, course_id):
+        if reactivate:
+            reactivated = db.execute(
+                update(CourseEnrollment)
+                .where(CourseEnrollment.id == enrollment_id, CourseEnrollment.status == "dropped")
+                .values(status="active")
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not reactivated:
+                # Reactivated concurrently: give the seat back
+                db.rollback()
+                return {"status": "already_enrolled", "enrollment_id": enrollment_id}
+        db.execute(
+            delete(CourseWaitlist).where(
+                CourseWaitlist.course_id == course_id,
+                CourseWaitlist.student_id == student_id
+            )
+        )
+        db.commit()
+        return {"status": "enrolled", "enrollment_id": enrollment_id}
+
+    db.rollback()
+    if not waitlist:
+        return {"status": "full"}
+
+    db.execute(
+        dialect_insert(db, CourseWaitlist)
+        .values(course_id=course_id, student_id=student_id)
+        .on_conflict_do_nothing(index_elements=["course_id", "student_id"])
+    )
+    db.commit()
+    if student_id in fill_open_seats(db, course_id):
+        return {
+            "status": "enrolled",
+            "enrollment_id": db.scalar(
+                select(CourseEnrollment.id).where(
+                    CourseEnrollment.course_id == course_id,
+                    CourseEnrollment.student_id == student_id
+                )
+            )
+        }
+    return {"status": "waitlisted", "waitlist_position": _waitlist_position(db, course_id, student_id)}
+
+
+def _promote_next(db: Session, course_id: int) -> Optional[UUID]:
+    """
+    Move the head of the waitlist into the seat the caller holds
+
+    A student with a dropped enrollment (waitlisted after re-registering
+    into a full course) is promoted by reactivating that row. Entries of
+    students who got enrolled another way are skipped and removed.
+    Returns the promoted student, or None if the waitlist is empty.
+    """
+    while True:
+        entry = db.execute(
+            select(CourseWaitlist.id, CourseWaitlist.student_id)
+            .where(CourseWaitlist.course_id == course_id)
+            .order_by(CourseWaitlist.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).first()
+        if entry is None:
+            return None
+
+        db.execute(delete(CourseWaitlist).where(CourseWaitlist.id == entry.id))
+        if _insert_enrollment(db, course_id, entry.student_id) is not None:
+            return entry.student_id
+        reactivated = db.execute(
+            update(CourseEnrollment)
+            .where(
+                CourseEnrollment.course_id == course_id,
+                CourseEnrollment.student_id == entry.student_id,
+                CourseEnrollment.status == "dropped"
+            )
+            .values(status="active")
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if reactivated == 1:
+            return entry.student_id
+
+
+@traced("notification.fan_out")
+def _notify_promoted(db: Session, course_id: int, student_ids: List[UUID]):
+    if not student_ids:
+        return
+    course_name = db.scalar(select(Course.name).where(Course.id == course_id))
+    for student_id in student_ids:
+        create_notification(
+            db=db,
+            user_id=student_id,
+            title="Enrolled from Waitlist",
+            message=f"A seat opened up in {course_name} and you have been enrolled",
+            type="course",
+            reference_type="course",
+            reference_id=course_id,
+            action_url="/courses"
+        )
+
+
+def release_seat(db: Session, course_id: int) -> Optional[UUID]:
+    """
+    Hand a freed seat to the head of the waitlist, or return it to the pool
+
+    Call after removing or dropping a non-dropped enrollment; commits.
+    Returns the promoted student, if any.
+    """
+    promoted = _promote_next(db, course_id)
+    if promoted is None:
+        db.execute(
+            update(Course)
+            .where(Course.id == course_id, Course.seats_taken > 0)
+            .values(seats_taken=Course.seats_taken - 1)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    _notify_promoted(db, course_id, [promoted] if promoted else [])
+    return promoted
+
+
+def fill_open_seats(db: Session, course_id: int) -> List[UUID]:
+    """Promote waitlisted students while seats are free (e.g. after a capacity increase)"""
+    promoted = []
+    while _take_seat(db, course_id):
+        student_id = _promote_next(db, course_id)
+        if student_id is None:
+            db.rollback()
+            break
+        db.commit()
+        promoted.append(student_id)
+    _notify_promoted(db, course_id, promoted)
+    return promoted
+
+
+# ============== Bulk enrollment ==============
+
+def insert_enrollments(db: Session, pairs: Iterable[Tuple[int, UUID]]) -> int:
+    """
+    INSERT (course_id, student_id) pairs with ON CONFLICT DO NOTHING and commit
+
+    Returns the number of rows actually inserted; existing enrollments are
+    left untouched (including dropped ones). Registrar imports are not
+    capacity-checked, but seats_taken is kept in step.
+    """
+    rows = [
+        {"course_id": course_id, "student_id": student_id, "status": "active"}
+        for course_id, student_id in dict.fromkeys(pairs)
+    ]
+    if not rows:
+        return 0
+
+    statement = (
+        dialect_insert(db, CourseEnrollment)
+        .on_conflict_do_nothing(index_elements=["course_id", "student_id"])
+        .returning(CourseEnrollment.course_id)
+    )
+    per_course = Counter(db.scalars(statement, rows))
+    if per_course:
+        courses = Course.__table__
+        db.execute(
+            courses.update()
+            .where(courses.c.id == bindparam("course_id"))
+            .values(seats_taken=courses.c.seats_taken + bindparam("added")),
+            [{"course_id": course_id, "added": added} for course_id, added in per_course.items()],
+        )
+    db.commit()
+    return sum(per_course.values())
+
+
+def _new_result() -> dict:
+    return {"enrolled": 0, "skipped": 0, "invalid": 0, "errors": []}
+
+
+def _reject(result: dict, row: int, detail: str):
+    result["invalid"] += 1
+    if len(result["errors"]) < MAX_REPORTED_ERRORS:
+        result["errors"].append({"row": row, "detail": detail})
+
+
+def _student_ids(db: Session, ids) -> set:
+    return set(db.scalars(select(User.id).where(User.id.in_(ids), User.role == "student")))
+
+
+def enroll_students(
+    db: Session,
+    course_id: int,
+    student_ids: List[UUID],
+    chunk_size: int = ENROLLMENT_CHUNK_SIZE
+) -> dict:
+    """Enroll many students in one course, one validation query and INSERT per chunk"""
+    result = _new_result()
+    for start in range(0, len(student_ids), chunk_size):
+        chunk = student_ids[start:start + chunk_size]
+        valid = _student_ids(db, set(chunk))
+        pairs = []
+        for offset, student_id in enumerate(chunk):
+            if student_id in valid:
+                pairs.append((course_id, student_id))
+            else:
+                _reject(result, start + offset + 1, "Student not found")
+        enrolled = insert_enrollments(db, pairs)
+        result["enrolled"] += enrolled
+        result["skipped"] += len(pairs) - enrolled
+    return result
+
+
+class _RosterResolver:
+    """Batched course / student lookups, with course refs cached across chunks"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.course_by_code: Dict[str, Optional[int]] = {}
+        self.course_ids: Dict[int, bool] = {}
+
+    def resolve_courses(self, codes: set, ids: set):
+        missing_codes = codes - self.course_by_code.keys()
+        if missing_codes:
+            self.course_by_code.update(dict.fromkeys(missing_codes))
+            self.course_by_code.update(
+                self.db.execute(
+                    select(func.lower(Course.code), Course.id).where(func.lower(Course.code).in_(missing_codes))
+                ).all()
+            )
+        missing_ids = ids - self.course_ids.keys()
+        if missing_ids:
+            self.course_ids.update(dict.fromkeys(missing_ids, False))
+            self.course_ids.update(
+                (course_id, True)
+                for course_id in self.db.scalars(select(Course.id).where(Course.id.in_(missing_ids)))
+            )
+
+    def students_by_email(self, emails: set) -> Dict[str, UUID]:
+        if not emails:
+            return {}
+        return dict(
+            self.db.execute(
+                select(func.lower(User.email), User.id).where(
+                    func.lower(User.email).in_(emails),
+                    User.role == "student"
+                )
+            ).all()
+        )
+
+
+def _parse_roster_row(record: dict) -> Tuple[Optional[str], Optional[int], Optional[str], Optional[UUID], Optional[str]]:
+    """(course_code, course_id, student_email, student_id, error) for one CSV record"""
+    course_code = (record.get("course_code") or "").lower() or None
+    student_email = (record.get("student_email") or "").lower() or None
+    course_id = None
+    student_id = None
+    try:
+        if record.get("course_id"):
+            course_id = int(record["course_id"])
+        if record.get("student_id"):
+            student_id = UUID(record["student_id"])
+    except ValueError:
+        return None, None, None, None, "Malformed course_id or student_id"
+
+    if course_code is None and course_id is None:
+        return None, None, None, None, "course_code or course_id is required"
+    if student_email is None and student_id is None:
+        return None, None, None, None, "student_email or student_id is required"
+    return course_code, course_id, student_email, student_id, None
+
+
+def _import_chunk(db: Session, resolver: _RosterResolver, records: List[Tuple[int, dict]], result: dict):
+    parsed = []
+    for line, record in records:
+        course_code, course_id, student_email, student_id, error = _parse_roster_row(record)
+        if error:
+            _reject(result, line, error)
+        else:
+            parsed.append((line, course_code, course_id, student_email, student_id))
+
+    resolver.resolve_courses(
+        {code for _, code, course_id, _, _ in parsed if course_id is None},
+        {course_id for _, _, course_id, _, _ in parsed if course_id is not None},
+    )
+    by_email = resolver.students_by_email(
+        {email for _, _, _, email, student_id in parsed if student_id is None}
+    )
+    known_ids = _student_ids(db, {student_id for *_, student_id in parsed if student_id is not None})
+
+    pairs = []
+    for line, course_code, course_id, student_email, student_id in parsed:
+        if course_id is None:
+            course_id = resolver.course_by_code.get(course_code)
+        elif not resolver.course_ids.get(course_id):
+            course_id = None
+        if course_id is None:
+            _reject(result, line, "Course not found")
+            continue
+
+        if student_id is None:
+            student_id = by_email.get(student_email)
+        elif student_id not in known_ids:
+            student_id = None
+        if student_id is None:
+            _reject(result, line, "Student not found")
+            continue
+
+        pairs.append((course_id, student_id))
+
+    enrolled = insert_enrollments(db, pairs)
+    result["enrolled"] += enrolled
+    result["skipped"] += len(pairs) - enrolled
+
+
+async def import_roster(
+    db: Session,
+    records: AsyncIterator[Tuple[int, dict]],
+    chunk_size: int = ENROLLMENT_CHUNK_SIZE
+) -> dict:
+    """
+    Enroll students from a streamed multi-course roster
+
+    Records (from csv_import.iter_csv_records) carry course_code or course_id
+    and student_email or student_id. They are processed in chunks: course
+    and student references are resolved with one lookup each, then the chunk
+    is inserted and committed. Rows already enrolled count as skipped;
+    unresolvable rows as invalid.
+    """
+    result = _new_result()
+    resolver = _RosterResolver(db)
+    chunk = []
+    async for line, record in records:
+        chunk.append((line, record))
+        if len(chunk) >= chunk_size:
+            _import_chunk(db, resolver, chunk, result)
+            chunk = []
+    if chunk:
+        _import_chunk(db, resolver, chunk, result)
+    result["errors"].sort(key=lambda error: error["row"])
+    return result
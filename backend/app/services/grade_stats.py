@@ -0,0 +1,191 @@
+"""
+Grade Statistics Service
+Vectorized per-assignment and per-course grade distributions
+"""
+
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Assignment
+from app.services.gradebook import build_gradebook
+from app.services.metrics import record_cache
+
+settings = get_settings()
+
+# (minimum percentage, letter, grade points), highest first
+LETTER_SCALE = [
+    (93, "A", 4.0),
+    (90, "A-", 3.7),
+    (87, "B+", 3.3),
+    (83, "B", 3.0),
+    (80, "B-", 2.7),
+    (77, "C+", 2.3),
+    (73, "C", 2.0),
+    (70, "C-", 1.7),
+    (67, "D+", 1.3),
+    (63, "D", 1.0),
+    (60, "D-", 0.7),
+    (0, "F", 0.0),
+]
+
+
+def letter_grade(percentage: float) -> Tuple[str, float]:
+    """(letter, grade points) for a percentage on LETTER_SCALE"""
+    for minimum, letter, points in LETTER_SCALE:
+        if percentage >= minimum:
+            return letter, points
+    return LETTER_SCALE[-1][1], LETTER_SCALE[-1][2]
+
+
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_EDGES = np.linspace(0, 100, 11)
+
+# Ascending thresholds so searchsorted maps a percentage to its scale position
+_LETTER_THRESHOLDS = np.array([minimum for minimum, _, _ in reversed(LETTER_SCALE)], dtype=float)
+_LETTERS = [letter for _, letter, _ in reversed(LETTER_SCALE)]
+
+
+class _StatsCache:
+    """Per-process cache, invalidated on grade writes and bounded by a TTL"""
+
+    def __init__(self):
+        self._entries: Dict[Tuple[str, int], Tuple[float, dict]] = {}
+
+    def get(self, key: Tuple[str, int]) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] > settings.GRADE_STATS_CACHE_SECONDS:
+            self._entries.pop(key, None)
+            entry = None
+        record_cache("grade_stats", entry is not None)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: Tuple[str, int], value: dict):
+        self._entries[key] = (time.monotonic(), value)
+
+    def invalidate(self, key: Tuple[str, int]):
+        self._entries.pop(key, None)
+
+
+_cache = _StatsCache()
+
+
+def invalidate_grade_statistics(assignment_id: Optional[int] = None, course_id: Optional[int] = None):
+    """Drop cached statistics after a grade write"""
+    if assignment_id is not None:
+        _cache.invalidate(("assignment", assignment_id))
+    if course_id is not None:
+        _cache.invalidate(("course", course_id))
+
+
+def _round(value) -> float:
+    return round(float(value), 2)
+
+
+def summarize(values: np.ndarray, percentages: np.ndarray) -> dict:
+    """
+    Summary statistics over `values`; histogram and letters over `percentages`
+    """
+    if values.size == 0:
+        return {
+            "count": 0,
+            "mean": None,
+            "median": None,
+            "std_dev": None,
+            "min": None,
+            "max": None,
+            "percentiles": {},
+            "histogram": [],
+            "letter_distribution": {},
+        }
+
+    percentile_values = np.percentile(values, PERCENTILES)
+    histogram, _ = np.histogram(np.clip(percentages, 0, 100), bins=HISTOGRAM_EDGES)
+    letter_index = np.searchsorted(_LETTER_THRESHOLDS, percentages, side="right") - 1
+    letter_counts = np.bincount(np.clip(letter_index, 0, None), minlength=len(_LETTERS))
+
+    return {
+        "count": int(values.size),
+        "mean": _round(values.mean()),
+        "median": _round(np.median(values)),
+        "std_dev": _round(values.std()),
+        "min": _round(values.min()),
+        "max": _round(values.max()),
+        "percentiles": {f"p{p}": _round(v) for p, v in zip(PERCENTILES, percentile_values)},
+        "histogram": [
+            {"range": f"{int(low)}-{int(high)}", "count": int(count)}
+            for low, high, count in zip(HISTOGRAM_EDGES[:-1], HISTOGRAM_EDGES[1:], histogram)
+        ],
+        "letter_distribution": {
+            letter: int(count) for letter, count in zip(reversed(_LETTERS), letter_counts[::-1])
+        },
+    }
+
+
+def _score_matrix(gradebook: dict) -> np.ndarray:
+    """Student x assignment matrix of the gradebook's cells, NaN where ungraded"""
+    return np.array(
+        [[np.nan if score is None else score for score in s["scores"]] for s in gradebook["students"]],
+        dtype=float,
+    ).reshape(len(gradebook["students"]), len(gradebook["assignments"]))
+
+
+def _assignment_summary(assignment: dict, column: np.ndarray) -> dict:
+    grades = column[~np.isnan(column)]
+    max_points = assignment["max_points"]
+    percentages = grades / max_points * 100 if max_points else np.zeros_like(grades)
+    return {
+        "assignment_id": assignment["id"],
+        "max_points": max_points,
+        **summarize(grades, percentages),
+    }
+
+
+def assignment_statistics(db: Session, assignment: Assignment) -> dict:
+    """Distribution of one assignment's gradebook column (points), as in course_statistics"""
+    key = ("assignment", assignment.id)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    gradebook = build_gradebook(db, assignment.course_id)
+    column = next(index for index, a in enumerate(gradebook["assignments"]) if a["id"] == assignment.id)
+    result = _assignment_summary(gradebook["assignments"][column], _score_matrix(gradebook)[:, column])
+    _cache.set(key, result)
+    return result
+
+
+def course_statistics(db: Session, course_id: int) -> dict:
+    """
+    Distribution of weighted course percentages per student, plus per-assignment
+    summaries, over the gradebook's cells and totals (late-penalised submission
+    grades overridden by recorded Grade points of enrolled students)
+
+    assignment_statistics reads the same columns, so an assignment's entry
+    here matches its own statistics.
+    """
+    key = ("course", course_id)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    gradebook = build_gradebook(db, course_id)
+    students = gradebook["students"]
+
+    percentages = np.array(
+        [s["weighted_percentage"] for s in students if s["weighted_percentage"] is not None],
+        dtype=float,
+    )
+    result = {"course_id": course_id, "assignments": [], "students": summarize(percentages, percentages)}
+
+    scores = _score_matrix(gradebook)
+    for column, assignment in sorted(enumerate(gradebook["assignments"]), key=lambda item: item[1]["id"]):
+        summary = _assignment_summary(assignment, scores[:, column])
+        if assignment["max_points"] and summary["count"]:
+            result["assignments"].append(summary)
+
+    _cache.set(key, result)
+    return result
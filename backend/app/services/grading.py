@@ -0,0 +1,113 @@
+"""
+Grading Service
+Set-wise validation and application of bulk grade updates
+"""
+
+from datetime import datetime, timezone
+from typing import List, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Assignment, Submission, User
+from app.schemas import BulkGradeItem, BulkGradeError
+from app.services.grade_stats import invalidate_grade_statistics
+from app.services.lateness import EFFECTIVE_GRADE, apply_late_penalties
+from app.services.transcript import refresh_course_results
+
+
+def apply_bulk_grades(
+    db: Session,
+    assignment: Assignment,
+    items: List[Tuple[int, BulkGradeItem]],
+    grader_id: UUID
+) -> Tuple[List[Tuple[UUID, int]], List[BulkGradeError]]:
+    """
+    Grade many submissions of one assignment
+
+    Submissions referenced by id, student id or student email are resolved
+    in one query, grades are checked against max_points, and every valid row
+    is written with a single executemany UPDATE, followed by the late-penalty
+    evaluation of the same students. Invalid rows are reported and skipped
+    without aborting the batch.
+
+    Returns ([(student_id, grade), ...] for updated rows, errors), where
+    grade is the effective grade after any late penalty.
+    """
+    errors: List[BulkGradeError] = []
+    graded: List[Tuple[UUID, int]] = []
+
+    submission_ids = {item.submission_id for _, item in items if item.submission_id is not None}
+    student_ids = {item.student_id for _, item in items if item.student_id is not None}
+    emails = {item.student_email.lower() for _, item in items if item.student_email}
+
+    by_id = {}
+    by_student = {}
+    by_email = {}
+    if submission_ids or student_ids or emails:
+        rows = db.execute(
+            select(Submission.id, Submission.student_id, func.lower(User.email))
+            .join(User, User.id == Submission.student_id)
+            .where(
+                Submission.assignment_id == assignment.id,
+                or_(
+                    Submission.id.in_(submission_ids),
+                    Submission.student_id.in_(student_ids),
+                    func.lower(User.email).in_(emails)
+                )
+            )
+        )
+        for submission_id, student_id, email in rows:
+            by_id[submission_id] = student_id
+            by_student[student_id] = submission_id
+            by_email[email] = submission_id
+
+    now = datetime.now(timezone.utc)
+    updates = {}
+    for row, item in items:
+        if item.submission_id is not None:
+            submission_id = item.submission_id if item.submission_id in by_id else None
+        elif item.student_id is not None:
+            submission_id = by_student.get(item.student_id)
+        else:
+            submission_id = by_email.get(item.student_email.lower())
+
+        if submission_id is None:
+            errors.append(BulkGradeError(row=row, detail="Submission not found for this assignment"))
+            continue
+        if item.grade > assignment.max_points:
+            errors.append(BulkGradeError(
+                row=row,
+                detail=f"Grade cannot exceed maximum points ({assignment.max_points})"
+            ))
+            continue
+        if submission_id in updates:
+            errors.append(BulkGradeError(row=row, detail="Submission graded more than once in this batch"))
+            continue
+
+        values = {
+            "id": submission_id,
+            "grade": item.grade,
+            "status": "graded",
+            "graded_by": grader_id,
+            "graded_at": now,
+        }
+        if item.feedback is not None:
+            values["feedback"] = item.feedback
+        updates[submission_id] = values
+
+    if updates:
+        # ORM bulk UPDATE by primary key: one executemany per distinct key set
+        db.execute(update(Submission), list(updates.values()))
+        apply_late_penalties(db, assignment, [by_id[sid] for sid in updates], commit=False)
+        db.commit()
+        invalidate_grade_statistics(assignment.id, assignment.course_id)
+
+        # Read back what students see: the grade after the late penalty
+        graded = list(db.execute(
+            select(Submission.student_id, EFFECTIVE_GRADE).where(Submission.id.in_(updates))
+        ).tuples())
+        refresh_course_results(db, assignment.course_id, [student_id for student_id, _ in graded])
+
+    return graded, errors
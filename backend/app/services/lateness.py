@@ -0,0 +1,124 @@
+"""
+Lateness Service
+Evaluates submissions against (extended) due dates and stores penalised grades
+"""
+
+import math
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Collection, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Assignment, AssignmentExtension, Submission
+
+# Score used by gradebooks and statistics; rows never evaluated fall back to the raw grade
+EFFECTIVE_GRADE = func.coalesce(Submission.effective_grade, Submission.grade)
+
+DAY = timedelta(days=1)
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalise to an aware UTC datetime; naive values (e.g. from SQLite) are UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def effective_due_date(db: Session, assignment: Assignment, student_id: UUID) -> Optional[datetime]:
+    """The student's extended due date if one was granted, else the assignment's"""
+    extended = db.scalar(
+        select(AssignmentExtension.due_date).where(
+            AssignmentExtension.assignment_id == assignment.id,
+            AssignmentExtension.student_id == student_id
+        )
+    )
+    return as_utc(extended or assignment.due_date)
+
+
+def days_late(submitted_at: Optional[datetime], due_date: Optional[datetime]) -> int:
+    """Started days between the due date and the submission (0 if on time)"""
+    if submitted_at is None or due_date is None:
+        return 0
+    overdue = as_utc(submitted_at) - as_utc(due_date)
+    if overdue <= timedelta(0):
+        return 0
+    return math.ceil(overdue / DAY)
+
+
+def penalised_grade(grade: Optional[int], late_days: int, penalty_percent: Optional[int]) -> Optional[int]:
+    """Grade less `penalty_percent` per started day late, floored at zero"""
+    if grade is None:
+        return None
+    penalty = min(100, late_days * (penalty_percent or 0))
+    value = Decimal(grade) * (100 - penalty) / 100
+    return int(value.quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def evaluate(
+    assignment: Assignment,
+    submitted_at: Optional[datetime],
+    grade: Optional[int],
+    extended_due: Optional[datetime] = None
+) -> Tuple[int, Optional[int]]:
+    """(days late, effective grade) for one submission"""
+    late_days = days_late(submitted_at, extended_due or assignment.due_date)
+    return late_days, penalised_grade(grade, late_days, assignment.late_penalty_percent)
+
+
+def apply_late_penalties(
+    db: Session,
+    assignment: Assignment,
+    student_ids: Optional[Collection[UUID]] = None,
+    commit: bool = True
+) -> int:
+    """
+    Re-evaluate the submissions of an assignment (optionally only some students)
+
+    Submissions and their extensions are read in one query and only rows whose
+    lateness or effective grade changed are written, with a single executemany
+    UPDATE. Ungraded submissions also get their submitted/late status fixed up.
+    Returns the number of submissions updated.
+    """
+    query = (
+        select(
+            Submission.id, Submission.submitted_at, Submission.grade, Submission.status,
+            Submission.days_late, Submission.effective_grade, AssignmentExtension.due_date
+        )
+        .outerjoin(
+            AssignmentExtension,
+            and_(
+                AssignmentExtension.assignment_id == Submission.assignment_id,
+                AssignmentExtension.student_id == Submission.student_id
+            )
+        )
+        .where(Submission.assignment_id == assignment.id)
+    )
+    if student_ids is not None:
+        query = query.where(Submission.student_id.in_(student_ids))
+
+    updates = []
+    for submission_id, submitted_at, grade, status, current_days, current_effective, extended_due in db.execute(query):
+        late_days, effective = evaluate(assignment, submitted_at, grade, extended_due)
+        values = {}
+        if late_days != current_days:
+            values["days_late"] = late_days
+        if effective != current_effective:
+            values["effective_grade"] = effective
+        if status in ("submitted", "late"):
+            expected_status = "late" if late_days else "submitted"
+            if status != expected_status:
+                values["status"] = expected_status
+        if values:
+            values["id"] = submission_id
+            updates.append(values)
+
+    if updates:
+        db.execute(update(Submission), updates)
+    if commit:
+        db.commit()
+    return len(updates)
@@ -0,0 +1,206 @@
+"""
+Metrics Service
+Prometheus metrics: request latency and counts, in-flight requests, DB pool
+usage, cache hit rates and event-loop lag
+
+Works across uvicorn workers when PROMETHEUS_MULTIPROC_DIR points at an
+empty directory shared by the workers (prometheus_client multiprocess
+mode); otherwise each worker reports its own numbers.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+        generate_latest, multiprocess
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+settings = get_settings()
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+if PROMETHEUS_AVAILABLE:
+    REQUESTS = Counter(
+        "http_requests_total", "HTTP requests by route and status", ["method", "route", "status"]
+    )
+    LATENCY = Histogram(
+        "http_request_duration_seconds", "HTTP request latency by route", ["method", "route"],
+        buckets=LATENCY_BUCKETS
+    )
+    IN_FLIGHT = Gauge(
+        "http_requests_in_flight", "Requests being handled", multiprocess_mode="livesum"
+    )
+    POOL_CHECKED_OUT = Gauge(
+        "db_pool_checked_out", "Connections checked out of the pool", multiprocess_mode="livesum"
+    )
+    POOL_OVERFLOW = Gauge(
+        "db_pool_overflow", "Connections open beyond pool_size", multiprocess_mode="livesum"
+    )
+    POOL_WAIT = Histogram(
+        "db_pool_wait_seconds", "Time spent waiting for a pool connection", buckets=WAIT_BUCKETS
+    )
+    CACHE_REQUESTS = Counter(
+        "cache_requests_total", "In-process cache lookups", ["cache", "result"]
+    )
+    LOOP_LAG = Histogram(
+        "event_loop_lag_seconds", "How late the event loop ran a timer", buckets=LAG_BUCKETS
+    )
+
+# Label children are looked up once and reused: labels() takes the metric's lock
+_request_children: Dict[Tuple[str, str, str], tuple] = {}
+_cache_children: Dict[Tuple[str, bool], object] = {}
+
+
+def _request_metrics(method: str, route: str, status: str) -> tuple:
+    children = _request_children.get((method, route, status))
+    if children is None:
+        children = _request_children[(method, route, status)] = (
+            REQUESTS.labels(method, route, status), LATENCY.labels(method, route)
+        )
+    return children
+
+
+def record_cache(cache: str, hit: bool):
+    """Count one lookup in an in-process cache"""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    counter = _cache_children.get((cache, hit))
+    if counter is None:
+        counter = _cache_children[(cache, hit)] = CACHE_REQUESTS.labels(cache, "hit" if hit else "miss")
+    counter.inc()
+
+
+def install_pool_metrics(engine: Engine):
+    """Track checked-out and overflow connections, and time spent waiting for one"""
+    if not PROMETHEUS_AVAILABLE:
+        return
+
+    def update(*_):
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            POOL_CHECKED_OUT.set(pool.checkedout())
+        if hasattr(pool, "overflow"):
+            POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    def time_waits(pool):
+        acquire = pool._do_get
+
+        def timed_acquire():
+            started = time.perf_counter()
+            try:
+                return acquire()
+            finally:
+                POOL_WAIT.observe(time.perf_counter() - started)
+
+        pool._do_get = timed_acquire
+
+    event.listen(engine, "checkout", update)
+    event.listen(engine, "checkin", update)
+    # dispose() replaces the pool; wrap the new one too
+    event.listen(engine, "engine_disposed", lambda _: time_waits(engine.pool))
+    time_waits(engine.pool)
+
+
+class MetricsMiddleware:
+    """
+    Request count by status, latency by route template and in-flight requests
+
+    Routes are labelled by their template (/courses/{course_id}), so label
+    cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not PROMETHEUS_AVAILABLE:
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT.dec()
+            route = scope.get("route")
+            requests, latency = _request_metrics(
+                scope["method"], route.path if route is not None else "unmatched", status
+            )
+            requests.inc()
+            latency.observe(time.perf_counter() - started)
+
+
+class LoopLagMonitor:
+    """Sleeps for a fixed interval and records how much later than asked it woke up"""
+
+    def __init__(self, interval: float = settings.METRICS_LOOP_LAG_INTERVAL_SECONDS):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if PROMETHEUS_AVAILABLE and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="loop-lag-monitor")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            LOOP_LAG.observe(max(loop.time() - started - self.interval, 0.0))
+
+
+loop_lag_monitor = LoopLagMonitor()
+
+
+def mark_worker_stopped():
+    """Drop this worker's live gauges from the shared multiprocess files"""
+    if PROMETHEUS_AVAILABLE and MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def render_metrics() -> Optional[bytes]:
+    """The Prometheus text exposition, aggregated over workers in multiprocess mode"""
+    if not PROMETHEUS_AVAILABLE:
+        return None
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -3,11 +3,14 @@ Notification Service
 Handles creating notifications for users
 """
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import List, Tuple
 from uuid import UUID
 
 from app.models import Notification, User
+from app.services.tracing import current_span, traced
 
 
 def create_notification(
@@ -41,6 +44,7 @@ def create_notification(
     return notification
 
 
+@traced("notification.fan_out")
 def notify_course_students(
     db: Session,
     course_id: int,
@@ -58,6 +62,8 @@ def notify_course_students(
     enrollments = db.query(CourseEnrollment).filter(
         CourseEnrollment.course_id == course_id
     ).all()
+    if span := current_span():
+        span.set("recipients", len(enrollments))
     
     for enrollment in enrollments:
         if exclude_user_id and str(enrollment.student_id) == str(exclude_user_id):
@@ -106,18 +112,83 @@ def notify_grade_posted(
     """
     Notify student about a posted grade
     """
-    percentage = (grade / max_points) * 100
-    
     create_notification(
         db=db,
         user_id=student_id,
         title="Grade Posted",
-        message=f"Your grade for '{assignment_title}' has been posted: {grade}/{max_points} ({percentage:.1f}%)",
+        message=_grade_posted_message(assignment_title, grade, max_points),
         type="grade",
         action_url="/grades"
     )
 
 
+@traced("notification.fan_out")
+def notify_grades_posted(
+    db: Session,
+    assignment_title: str,
+    max_points: int,
+    grades: List[Tuple[UUID, int]]
+):
+    """
+    Notify many students about posted grades with a single INSERT
+    """
+    if not grades:
+        return
+    if span := current_span():
+        span.set("recipients", len(grades))
+    
+    db.execute(insert(Notification), [
+        {
+            "user_id": student_id,
+            "title": "Grade Posted",
+            "message": _grade_posted_message(assignment_title, grade, max_points),
+            "type": "grade",
+            "action_url": "/grades",
+            "read": False
+        }
+        for student_id, grade in grades
+    ])
+    db.commit()
+
+
+def _grade_posted_message(assignment_title: str, grade: int, max_points: int) -> str:
+    percentage = (grade / max_points) * 100 if max_points else 0
+    return f"Your grade for '{assignment_title}' has been posted: {grade}/{max_points} ({percentage:.1f}%)"
+
+
+@traced("notification.fan_out")
+def notify_due_soon(
+    db: Session,
+    reminders: List[Tuple[UUID, int, str, datetime]],
+    lead_hours: int
+):
+    """
+    Remind students of unsubmitted assignments with a single INSERT
+
+    `reminders` holds (student_id, assignment_id, assignment_title, due_date).
+    """
+    if not reminders:
+        return
+    if span := current_span():
+        span.set("recipients", len(reminders))
+    
+    when = "in 1 hour" if lead_hours == 1 else f"in {lead_hours} hours"
+    db.execute(insert(Notification), [
+        {
+            "user_id": student_id,
+            "title": "Assignment Due Soon",
+            "message": f"'{title}' is due {when} ({due_date.strftime('%Y-%m-%d %H:%M')} UTC) and you have not submitted yet",
+            "type": "assignment",
+            "reference_type": "assignment",
+            "reference_id": assignment_id,
+            "action_url": "/assignments",
+            "read": False
+        }
+        for student_id, assignment_id, title, due_date in reminders
+    ])
+    db.commit()
+
+
 def notify_attendance_marked(
     db: Session,
     student_id: UUID,
@@ -0,0 +1,455 @@
+"""
+Omnibox Service
+In-process inverted index over announcement and assignment text
+
+Postings are stored per term as two parallel arrays, doc numbers ('I') and
+field-weighted term frequencies ('B'), sorted by doc number. A document gets
+a fresh, increasing number whenever it is (re)indexed, so incremental updates
+from the routers are appends and the only in-place edits are removals. The
+last query token matches as a prefix for type-ahead; hits are ranked by BM25.
+
+Each API worker holds its own copy. Writes made through a worker's routers
+are applied immediately, rows changed elsewhere (other workers, the
+scheduler) are picked up by updated_at every OMNIBOX_SYNC_SECONDS, and hits
+are re-read from the database before they are returned, so deleted or
+no-longer-visible rows never leak.
+"""
+
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Collection, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import Announcement, Assignment, Course, CourseEnrollment, Department, User
+from app.services.lateness import as_utc
+from app.services.search import tokenize
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+ADMIN_ROLES = ("admin", "super-admin")
+KINDS = ("announcement", "assignment")
+
+MAX_PREFIX_EXPANSIONS = 64
+SNIPPET_LENGTH = 160
+TITLE_WEIGHT = 3
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+# Re-read rows changed slightly before the watermark: a transaction can commit
+# an updated_at older than rows that were already seen
+_SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ============== Documents ==============
+
+class Document:
+    """What the index keeps per row: its terms and the fields visibility needs"""
+
+    __slots__ = (
+        "kind", "id", "terms", "length", "updated_at", "course_id", "is_published",
+        "target_roles", "target_courses", "target_departments", "expires_at"
+    )
+
+    def __init__(self, kind: str, id: int, updated_at=None, course_id=None, is_published=True,
+                 target_roles=(), target_courses=None, target_departments=None, expires_at=None):
+        self.kind = kind
+        self.id = id
+        self.terms: Tuple[str, ...] = ()
+        self.length = 0
+        self.updated_at = updated_at
+        self.course_id = course_id
+        self.is_published = is_published
+        self.target_roles = tuple(target_roles or ())
+        self.target_courses = frozenset(target_courses) if target_courses else None
+        self.target_departments = frozenset(target_departments) if target_departments else None
+        self.expires_at = as_utc(expires_at)
+
+
+def _term_weights(*fields: Tuple[Optional[str], int]) -> Dict[str, int]:
+    weights: Dict[str, int] = {}
+    for text, weight in fields:
+        for token in tokenize(text):
+            weights[token] = min(255, weights.get(token, 0) + weight)
+    return weights
+
+
+def announcement_document(row) -> Tuple[Document, Dict[str, int]]:
+    """Document and term weights for an Announcement (ORM object or row)"""
+    document = Document(
+        "announcement", row.id, updated_at=row.updated_at,
+        target_roles=row.target_roles, target_courses=row.target_courses,
+        target_departments=row.target_departments, expires_at=row.expires_at
+    )
+    return document, _term_weights((row.title, TITLE_WEIGHT), (row.content, 1))
+
+
+def assignment_document(row) -> Tuple[Document, Dict[str, int]]:
+    """Document and term weights for an Assignment (ORM object or row)"""
+    document = Document(
+        "assignment", row.id, updated_at=row.updated_at,
+        course_id=row.course_id, is_published=bool(row.is_published)
+    )
+    return document, _term_weights((row.title, TITLE_WEIGHT), (row.description, 1), (row.instructions, 1))
+
+
+# kind -> (model, columns to load, document builder)
+_SOURCES = {
+    "announcement": (
+        Announcement,
+        (Announcement.id, Announcement.title, Announcement.content, Announcement.target_roles,
+         Announcement.target_courses, Announcement.target_departments, Announcement.expires_at,
+         Announcement.updated_at),
+        announcement_document,
+    ),
+    "assignment": (
+        Assignment,
+        (Assignment.id, Assignment.title, Assignment.description, Assignment.instructions,
+         Assignment.course_id, Assignment.is_published, Assignment.updated_at),
+        assignment_document,
+    ),
+}
+
+
+# ============== Visibility ==============
+
+class Viewer:
+    """The caller's role, courses and departments, resolved once per search"""
+
+    __slots__ = ("role", "is_admin", "course_ids", "department_ids")
+
+    def __init__(self, role: str, course_ids: Optional[Set[int]], department_ids: Set[int]):
+        self.role = role
+        self.is_admin = role in ADMIN_ROLES
+        self.course_ids = course_ids  # None: every course
+        self.department_ids = department_ids
+
+    def can_see(self, document: Document, now: datetime) -> bool:
+        if document.kind == "assignment":
+            return document.is_published and (
+                self.course_ids is None or document.course_id in self.course_ids
+            )
+
+        if self.role not in document.target_roles:
+            return False
+        if document.expires_at is not None and document.expires_at <= now:
+            return False
+        if self.is_admin:
+            return True
+        if document.target_courses and self.course_ids.isdisjoint(document.target_courses):
+            return False
+        if document.target_departments and self.department_ids.isdisjoint(document.target_departments):
+            return False
+        return True
+
+
+def load_viewer(db: Session, user: User) -> Viewer:
+    """Courses the user teaches or is enrolled in, and their department ids"""
+    if user.role in ADMIN_ROLES:
+        course_ids = None
+    elif user.role == "faculty":
+        course_ids = set(db.scalars(select(Course.id).where(Course.faculty_id == user.id)))
+    else:
+        course_ids = set(db.scalars(
+            select(CourseEnrollment.course_id).where(CourseEnrollment.student_id == user.id)
+        ))
+
+    department_ids = set()
+    if user.department:
+        department_ids = set(db.scalars(
+            select(Department.id).where(
+                or_(Department.name == user.department, Department.code == user.department)
+            )
+        ))
+    return Viewer(user.role, course_ids, department_ids)
+
+
+# ============== Index ==============
+
+class InvertedIndex:
+    """Term -> postings index with incremental add/remove (not thread-safe)"""
+
+    def __init__(self):
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._docs: Dict[int, Document] = {}
+        self._lengths: Dict[int, int] = {}  # doc number -> length, kept flat for scoring
+        self._numbers: Dict[Tuple[str, int], int] = {}
+        self._next_number = 0
+        self._total_length = 0
+        self._vocabulary: Optional[List[str]] = None  # sorted lazily for prefix lookups
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, document: Document, weights: Dict[str, int]):
+        """Index a document, replacing any previous version of it"""
+        self.remove(document.kind, document.id)
+        number = self._next_number
+        self._next_number += 1
+
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("B"))
+                self._vocabulary = None
+            postings[0].append(number)
+            postings[1].append(weight)
+
+        document.terms = tuple(weights)
+        document.length = sum(weights.values())
+        self._docs[number] = document
+        self._lengths[number] = document.length
+        self._numbers[(document.kind, document.id)] = number
+        self._total_length += document.length
+
+    def remove(self, kind: str, id: int) -> bool:
+        number = self._numbers.pop((kind, id), None)
+        if number is None:
+            return False
+
+        document = self._docs.pop(number)
+        del self._lengths[number]
+        for term in document.terms:
+            numbers, weights = self._postings[term]
+            position = bisect.bisect_left(numbers, number)
+            del numbers[position]
+            del weights[position]
+            if not numbers:
+                del self._postings[term]
+                self._vocabulary = None
+        self._total_length -= document.length
+        return True
+
+    def _expand(self, prefix: str) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        terms = []
+        position = bisect.bisect_left(vocabulary, prefix)
+        while (
+            position < len(vocabulary)
+            and vocabulary[position].startswith(prefix)
+            and len(terms) < MAX_PREFIX_EXPANSIONS
+        ):
+            terms.append(vocabulary[position])
+            position += 1
+        return terms
+
+    def _score(self, terms: List[str]) -> Dict[int, float]:
+        """BM25 per doc number for the best-scoring of `terms`"""
+        lengths = self._lengths
+        total = len(lengths)
+        base = _BM25_K1 * (1 - _BM25_B)
+        per_length = _BM25_K1 * _BM25_B / (self._total_length / total or 1)
+        scores: Dict[int, float] = {}
+        for term in terms:
+            numbers, weights = self._postings[term]
+            idf = math.log(1 + (total - len(numbers) + 0.5) / (len(numbers) + 0.5))
+            scale = idf * (_BM25_K1 + 1)
+            for number, weight in zip(numbers, weights):
+                score = scale * weight / (weight + base + per_length * lengths[number])
+                if score > scores.get(number, 0.0):
+                    scores[number] = score
+        return scores
+
+    def search(
+        self, tokens: List[str], visible: Callable[[Document], bool], limit: int
+    ) -> List[Tuple[float, Document]]:
+        """Top `limit` visible documents matching every token, best first"""
+        if not tokens or not self._docs:
+            return []
+
+        per_token = []
+        for position, token in enumerate(tokens):
+            if position == len(tokens) - 1:
+                terms = self._expand(token)
+            else:
+                terms = [token] if token in self._postings else []
+            if not terms:
+                return []
+            per_token.append(self._score(terms))
+
+        per_token.sort(key=len)
+        scores = per_token[0]
+        for other in per_token[1:]:
+            scores = {number: score + other[number] for number, score in scores.items() if number in other}
+
+        docs = self._docs
+        return heapq.nlargest(
+            limit,
+            ((score, docs[number]) for number, score in scores.items() if visible(docs[number])),
+            key=lambda hit: hit[0]
+        )
+
+
+# ============== Service ==============
+
+class Omnibox:
+    """The worker's index plus rebuild, sync and verified search"""
+
+    def __init__(self):
+        self._index = InvertedIndex()
+        self._lock = threading.Lock()
+        self._ready = False
+        self._watermark = None
+        self._synced_at = 0.0
+        self._build_task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    async def start(self, timeout: float = settings.OMNIBOX_REBUILD_TIMEOUT_SECONDS):
+        """Rebuild in a worker thread, waiting at most `timeout` so startup stays bounded"""
+        self._build_task = asyncio.create_task(asyncio.to_thread(self.rebuild))
+        try:
+            await asyncio.wait_for(asyncio.shield(self._build_task), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Search index still building; omnibox search is unavailable until it is ready")
+
+    def retry_build(self):
+        """Start another rebuild if the last one finished without an index (database down at boot)"""
+        if not self._ready and (self._build_task is None or self._build_task.done()):
+            self._build_task = asyncio.create_task(asyncio.to_thread(self.rebuild))
+
+    def rebuild(self):
+        """Build a fresh index from the database and swap it in"""
+        started = time.monotonic()
+        index = InvertedIndex()
+        db = SessionLocal()
+        try:
+            watermark = self._load(db, index)
+        except Exception:
+            logger.exception("Search index rebuild failed")
+            return
+        finally:
+            db.close()
+
+        with self._lock:
+            self._index = index
+            self._watermark = watermark
+            self._synced_at = time.monotonic()
+            self._ready = True
+        logger.info(f"Search index built: {len(index)} documents in {time.monotonic() - started:.2f}s")
+
+    def _load(self, db: Session, index: InvertedIndex, since=None):
+        """Index rows changed since `since` (all rows if None); returns the newest updated_at"""
+        watermark = since
+        for model, columns, build in _SOURCES.values():
+            query = select(*columns)
+            if since is not None:
+                query = query.where(model.updated_at >= since - _SYNC_OVERLAP)
+            for row in db.execute(query.execution_options(yield_per=2000)):
+                index.add(*build(row))
+                if row.updated_at is not None and (watermark is None or row.updated_at > watermark):
+                    watermark = row.updated_at
+        return watermark
+
+    def _sync(self, db: Session):
+        """Pick up rows written by other workers, at most every OMNIBOX_SYNC_SECONDS"""
+        if time.monotonic() - self._synced_at < settings.OMNIBOX_SYNC_SECONDS:
+            return
+        with self._lock:
+            self._synced_at = time.monotonic()
+            self._watermark = self._load(db, self._index, self._watermark)
+
+    # Incremental updates from the routers
+
+    def index_announcement(self, announcement: Announcement):
+        with self._lock:
+            self._index.add(*announcement_document(announcement))
+
+    def index_assignment(self, assignment: Assignment):
+        with self._lock:
+            self._index.add(*assignment_document(assignment))
+
+    def remove(self, kind: str, id: int):
+        with self._lock:
+            self._index.remove(kind, id)
+
+    # Queries
+
+    def search(
+        self,
+        db: Session,
+        user: User,
+        term: str,
+        kinds: Optional[Collection[str]] = None,
+        limit: int = 20
+    ) -> List[dict]:
+        """Announcements and assignments visible to `user` matching `term`, best first"""
+        tokens = tokenize(term)
+        if not tokens:
+            return []
+
+        self._sync(db)
+        viewer = load_viewer(db, user)
+        now = _utcnow()
+
+        def visible(document: Document) -> bool:
+            return (kinds is None or document.kind in kinds) and viewer.can_see(document, now)
+
+        # Over-fetch so hits dropped by verification rarely need another round
+        fetch = limit * 2
+        while True:
+            with self._lock:
+                candidates = self._index.search(tokens, visible, fetch)
+            hits = self._verify(db, candidates, viewer, now)
+            if len(hits) >= limit or len(candidates) < fetch:
+                return hits[:limit]
+            fetch *= 4
+
+    def _verify(self, db: Session, candidates: List[Tuple[float, Document]], viewer: Viewer, now: datetime) -> List[dict]:
+        """Re-read candidate rows, dropping deleted or no longer visible ones"""
+        rows = {}
+        for kind, (model, columns, _) in _SOURCES.items():
+            ids = [document.id for _, document in candidates if document.kind == kind]
+            if ids:
+                for row in db.execute(select(*columns).where(model.id.in_(ids))):
+                    rows[(kind, row.id)] = row
+
+        hits = []
+        for score, document in candidates:
+            row = rows.get((document.kind, document.id))
+            if row is None:
+                self.remove(document.kind, document.id)
+                continue
+
+            if row.updated_at != document.updated_at:
+                fresh, weights = _SOURCES[document.kind][2](row)
+                with self._lock:
+                    self._index.add(fresh, weights)
+                if not viewer.can_see(fresh, now):
+                    continue
+
+            if document.kind == "announcement":
+                snippet = row.content
+            else:
+                snippet = row.description or row.instructions
+            hits.append({
+                "kind": document.kind,
+                "id": row.id,
+                "title": row.title,
+                "snippet": snippet[:SNIPPET_LENGTH] if snippet else None,
+                "course_id": getattr(row, "course_id", None),
+                "score": round(score, 4),
+            })
+        return hits
+
+
+omnibox = Omnibox()
@@ -0,0 +1,193 @@
+"""
+User Provisioning Service
+Bulk account creation from a streamed CSV, resumable and idempotent on email
+"""
+
+import asyncio
+import re
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import dialect_insert
+from app.models import User
+from app.services.resilience import ProviderError, ProviderUnavailable
+from app.services.supabase import get_async_supabase_admin_client
+
+settings = get_settings()
+
+PROVISION_CHUNK_SIZE = 500
+PROVISION_ROLES = ("student", "faculty")
+
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _row(line: int, email: Optional[str], status: str, user_id=None, detail: Optional[str] = None) -> dict:
+    return {"row": line, "email": email, "status": status, "user_id": user_id, "detail": detail}
+
+
+def _parse_user_row(record: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """(account fields, error) for one CSV record"""
+    email = record.get("email")
+    if not email or not _EMAIL.match(email):
+        return None, "A valid email is required"
+    if not record.get("name"):
+        return None, "name is required"
+
+    role = (record.get("role") or "student").lower()
+    if role not in PROVISION_ROLES:
+        return None, f"role must be one of: {', '.join(PROVISION_ROLES)}"
+
+    password = record.get("password")
+    if password is not None and len(password) < 8:
+        return None, "password must be at least 8 characters"
+
+    return {
+        "email": email,
+        "name": record["name"],
+        "role": role,
+        "department": record.get("department"),
+        "phone": record.get("phone"),
+        "password": password,
+    }, None
+
+
+def _email_taken(exc: ProviderError) -> bool:
+    detail = exc.detail.lower()
+    return exc.status_code in (400, 422) and ("email_exists" in detail or "already" in detail)
+
+
+async def _create_auth_user(client, semaphore: asyncio.Semaphore, account: dict) -> Tuple[Optional[UUID], Optional[str]]:
+    """(auth user id, error); an email the provider already has is adopted, not failed"""
+    async with semaphore:
+        try:
+            try:
+                user = await client.create_user(
+                    account["email"],
+                    password=account["password"],
+                    user_metadata={"name": account["name"], "role": account["role"]},
+                )
+            except ProviderError as e:
+                if not _email_taken(e):
+                    raise
+                # Created by an earlier, interrupted run: pick it up
+                user = await client.get_user_by_email(account["email"])
+                if user is None:
+                    raise
+            return UUID(str(user["id"])), None
+        except (ProviderError, ProviderUnavailable, httpx.HTTPError) as e:
+            return None, str(e) or type(e).__name__
+
+
+async def _provision_chunk(
+    db: Session,
+    client,
+    semaphore: asyncio.Semaphore,
+    records: List[Tuple[int, dict]],
+    seen: set,
+    result: dict
+):
+    accounts = []
+    for line, record in records:
+        account, error = _parse_user_row(record)
+        if error is None and account["email"].lower() in seen:
+            error = "Duplicate email in file"
+        if error:
+            result["invalid"] += 1
+            result["rows"].append(_row(line, record.get("email"), "invalid", detail=error))
+            continue
+        seen.add(account["email"].lower())
+        accounts.append((line, account))
+
+    # Rows already in the database are done: re-running a file is safe
+    existing = dict(
+        db.execute(
+            select(func.lower(User.email), User.id).where(
+                func.lower(User.email).in_([account["email"].lower() for _, account in accounts])
+            )
+        ).all()
+    ) if accounts else {}
+
+    pending = []
+    for line, account in accounts:
+        user_id = existing.get(account["email"].lower())
+        if user_id is not None:
+            result["existing"] += 1
+            result["rows"].append(_row(line, account["email"], "existing", user_id))
+        else:
+            pending.append((line, account))
+
+    outcomes = await asyncio.gather(*(_create_auth_user(client, semaphore, account) for _, account in pending))
+
+    values = []
+    created = []
+    for (line, account), (user_id, error) in zip(pending, outcomes):
+        if error:
+            result["failed"] += 1
+            result["rows"].append(_row(line, account["email"], "failed", detail=error))
+            continue
+        values.append({
+            "id": user_id,
+            "email": account["email"],
+            "name": account["name"],
+            "role": account["role"],
+            "department": account["department"],
+            "phone": account["phone"],
+            "is_active": True,
+        })
+        created.append((line, account["email"], user_id))
+
+    inserted = set()
+    if values:
+        inserted = set(db.scalars(
+            dialect_insert(db, User).on_conflict_do_nothing().returning(User.id),
+            values
+        ))
+        db.commit()
+
+    for line, email, user_id in created:
+        # Lost a race with a concurrent signup or provisioning run
+        status = "created" if user_id in inserted else "existing"
+        result[status] += 1
+        result["rows"].append(_row(line, email, status, user_id))
+
+
+async def provision_users(
+    db: Session,
+    records: AsyncIterator[Tuple[int, dict]],
+    client=None,
+    concurrency: int = settings.PROVISION_CONCURRENCY,
+    chunk_size: int = PROVISION_CHUNK_SIZE
+) -> dict:
+    """
+    Create accounts from a streamed CSV (columns: email, name, role,
+    department, phone, password)
+
+    Rows are processed in chunks: emails already in the database are
+    reported as existing, the rest are created with the auth provider's
+    admin API, at most `concurrency` calls in flight, and the chunk's User
+    rows are inserted and committed together. An email the provider already
+    knows (from an interrupted run) is adopted, so a failed import can
+    simply be re-run. Roles are limited to PROVISION_ROLES; rows without a
+    password get an account that must go through password reset.
+    """
+    client = client or get_async_supabase_admin_client()
+    semaphore = asyncio.Semaphore(concurrency)
+    result = {"created": 0, "existing": 0, "invalid": 0, "failed": 0, "rows": []}
+    seen = set()
+
+    chunk = []
+    async for line, record in records:
+        chunk.append((line, record))
+        if len(chunk) >= chunk_size:
+            await _provision_chunk(db, client, semaphore, chunk, seen, result)
+            chunk = []
+    if chunk:
+        await _provision_chunk(db, client, semaphore, chunk, seen, result)
+
+    result["rows"].sort(key=lambda row: row["row"])
+    return result
@@ -0,0 +1,162 @@
+"""
+Query Stats Service
+Per-request SQL statement counts and timings, Server-Timing headers and an
+N+1 detector
+"""
+
+import contextvars
+import heapq
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.services.access_log import current_request_id
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+SLOWEST_KEPT = 3
+
+_PLACEHOLDER = r"\s*(?:\?|%s|:\w+|\$\d+)\s*"
+_IN_LIST = re.compile(rf"\((?:{_PLACEHOLDER},)+{_PLACEHOLDER}\)")
+_WHITESPACE = re.compile(r"\s+")
+
+_request_stats: contextvars.ContextVar[Optional["QueryStats"]] = contextvars.ContextVar(
+    "request_query_stats", default=None
+)
+_trackers: List["QueryStats"] = []
+
+
+class RepeatedQueryError(RuntimeError):
+    """One statement shape ran more than SQL_REPEAT_LIMIT times in a request"""
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace normalized and expanded IN lists collapsed"""
+    return _IN_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """Statements seen in one request (or one tracked block): count, time, slowest, repeats"""
+
+    def __init__(self, repeat_limit: Optional[int] = None):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+        self.repeat_limit = repeat_limit
+        self._slowest: List[Tuple[float, str]] = []
+
+    def record(self, statement: str, seconds: float):
+        shape = statement_shape(statement)
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[shape] += 1
+        if len(self._slowest) < SLOWEST_KEPT:
+            heapq.heappush(self._slowest, (seconds, shape))
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, shape))
+
+        if self.repeat_limit is not None and self.shapes[shape] > self.repeat_limit:
+            raise RepeatedQueryError(
+                f"Statement ran {self.shapes[shape]} times in one request "
+                f"(limit {self.repeat_limit}), likely an N+1: {shape[:300]}"
+            )
+
+    @property
+    def slowest(self) -> List[Tuple[float, str]]:
+        return sorted(self._slowest, reverse=True)
+
+    def most_repeated(self) -> Tuple[Optional[str], int]:
+        if not self.shapes:
+            return None, 0
+        return self.shapes.most_common(1)[0]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: total DB time and count, then the slowest statements"""
+        metrics = [f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"']
+        for rank, (seconds, _) in enumerate(self.slowest, 1):
+            metrics.append(f"db-slow-{rank};dur={seconds * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def report(self) -> str:
+        """Human-readable summary for logs and failed query budgets"""
+        lines = [f"{self.count} statements, {self.seconds * 1000:.1f} ms"]
+        lines += [f"  {seconds * 1000:7.1f} ms  {shape[:200]}" for seconds, shape in self.slowest]
+        lines += [f"  {repeats:>5}x      {shape[:200]}" for shape, repeats in self.shapes.most_common(3) if repeats > 1]
+        return "\n".join(lines)
+
+
+def install_query_stats(engine: Engine):
+    """Time every statement on `engine` and record it for the current request and any trackers"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _started(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finished(conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        for tracker in _trackers:
+            tracker.record(statement, seconds)
+
+
+@contextmanager
+def track_queries(repeat_limit: Optional[int] = None) -> Iterator[QueryStats]:
+    """Collect every statement run inside the block, from any thread (tests and scripts)"""
+    stats = QueryStats(repeat_limit)
+    _trackers.append(stats)
+    try:
+        yield stats
+    finally:
+        _trackers.remove(stats)
+
+
+class QueryStatsMiddleware:
+    """
+    Collect the SQL each request runs
+
+    The totals and slowest durations go out as a Server-Timing header
+    (statement text stays in the logs). Requests over SQL_LOG_QUERY_COUNT
+    statements or SQL_LOG_DB_MS of database time are logged with their
+    slowest and most repeated statements.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(settings.SQL_REPEAT_LIMIT)
+        token = _request_stats.set(stats)
+        # Outer middlewares (the access log) read the totals from the scope
+        scope.setdefault("state", {})["query_stats"] = stats
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            if stats.count > settings.SQL_LOG_QUERY_COUNT or stats.seconds * 1000 > settings.SQL_LOG_DB_MS:
+                logger.warning(
+                    f"SQL for {scope['method']} {scope['path']} "
+                    f"[request_id={current_request_id()}]: {stats.report()}"
+                )
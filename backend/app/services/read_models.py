@@ -0,0 +1,99 @@
+"""
+Read Model Service
+Slotted row objects for read-only endpoints, filled from Core column selects
+"""
+
+from dataclasses import make_dataclass
+from typing import List, Sequence
+
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.orm import Query, aliased
+
+from app.models import Announcement, Attendance, Course, CourseEnrollment, Department, Notification, User
+from app.schemas import (
+    AnnouncementResponse, AttendanceResponse, CourseResponse, DepartmentResponse,
+    NotificationResponse, UserResponse
+)
+from app.services.serialization import schema_columns
+
+
+class ReadModel:
+    """
+    A response schema's columns and a `__slots__` dataclass to hold them
+
+    Fetched rows are plain objects: no mapped instance, no change tracking,
+    nothing kept in the session's identity map until get_db closes it. The
+    prebuilt list adapters validate them like ORM objects.
+    """
+
+    def __init__(self, model, schema: type[BaseModel], extra_fields: Sequence[str] = ()):
+        self.columns = schema_columns(model, schema)
+        self.keys = [column.key for column in self.columns]
+        self.row_type = make_dataclass(f"{model.__name__}Row", self.keys + list(extra_fields), slots=True)
+
+    def select(self):
+        """SELECT of this read model's columns, to refine with filters"""
+        return select(*self.columns)
+
+    def fetch(self, query: Query) -> list:
+        """Run a filtered ORM query for these columns only and wrap each row"""
+        make = self.row_type
+        return [make(*row) for row in query.with_entities(*self.columns)]
+
+
+USER_ROWS = ReadModel(User, UserResponse)
+DEPARTMENT_ROWS = ReadModel(Department, DepartmentResponse)
+ATTENDANCE_ROWS = ReadModel(Attendance, AttendanceResponse)
+ANNOUNCEMENT_ROWS = ReadModel(Announcement, AnnouncementResponse)
+NOTIFICATION_ROWS = ReadModel(Notification, NotificationResponse)
+COURSE_ROWS = ReadModel(Course, CourseResponse, extra_fields=("department", "faculty", "enrolled_count"))
+
+
+def fetch_course_details(query: Query, skip: int, limit: int) -> List:
+    """
+    CourseWithDetails read models for a page of a filtered Course query
+
+    Department, faculty and the enrollment count come from the same
+    statement (outer joins and a correlated count), not per course.
+    """
+    faculty = aliased(User)
+    enrolled_count = (
+        select(func.count(CourseEnrollment.id))
+        .where(CourseEnrollment.course_id == Course.id)
+        .correlate(Course)
+        .scalar_subquery()
+    )
+    rows = (
+        query.outerjoin(Department, Department.id == Course.department_id)
+        .outerjoin(faculty, faculty.id == Course.faculty_id)
+        .with_entities(
+            *COURSE_ROWS.columns,
+            *DEPARTMENT_ROWS.columns,
+            *(getattr(faculty, key) for key in USER_ROWS.keys),
+            enrolled_count
+        )
+        .order_by(Course.id)
+        .offset(skip)
+        .limit(limit)
+    )
+
+    make_course = COURSE_ROWS.row_type
+    make_department = DEPARTMENT_ROWS.row_type
+    make_user = USER_ROWS.row_type
+    course_end = len(COURSE_ROWS.keys)
+    department_end = course_end + len(DEPARTMENT_ROWS.keys)
+    department_id = DEPARTMENT_ROWS.keys.index("id")
+    faculty_id = USER_ROWS.keys.index("id")
+
+    result = []
+    for row in rows:
+        department = row[course_end:department_end]
+        instructor = row[department_end:-1]
+        result.append(make_course(
+            *row[:course_end],
+            make_department(*department) if department[department_id] is not None else None,
+            make_user(*instructor) if instructor[faculty_id] is not None else None,
+            row[-1]
+        ))
+    return result
@@ -0,0 +1,222 @@
+"""
+Resilience primitives for outbound provider calls
+Circuit breaking, retry with jitter and latency histograms
+"""
+
+import asyncio
+import random
+import time
+from bisect import bisect_left
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.services.tracing import end_span, start_span
+
+T = TypeVar("T")
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class ProviderError(Exception):
+    """An upstream provider answered with an error status"""
+
+    def __init__(self, operation: str, status_code: int, detail: str = ""):
+        self.operation = operation
+        self.status_code = status_code
+        self.detail = detail
+        super().__init__(f"{operation} failed with status {status_code}: {detail}")
+
+
+class ProviderUnavailable(Exception):
+    """Raised without calling the provider while its circuit is open"""
+
+    def __init__(self, provider: str, retry_after: float):
+        self.provider = provider
+        self.retry_after = retry_after
+        super().__init__(f"{provider} is unavailable, retry after {retry_after:.1f}s")
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        """Cumulative bucket counts, keyed by upper bound"""
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+        return {"count": self.count, "sum": round(self.total, 6), "buckets": buckets}
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    closed -> open after `failure_threshold` failures in a row,
+    open -> half_open once `reset_timeout` has elapsed,
+    half_open lets a single probe through and closes or re-opens on its outcome.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.total_failures = 0
+        self.total_rejections = 0
+        self._probe_in_flight = False
+
+    def before_call(self):
+        """Raise ProviderUnavailable if the call must not go out"""
+        if self.state == self.OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.reset_timeout:
+                self.total_rejections += 1
+                raise ProviderUnavailable(self.name, self.reset_timeout - elapsed)
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.total_rejections += 1
+                raise ProviderUnavailable(self.name, self.reset_timeout)
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_failures": self.total_failures,
+            "total_rejections": self.total_rejections,
+        }
+
+
+def _always(exc: BaseException) -> bool:
+    return True
+
+
+class ProviderGuard:
+    """
+    Breaker, retry policy and per-operation latency for one provider
+
+    `is_failure` decides whether an exception counts against the breaker
+    (a 4xx answer means the provider is healthy), `retry_if` whether it is
+    worth another attempt.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.1,
+        backoff_cap: float = 2.0,
+        is_failure: Callable[[BaseException], bool] = _always,
+        retry_if: Callable[[BaseException], bool] = _always,
+    ):
+        self.name = name
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.is_failure = is_failure
+        self.retry_if = retry_if
+        self.latency: Dict[str, LatencyHistogram] = {}
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def observe(self, operation: str, seconds: float):
+        histogram = self.latency.get(operation)
+        if histogram is None:
+            histogram = self.latency[operation] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    async def call(
+        self,
+        operation: str,
+        func: Callable[[], Awaitable[T]],
+        retry_if: Optional[Callable[[BaseException], bool]] = None,
+    ) -> T:
+        """Run `func` under the breaker, retrying transient failures"""
+        retry_if = retry_if or self.retry_if
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            attempt_span = start_span(operation, provider=self.name, attempt=attempt)
+            start = time.perf_counter()
+            try:
+                result = await func()
+            except Exception as exc:
+                self.observe(operation, time.perf_counter() - start)
+                end_span(attempt_span, exc)
+                if not self.is_failure(exc):
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or not retry_if(exc):
+                    raise
+                await asyncio.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            self.observe(operation, time.perf_counter() - start)
+            end_span(attempt_span)
+            self.breaker.record_success()
+            return result
+
+    def snapshot(self) -> dict:
+        return {
+            "breaker": self.breaker.snapshot(),
+            "latency": {op: h.snapshot() for op, h in self.latency.items()},
+        }
+
+
+# Registry of guards, one per provider, for operational introspection
+_guards: Dict[str, ProviderGuard] = {}
+
+
+def get_provider_guard(name: str, **kwargs) -> ProviderGuard:
+    """Get or create the guard for a provider"""
+    guard = _guards.get(name)
+    if guard is None:
+        guard = _guards[name] = ProviderGuard(name, **kwargs)
+    return guard
+
+
+def provider_snapshot() -> dict:
+    """Breaker state and latency histograms for every provider"""
+    return {name: guard.snapshot() for name, guard in _guards.items()}
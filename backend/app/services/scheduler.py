@@ -0,0 +1,347 @@
+"""
+Scheduler Service
+In-process runner for recurring jobs with a persisted schedule and leader election
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal, dialect_insert
+from app.models import (
+    Announcement, Assignment, AssignmentReminder, CourseEnrollment,
+    ScheduledJob, SchedulerLease, Submission
+)
+from app.services.lateness import as_utc
+from app.services.notification import notify_due_soon
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+LEADER_LEASE = "scheduler"
+
+# Hours before the due date at which unsubmitted students are reminded
+REMINDER_LEAD_HOURS = (24, 1)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# ============== Jobs ==============
+
+def publish_scheduled_assignments(db: Session, now: datetime) -> int:
+    """Publish assignments whose publish_at has passed"""
+    result = db.execute(
+        update(Assignment)
+        .where(
+            Assignment.is_published == False,
+            Assignment.publish_at.isnot(None),
+            Assignment.publish_at <= now
+        )
+        .values(is_published=True)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def purge_expired_announcements(db: Session, now: datetime) -> int:
+    """Delete announcements past their expires_at"""
+    result = db.execute(
+        delete(Announcement)
+        .where(Announcement.expires_at.isnot(None), Announcement.expires_at <= now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def send_due_reminders(db: Session, now: datetime) -> int:
+    """
+    Remind enrolled students who have not submitted, REMINDER_LEAD_HOURS
+    before the due date
+
+    Each lead time is one query: published assignments due inside the window
+    joined to their enrollments, anti-joined against submissions and the
+    reminders already sent.
+    """
+    sent = 0
+    window_start = now
+    for lead_hours in sorted(REMINDER_LEAD_HOURS):
+        window_end = now + timedelta(hours=lead_hours)
+        rows = db.execute(
+            select(
+                CourseEnrollment.student_id, Assignment.id, Assignment.title, Assignment.due_date
+            )
+            .join(CourseEnrollment, CourseEnrollment.course_id == Assignment.course_id)
+            .where(
+                Assignment.is_published == True,
+                Assignment.due_date > window_start,
+                Assignment.due_date <= window_end,
+                CourseEnrollment.status != "dropped",
+                ~exists().where(
+                    Submission.assignment_id == Assignment.id,
+                    Submission.student_id == CourseEnrollment.student_id
+                ),
+                ~exists().where(
+                    AssignmentReminder.assignment_id == Assignment.id,
+                    AssignmentReminder.student_id == CourseEnrollment.student_id,
+                    AssignmentReminder.lead_hours == lead_hours
+                )
+            )
+        ).all()
+        window_start = window_end
+
+        if not rows:
+            continue
+
+        db.execute(
+            dialect_insert(db, AssignmentReminder).on_conflict_do_nothing(),
+            [
+                {"assignment_id": assignment_id, "student_id": student_id, "lead_hours": lead_hours}
+                for student_id, assignment_id, _, _ in rows
+            ],
+        )
+        notify_due_soon(
+            db,
+            [(student_id, assignment_id, title, as_utc(due_date)) for student_id, assignment_id, title, due_date in rows],
+            lead_hours,
+        )
+        sent += len(rows)
+    return sent
+
+
+@dataclass(frozen=True)
+class Job:
+    func: Callable[[Session, datetime], int]
+    interval_seconds: int
+
+
+JOBS: Dict[str, Job] = {
+    "publish_scheduled_assignments": Job(publish_scheduled_assignments, 60),
+    "send_due_reminders": Job(send_due_reminders, 300),
+    "purge_expired_announcements": Job(purge_expired_announcements, 3600),
+}
+
+
+# ============== Runner ==============
+
+class Scheduler:
+    """
+    Runs JOBS on their persisted schedule
+
+    Every worker process starts one, but only the holder of the leader lease
+    runs jobs; the others keep polling and take over once the lease expires.
+    Due times are kept in a min-heap so the leader sleeps until the next job,
+    and each run is claimed with a compare-and-set on next_run_at so a job
+    never fires twice even across a leadership change.
+    """
+
+    def __init__(
+        self,
+        jobs: Dict[str, Job] = JOBS,
+        poll_seconds: float = settings.SCHEDULER_POLL_SECONDS,
+        lease_seconds: float = settings.SCHEDULER_LEASE_SECONDS
+    ):
+        self.jobs = jobs
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._heap: List[Tuple[datetime, str]] = []
+        self._stopping = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run(), name="scheduler")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._task
+        self._task = None
+        if self.is_leader:
+            await asyncio.to_thread(self._release_lease)
+            self.is_leader = False
+
+    async def _run(self):
+        # Job rows are registered on the first tick that reaches the database,
+        # so an unreachable database delays the scheduler instead of failing boot
+        registered = False
+        while not self._stopping.is_set():
+            try:
+                if not registered:
+                    await asyncio.to_thread(self._register_jobs)
+                    registered = True
+                was_leader = self.is_leader
+                self.is_leader = await asyncio.to_thread(self._acquire_lease)
+                if self.is_leader and not was_leader:
+                    logger.info(f"Scheduler leadership acquired by {self.worker_id}")
+                    self._heap = await asyncio.to_thread(self._load_schedule)
+                if self.is_leader:
+                    await self._run_due_jobs()
+            except Exception:
+                logger.exception("Scheduler tick failed")
+                self.is_leader = False
+
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self._seconds_until_next_tick())
+            except asyncio.TimeoutError:
+                pass
+
+    def _seconds_until_next_tick(self) -> float:
+        # Renew the lease well before it expires
+        wait = min(self.poll_seconds, self.lease_seconds / 3)
+        if self.is_leader and self._heap:
+            wait = min(wait, (self._heap[0][0] - _utcnow()).total_seconds())
+        return max(wait, 0.05)
+
+    async def _run_due_jobs(self):
+        now = _utcnow()
+        while self._heap and self._heap[0][0] <= now and not self._stopping.is_set():
+            _, name = heapq.heappop(self._heap)
+            next_run_at = await asyncio.to_thread(self._run_job, name)
+            if next_run_at is not None:
+                heapq.heappush(self._heap, (next_run_at, name))
+
+    # Blocking helpers, run in a worker thread
+
+    def _register_jobs(self):
+        db = SessionLocal()
+        try:
+            now = _utcnow()
+            db.execute(
+                dialect_insert(db, ScheduledJob).on_conflict_do_nothing(index_elements=["name"]),
+                [
+                    {"name": name, "interval_seconds": job.interval_seconds, "next_run_at": now, "enabled": True}
+                    for name, job in self.jobs.items()
+                ],
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _acquire_lease(self) -> bool:
+        """Take, renew or fail to get the leader lease (atomic on the lease row)"""
+        db = SessionLocal()
+        try:
+            now = _utcnow()
+            expires_at = now + timedelta(seconds=self.lease_seconds)
+            renewed = db.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == LEADER_LEASE,
+                    (SchedulerLease.holder == self.worker_id) | (SchedulerLease.expires_at < now)
+                )
+                .values(holder=self.worker_id, expires_at=expires_at)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not renewed:
+                renewed = db.execute(
+                    dialect_insert(db, SchedulerLease)
+                    .values(name=LEADER_LEASE, holder=self.worker_id, expires_at=expires_at)
+                    .on_conflict_do_nothing(index_elements=["name"])
+                ).rowcount
+            db.commit()
+            return bool(renewed)
+        finally:
+            db.close()
+
+    def _release_lease(self):
+        db = SessionLocal()
+        try:
+            db.execute(
+                delete(SchedulerLease)
+                .where(SchedulerLease.name == LEADER_LEASE, SchedulerLease.holder == self.worker_id)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _load_schedule(self) -> List[Tuple[datetime, str]]:
+        db = SessionLocal()
+        try:
+            heap = [
+                (as_utc(next_run_at), name)
+                for name, next_run_at in db.execute(
+                    select(ScheduledJob.name, ScheduledJob.next_run_at).where(
+                        ScheduledJob.enabled == True,
+                        ScheduledJob.name.in_(list(self.jobs))
+                    )
+                )
+            ]
+            heapq.heapify(heap)
+            return heap
+        finally:
+            db.close()
+
+    def _run_job(self, name: str) -> Optional[datetime]:
+        """Claim and run one due job; returns its next due time (None if disabled)"""
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                select(ScheduledJob.next_run_at, ScheduledJob.interval_seconds, ScheduledJob.enabled)
+                .where(ScheduledJob.name == name)
+            ).first()
+            if row is None or not row.enabled:
+                return None
+
+            now = _utcnow()
+            seen = as_utc(row.next_run_at)
+            if seen > now:
+                return seen
+
+            next_run_at = now + timedelta(seconds=row.interval_seconds)
+            claimed = db.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.name == name, ScheduledJob.next_run_at == row.next_run_at)
+                .values(next_run_at=next_run_at, last_run_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return as_utc(db.scalar(select(ScheduledJob.next_run_at).where(ScheduledJob.name == name)))
+
+            error = None
+            try:
+                result = self.jobs[name].func(db, now)
+                logger.info(f"Scheduled job {name} finished: {result}")
+            except Exception as e:
+                db.rollback()
+                error = str(e)
+                logger.exception(f"Scheduled job {name} failed")
+
+            db.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.name == name)
+                .values(last_error=error)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            return next_run_at
+        finally:
+            db.close()
+
+    def snapshot(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "is_leader": self.is_leader,
+            "next_runs": {name: at.isoformat() for at, name in sorted(self._heap)},
+        }
+
+
+scheduler = Scheduler()
@@ -0,0 +1,214 @@
+"""
+Search Service
+Indexed, relevance-ranked prefix search over users and courses
+
+PostgreSQL uses pg_trgm GIN indexes on a lower-cased search expression, so
+substring and prefix matches are index scans ranked by trigram similarity.
+SQLite uses FTS5 external-content tables kept in sync by triggers, ranked
+with bm25. Other databases fall back to ILIKE, as do PostgreSQL without
+pg_trgm and SQLite without the FTS tables.
+
+The indexes are created by schema.sql or `python -m app.cli init-db`
+(create_search_indexes); the API only checks for them at startup.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import and_, case, column, func, inspect, literal_column, or_, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import Course, User
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# CONCURRENTLY so adding the indexes to a live database does not block writes
+_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_search_trgm ON users "
+    "USING gin (lower(name || ' ' || email) gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_courses_search_trgm ON courses "
+    "USING gin (lower(code || ' ' || name) gin_trgm_ops)",
+]
+
+
+@dataclass(frozen=True)
+class _Index:
+    model: type
+    table: str
+    fts_table: str
+    columns: tuple  # FTS columns, most important first
+    rowid: str  # rowid expression of the source table
+    bm25_weights: str
+    title: object  # column whose prefix matches rank first
+
+    @property
+    def expression(self):
+        """Expression the trigram index is built on; queries must use it verbatim"""
+        first, second = (getattr(self.model, c) for c in self.columns)
+        # The separator is inlined: a bound parameter would not match the index expression
+        return func.lower(first + literal_column("' '") + second)
+
+
+_USERS = _Index(User, "users", "users_fts", ("name", "email"), "rowid", "10.0, 1.0", User.name)
+_COURSES = _Index(Course, "courses", "courses_fts", ("code", "name"), "id", "10.0, 5.0", Course.code)
+
+_fts_ready = False
+_trgm_ready = False
+
+
+def _sqlite_ddl(index: _Index) -> List[str]:
+    source, fts, rowid = index.table, index.fts_table, index.rowid
+    cols = ", ".join(index.columns)
+    new = ", ".join(f"new.{c}" for c in index.columns)
+    old = ", ".join(f"old.{c}" for c in index.columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, "
+        f"content='{source}', content_rowid='{rowid}', tokenize='unicode61')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{rowid}, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{rowid}, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {source} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{rowid}, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{rowid}, {new}); END",
+    ]
+
+
+def create_search_indexes(engine: Engine):
+    """Create the search indexes / FTS tables (idempotent; run after the tables exist)"""
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for statement in _POSTGRES_DDL:
+                conn.execute(text(statement))
+    elif engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            existing = set(inspect(conn).get_table_names())
+            for index in (_USERS, _COURSES):
+                for statement in _sqlite_ddl(index):
+                    conn.execute(text(statement))
+                if index.fts_table not in existing:
+                    fts = index.fts_table
+                    conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    init_search(engine)
+
+
+def init_search(engine: Engine):
+    """Pick the search backend from what the database has (read-only; no DDL)"""
+    global _fts_ready, _trgm_ready
+    try:
+        with engine.connect() as conn:
+            if engine.dialect.name == "postgresql":
+                _trgm_ready = conn.scalar(
+                    text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                ) is not None
+            elif engine.dialect.name == "sqlite":
+                existing = set(inspect(conn).get_table_names())
+                _fts_ready = all(index.fts_table in existing for index in (_USERS, _COURSES))
+    except Exception as e:
+        logger.warning(f"Search indexes could not be checked, falling back to ILIKE: {e}")
+        return
+    if engine.dialect.name in ("postgresql", "sqlite") and not (_trgm_ready or _fts_ready):
+        # Search keeps working through the ILIKE fallback
+        logger.warning("Search indexes missing (run `python -m app.cli init-db`), falling back to ILIKE")
+
+
+def tokenize(term: Optional[str]) -> List[str]:
+    return [token.lower() for token in _TOKEN.findall(term or "")]
+
+
+def _backend(db: Session) -> str:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql" and _trgm_ready:
+        return "trigram"
+    if dialect == "sqlite" and _fts_ready:
+        return "fts"
+    return "like"
+
+
+def _escape_like(token: str) -> str:
+    return token.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _fts_match(index: _Index, tokens: List[str]):
+    # Every token must match, each as a prefix (type-ahead)
+    query = " ".join(f'"{token}"*' for token in tokens)
+    return text(f"{index.fts_table} MATCH :match").bindparams(match=query)
+
+
+def _match(db: Session, index: _Index, tokens: List[str]):
+    """WHERE clause for `tokens` against an index, for use in any query on its table"""
+    backend = _backend(db)
+    if backend == "fts":
+        rowids = select(literal_column("rowid")).select_from(table(index.fts_table)).where(
+            _fts_match(index, tokens)
+        )
+        return literal_column(f"{index.table}.{index.rowid}").in_(rowids)
+    if backend == "trigram":
+        return and_(*(
+            index.expression.like(f"%{_escape_like(token)}%", escape="\\") for token in tokens
+        ))
+    return and_(*(
+        or_(*(getattr(index.model, c).ilike(f"%{_escape_like(token)}%", escape="\\") for c in index.columns))
+        for token in tokens
+    ))
+
+
+def _ranked(db: Session, index: _Index, tokens: List[str]):
+    """SELECT of the index's model matching `tokens`, best matches first"""
+    query = select(index.model)
+    backend = _backend(db)
+    prefix_first = case((func.lower(index.title).startswith(tokens[0], autoescape=True), 0), else_=1)
+    if backend == "fts":
+        fts = table(index.fts_table, column("rowid"))
+        return (
+            query.join(fts, fts.c.rowid == literal_column(f"{index.table}.{index.rowid}"))
+            .where(_fts_match(index, tokens))
+            .order_by(prefix_first, text(f"bm25({index.fts_table}, {index.bm25_weights})"), index.title)
+        )
+
+    query = query.where(_match(db, index, tokens))
+    if backend == "trigram":
+        return query.order_by(
+            prefix_first, func.similarity(index.expression, " ".join(tokens)).desc(), index.title
+        )
+    return query.order_by(prefix_first, index.title)
+
+
+def user_search_filter(db: Session, term: str):
+    """WHERE clause matching users by name/email through the search index"""
+    tokens = tokenize(term)
+    return _match(db, _USERS, tokens) if tokens else User.id.is_(None)
+
+
+def course_search_filter(db: Session, term: str):
+    """WHERE clause matching courses by code/name through the search index"""
+    tokens = tokenize(term)
+    return _match(db, _COURSES, tokens) if tokens else Course.id.is_(None)
+
+
+def search_users(db: Session, term: str, role: Optional[str] = None, limit: int = 20) -> List[User]:
+    """Users matching every search token by name or email, best first"""
+    tokens = tokenize(term)
+    if not tokens:
+        return []
+    query = _ranked(db, _USERS, tokens)
+    if role:
+        query = query.where(User.role == role)
+    return db.scalars(query.limit(limit)).all()
+
+
+def search_courses(db: Session, term: str, active_only: bool = True, limit: int = 20) -> List[Course]:
+    """Courses matching every search token by code or name, best first"""
+    tokens = tokenize(term)
+    if not tokens:
+        return []
+    query = _ranked(db, _COURSES, tokens)
+    if active_only:
+        query = query.where(Course.is_active == True)
+    return db.scalars(query.limit(limit)).all()
@@ -0,0 +1,46 @@
+"""
+Serialization Service
+Fast JSON responses for list endpoints: orjson when installed, prebuilt list adapters
+"""
+
+from typing import Optional, Sequence
+
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row
+
+try:
+    import orjson  # noqa: F401
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Response class for endpoints that return plain data
+DefaultJSONResponse = ORJSONResponse if ORJSON_AVAILABLE else JSONResponse
+
+
+def schema_columns(model, schema: type[BaseModel]) -> list:
+    """The model's columns for each field of a response schema, in schema order"""
+    table_columns = model.__table__.c
+    return [getattr(model, name) for name in schema.model_fields if name in table_columns]
+
+
+def list_response(
+    adapter: TypeAdapter, rows: Sequence, status_code: int = 200, headers: Optional[dict] = None
+) -> Response:
+    """
+    JSON response for `rows` through a prebuilt list adapter
+
+    Rows may be ORM objects, Core rows (select the schema_columns to skip
+    building ORM instances) or mappings. They are validated once and
+    encoded by pydantic-core, bypassing FastAPI's response_model
+    revalidation and jsonable_encoder; the declared response_model still
+    documents the endpoint.
+    """
+    if rows and isinstance(rows[0], Row):
+        # Attribute lookups on Row are slow; plain dicts validate about twice as fast
+        rows = [row._asdict() for row in rows]
+    items = adapter.validate_python(rows, from_attributes=True)
+    return Response(
+        content=adapter.dump_json(items), status_code=status_code, headers=headers, media_type="application/json"
+    )
@@ -7,12 +7,15 @@ import uuid
 from typing import Optional
 from fastapi import UploadFile, HTTPException
 
-from app.services.supabase import get_supabase_admin_client
+from app.services.supabase import get_async_supabase_admin_client
+from app.services.resilience import ProviderUnavailable
+from app.services.tracing import traced
 from app.config import get_settings
 
 settings = get_settings()
 
 
+@traced("storage.upload_file")
 async def upload_file_to_storage(
     file: UploadFile,
     folder: str = "",
@@ -54,17 +57,18 @@ async def upload_file_to_storage(
         path = safe_filename
     
     try:
-        supabase = get_supabase_admin_client()
+        supabase = get_async_supabase_admin_client()
         
         # Upload to Supabase Storage
-        result = supabase.storage.from_(settings.STORAGE_BUCKET).upload(
-            path=path,
-            file=contents,
-            file_options={"content-type": file.content_type}
+        await supabase.upload(
+            settings.STORAGE_BUCKET,
+            path,
+            contents,
+            content_type=file.content_type
         )
         
         # Get public URL
-        url = supabase.storage.from_(settings.STORAGE_BUCKET).get_public_url(path)
+        url = supabase.get_public_url(settings.STORAGE_BUCKET, path)
         
         return {
             "url": url,
@@ -74,6 +78,11 @@ async def upload_file_to_storage(
             "path": path
         }
         
+    except ProviderUnavailable:
+        raise HTTPException(
+            status_code=503,
+            detail="File storage temporarily unavailable"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -86,8 +95,8 @@ async def delete_file_from_storage(file_path: str) -> bool:
     Delete a file from Supabase Storage
     """
     try:
-        supabase = get_supabase_admin_client()
-        supabase.storage.from_(settings.STORAGE_BUCKET).remove([file_path])
+        supabase = get_async_supabase_admin_client()
+        await supabase.remove(settings.STORAGE_BUCKET, [file_path])
         return True
     except Exception as e:
         return False
@@ -102,7 +111,7 @@ async def get_presigned_upload_url(
     Get a presigned URL for direct client-side upload
     """
     try:
-        supabase = get_supabase_admin_client()
+        supabase = get_async_supabase_admin_client()
         
         if folder:
             path = f"{folder}/{file_name}"
@@ -110,9 +119,7 @@ async def get_presigned_upload_url(
             path = file_name
         
         # Create signed upload URL
-        result = supabase.storage.from_(settings.STORAGE_BUCKET).create_signed_upload_url(
-            path=path
-        )
+        result = await supabase.create_signed_upload_url(settings.STORAGE_BUCKET, path)
         
         return {
             "url": result["signedURL"],
@@ -120,6 +127,11 @@ async def get_presigned_upload_url(
             "path": path
         }
         
+    except ProviderUnavailable:
+        raise HTTPException(
+            status_code=503,
+            detail="File storage temporarily unavailable"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1,69 +1,315 @@
 """
 Supabase client configuration
-Supports both real Supabase and mock client for local testing
+Supports both real Supabase and mock clients for local testing; the mocks
+are used when SUPABASE_MOCK is set or SUPABASE_URL is empty
 """
 
-try:
-    from supabase import create_client
-    SUPABASE_AVAILABLE = True
-except ImportError:
-    SUPABASE_AVAILABLE = False
-
+import importlib.util
+import uuid
 from functools import lru_cache
+from typing import List, Optional
+from urllib.parse import parse_qs, quote, urlparse
+
+import httpx
+
 from app.config import get_settings
+from app.services.resilience import ProviderError, get_provider_guard
+
+# The SDK is slow to import and only the sync clients use it; load it on first use
+SUPABASE_AVAILABLE = importlib.util.find_spec("supabase") is not None
 
 settings = get_settings()
 
-if not SUPABASE_AVAILABLE:
-    # Mock implementation for local testing
-    class MockSupabaseClient:
-        def __init__(self, url, key):
-            self.url = url
-            self.key = key
-            self.auth = MockAuth()
-            self.storage = MockStorage()
-
-    class MockAuth:
-        def get_user(self, token):
-            return MockUserResponse()
-        def sign_out(self):
-            pass
-
-    class MockUserResponse:
-        def __init__(self):
-            import uuid
-            from datetime import datetime
-            self.user = type('User', (), {
-                'id': str(uuid.uuid4()),
-                'email': 'local@testing.com',
-                'user_metadata': {'name': 'Local User', 'role': 'admin'},
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            })()
-
-    class MockStorage:
-        def from_(self, bucket):
-            return MockBucket()
-
-    class MockBucket:
-        def upload(self, path, file, file_options=None):
-            return {'path': path}
-        def get_public_url(self, path):
-            return f'http://localhost:8000/files/{path}'
-        def remove(self, paths):
-            return True
-
-    def create_client(url, key):
+def use_mock_supabase() -> bool:
+    """Mock clients when asked to (SUPABASE_MOCK) or when no project is configured"""
+    return settings.SUPABASE_MOCK or not settings.SUPABASE_URL
+
+
+# ============== Mock clients (local development and tests) ==============
+
+class MockSupabaseClient:
+    def __init__(self, url, key):
+        self.url = url
+        self.key = key
+        self.auth = MockAuth()
+        self.storage = MockStorage()
+
+
+class MockAuth:
+    def get_user(self, token):
+        return MockUserResponse()
+
+    def sign_out(self):
+        pass
+
+
+class MockUserResponse:
+    def __init__(self):
+        from datetime import datetime
+        self.user = type('User', (), {
+            'id': str(uuid.uuid4()),
+            'email': 'local@testing.com',
+            'user_metadata': {'name': 'Local User', 'role': 'admin'},
+            'created_at': datetime.now().isoformat(),
+            'updated_at': datetime.now().isoformat()
+        })()
+
+
+class MockStorage:
+    def from_(self, bucket):
+        return MockBucket()
+
+
+class MockBucket:
+    def upload(self, path, file, file_options=None):
+        return {'path': path}
+
+    def get_public_url(self, path):
+        return f'http://localhost:8000/files/{path}'
+
+    def remove(self, paths):
+        return True
+
+
+class MockAsyncSupabaseClient:
+    def __init__(self, url, key):
+        self.url = url
+        self.key = key
+        self.users = {}  # lower-cased email -> auth user
+
+    async def get_user(self, token):
+        user = MockUserResponse().user
+        return {"id": user.id, "email": user.email, "user_metadata": user.user_metadata}
+
+    async def create_user(self, email, password=None, user_metadata=None, email_confirm=True):
+        if email.lower() in self.users:
+            raise ProviderError("auth.admin.create_user", 422, "email_exists")
+        user = {"id": str(uuid.uuid4()), "email": email, "user_metadata": user_metadata or {}}
+        self.users[email.lower()] = user
+        return user
+
+    async def get_user_by_email(self, email):
+        return self.users.get(email.lower())
+
+    async def upload(self, bucket, path, content, content_type=None):
+        return {"Key": f"{bucket}/{path}"}
+
+    def get_public_url(self, bucket, path):
+        return f'http://localhost:8000/files/{path}'
+
+    async def remove(self, bucket, paths):
+        return []
+
+    async def create_signed_upload_url(self, bucket, path):
+        return {"signedURL": f'http://localhost:8000/files/{path}', "token": "mock", "path": path}
+
+
+# ============== Sync SDK clients ==============
+
+def _create_client(url: str, key: str):
+    if use_mock_supabase():
         return MockSupabaseClient(url, key)
+    if not SUPABASE_AVAILABLE:
+        raise RuntimeError("SUPABASE_URL is set but the supabase package is not installed")
+    from supabase import create_client
+    return create_client(url, key)
 
 
 @lru_cache()
 def get_supabase_client():
     """Get Supabase client with anon key"""
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+    return _create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
 
 
 @lru_cache()
 def get_supabase_admin_client():
     """Get Supabase client with service role key (admin access)"""
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+    return _create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+
+
+# ============== Async client layer ==============
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared, pooled HTTP client for all async provider calls"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.SUPABASE_TIMEOUT_SECONDS,
+                connect=settings.SUPABASE_CONNECT_TIMEOUT_SECONDS
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.SUPABASE_POOL_SIZE,
+                max_keepalive_connections=settings.SUPABASE_POOL_SIZE
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client (application shutdown)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _is_provider_failure(exc: BaseException) -> bool:
+    """Transport errors, 5xx and 429 count against the breaker; other 4xx do not"""
+    if isinstance(exc, ProviderError):
+        return exc.status_code >= 500 or exc.status_code == 429
+    return isinstance(exc, httpx.TransportError)
+
+
+def _is_connect_error(exc: BaseException) -> bool:
+    """The request never reached the provider, so even writes are safe to retry"""
+    return isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+
+def _guard(name: str):
+    return get_provider_guard(
+        name,
+        failure_threshold=settings.SUPABASE_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.SUPABASE_BREAKER_RESET_SECONDS,
+        max_retries=settings.SUPABASE_MAX_RETRIES,
+        is_failure=_is_provider_failure,
+        retry_if=_is_provider_failure,
+    )
+
+
+class AsyncSupabaseClient:
+    """
+    Async Supabase REST client
+    Auth and storage calls each run behind their own circuit breaker
+    """
+
+    def __init__(self, url: str, key: str):
+        self.url = url.rstrip("/")
+        self.key = key
+        self.auth_guard = _guard("supabase.auth")
+        self.storage_guard = _guard("supabase.storage")
+
+    async def _request(
+        self,
+        guard,
+        operation: str,
+        method: str,
+        path: str,
+        idempotent: bool = True,
+        headers: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> httpx.Response:
+        request_headers = {"apikey": self.key, "Authorization": f"Bearer {self.key}"}
+        if headers:
+            request_headers.update(headers)
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        async def send() -> httpx.Response:
+            response = await get_http_client().request(
+                method, f"{self.url}{path}", headers=request_headers, **kwargs
+            )
+            if response.status_code >= 400:
+                raise ProviderError(operation, response.status_code, response.text[:200])
+            return response
+
+        return await guard.call(
+            operation, send, retry_if=None if idempotent else _is_connect_error
+        )
+
+    # ----- Auth -----
+
+    async def get_user(self, token: str) -> dict:
+        """Resolve an access token to the Supabase user"""
+        response = await self._request(
+            self.auth_guard, "auth.get_user", "GET", "/auth/v1/user",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        return response.json()
+
+    async def create_user(
+        self,
+        email: str,
+        password: Optional[str] = None,
+        user_metadata: Optional[dict] = None,
+        email_confirm: bool = True
+    ) -> dict:
+        """Create an auth user through the admin API (service role key)"""
+        payload = {"email": email, "email_confirm": email_confirm, "user_metadata": user_metadata or {}}
+        if password:
+            payload["password"] = password
+        response = await self._request(
+            self.auth_guard, "auth.admin.create_user", "POST", "/auth/v1/admin/users",
+            idempotent=False, json=payload
+        )
+        return response.json()
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        """Find an auth user by exact email through the admin API (service role key)"""
+        response = await self._request(
+            self.auth_guard, "auth.admin.list_users", "GET", "/auth/v1/admin/users",
+            params={"filter": email, "per_page": 50}
+        )
+        for user in response.json().get("users", []):
+            if (user.get("email") or "").lower() == email.lower():
+                return user
+        return None
+
+    # ----- Storage -----
+
+    async def upload(self, bucket: str, path: str, content: bytes, content_type: Optional[str] = None) -> dict:
+        response = await self._request(
+            self.storage_guard, "storage.upload", "POST",
+            f"/storage/v1/object/{bucket}/{quote(path)}",
+            idempotent=False,
+            headers={
+                "Content-Type": content_type or "application/octet-stream",
+                "x-upsert": "false"
+            },
+            content=content
+        )
+        return response.json()
+
+    def get_public_url(self, bucket: str, path: str) -> str:
+        """Public object URL (computed locally, no network call)"""
+        return f"{self.url}/storage/v1/object/public/{bucket}/{quote(path)}"
+
+    async def remove(self, bucket: str, paths: List[str]) -> list:
+        response = await self._request(
+            self.storage_guard, "storage.remove", "DELETE",
+            f"/storage/v1/object/{bucket}",
+            json={"prefixes": paths}
+        )
+        return response.json()
+
+    async def create_signed_upload_url(self, bucket: str, path: str) -> dict:
+        response = await self._request(
+            self.storage_guard, "storage.create_signed_upload_url", "POST",
+            f"/storage/v1/object/upload/sign/{bucket}/{quote(path)}",
+            idempotent=False
+        )
+        signed_path = response.json()["url"]
+        token = parse_qs(urlparse(signed_path).query).get("token", [""])[0]
+        return {"signedURL": f"{self.url}/storage/v1{signed_path}", "token": token, "path": path}
+
+
+def _create_async_client(url: str, key: str):
+    if use_mock_supabase():
+        return MockAsyncSupabaseClient(url, key)
+    return AsyncSupabaseClient(url, key)
+
+
+@lru_cache()
+def get_async_supabase_client() -> AsyncSupabaseClient:
+    """Get async Supabase client with anon key"""
+    return _create_async_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+
+
+@lru_cache()
+def get_async_supabase_admin_client() -> AsyncSupabaseClient:
+    """Get async Supabase client with service role key (admin access)"""
+    return _create_async_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
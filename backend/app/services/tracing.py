@@ -0,0 +1,320 @@
+"""
+Tracing Service
+Lightweight in-process request tracing: spans for the auth dependency, SQL
+statements, provider calls and notification fan-out, with pluggable export
+
+A request is sampled when it starts (TRACING_SAMPLE_RATE, or the sampled
+flag of an incoming W3C traceparent header). Unsampled requests pay one
+context variable lookup per instrumented call.
+"""
+
+import abc
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import queue
+import random
+import re
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import QueueListener
+from typing import Callable, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.services.query_stats import statement_shape
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Trace:
+    """The spans of one sampled request"""
+
+    __slots__ = ("trace_id", "spans", "dropped")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self.dropped = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "dropped_spans": self.dropped,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+class Span:
+    """One timed operation; the root span of a trace is the request itself"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start", "_started", "duration_ms", "attributes", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: dict):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None):
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"[:300]
+
+    def to_dict(self) -> dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# ----- Exporters -----
+
+class SpanExporter(abc.ABC):
+    """Receives each finished trace; export() runs on the request path, so it must not block"""
+
+    @abc.abstractmethod
+    def export(self, trace: Trace):
+        """Hand off one finished trace"""
+
+    def shutdown(self):
+        pass
+
+
+class InMemoryExporter(SpanExporter):
+    """Keeps the most recent traces for local inspection (/health/traces in DEBUG)"""
+
+    def __init__(self, max_traces: int = settings.TRACING_MEMORY_TRACES):
+        self.traces: deque = deque(maxlen=max_traces)
+
+    def export(self, trace: Trace):
+        self.traces.append(trace)
+
+    def recent(self, limit: int = 20) -> List[dict]:
+        return [trace.to_dict() for trace in list(self.traces)[-limit:]]
+
+
+class _TraceFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.trace.to_dict(), default=str, separators=(",", ":"))
+
+
+class JsonFileExporter(SpanExporter):
+    """Appends one JSON trace per line to `path`; a background thread does the encoding and writing"""
+
+    def __init__(self, path: str = settings.TRACING_FILE):
+        handler = logging.FileHandler(path)
+        handler.setFormatter(_TraceFormatter())
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener = QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def export(self, trace: Trace):
+        self._queue.put_nowait(logging.makeLogRecord({"trace": trace}))
+
+    def shutdown(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+_exporter: Optional[SpanExporter] = None
+
+
+def _configured_exporter() -> Optional[SpanExporter]:
+    if settings.TRACING_EXPORTER == "memory":
+        return InMemoryExporter()
+    if settings.TRACING_EXPORTER == "file":
+        return JsonFileExporter()
+    return None
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    """The exporter finished traces go to (TRACING_EXPORTER: memory, file or none)"""
+    global _exporter
+    if _exporter is None:
+        _exporter = _configured_exporter()
+        if _exporter is not None:
+            atexit.register(_exporter.shutdown)
+    return _exporter
+
+
+def set_exporter(exporter: Optional[SpanExporter]):
+    """Send traces somewhere else (a custom exporter, or an in-memory one in tests)"""
+    global _exporter
+    if _exporter is not None:
+        _exporter.shutdown()
+    _exporter = exporter
+
+
+# ----- Spans -----
+
+def current_span() -> Optional[Span]:
+    """The innermost open span, or None when the request is not sampled"""
+    return _current_span.get()
+
+
+def start_span(name: str, **attributes) -> Optional[Span]:
+    """Open a child of the current span without making it current; None when not tracing"""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    trace = parent.trace
+    if len(trace.spans) >= settings.TRACING_MAX_SPANS:
+        trace.dropped += 1
+        return None
+    child = Span(trace, name, parent.span_id, attributes)
+    trace.spans.append(child)
+    return child
+
+
+def end_span(span: Optional[Span], error: Optional[BaseException] = None):
+    if span is not None:
+        span.end(error)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """Time the block as a child of the current span; nested spans become its children"""
+    child = start_span(name, **attributes)
+    if child is None:
+        yield None
+        return
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.end(exc)
+        raise
+    else:
+        child.end()
+    finally:
+        _current_span.reset(token)
+
+
+def traced(name: str) -> Callable:
+    """Decorator: run each call of a sync or async function in a span"""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def install_tracing(engine: Engine):
+    """A span for every statement run on `engine` while a sampled request is active"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _started(conn, cursor, statement, parameters, context, executemany):
+        if _current_span.get() is not None:
+            conn.info["trace_span"] = start_span(
+                "db.query", statement=statement_shape(statement)[:300], executemany=executemany
+            )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finished(conn, cursor, statement, parameters, context, executemany):
+        end_span(conn.info.pop("trace_span", None))
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        if context.connection is not None:
+            end_span(context.connection.info.pop("trace_span", None), context.original_exception)
+
+
+class TracingMiddleware:
+    """
+    Open the root span of sampled requests and export the trace when they finish
+
+    The trace id is put in the ASGI scope state for the access log, so a
+    slow request's log line leads to its trace.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id = parent_id = None
+        sampled = random.random() < settings.TRACING_SAMPLE_RATE
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                match = _TRACEPARENT.match(value.decode("latin-1"))
+                if match:
+                    trace_id, parent_id = match.group(1), match.group(2)
+                    sampled = int(match.group(3), 16) & 1 == 1
+                break
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(trace_id or uuid.uuid4().hex)
+        root = Span(trace, f"{scope['method']} {scope['path']}", parent_id, {"http.method": scope["method"]})
+        trace.spans.append(root)
+        scope.setdefault("state", {})["trace_id"] = trace.trace_id
+        status = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _current_span.set(root)
+        error = None
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            _current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{scope['method']} {route.path}"
+            root.set("http.status", status)
+            root.end(error)
+            exporter = get_exporter()
+            if exporter is not None:
+                try:
+                    exporter.export(trace)
+                except Exception as exc:
+                    logger.warning(f"Trace export failed: {exc}")
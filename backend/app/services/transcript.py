@@ -0,0 +1,215 @@
+"""
+Transcript Service
+Maintains the course result and term GPA rollups and reads transcripts from them
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Collection, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models import Course, CourseResult, TermGpa
+from app.services.grade_stats import letter_grade
+from app.services.gradebook import build_gradebook
+
+UNSCHEDULED_TERM = "Unscheduled"
+
+
+def course_term(semester: Optional[str], year: Optional[int]) -> str:
+    """Human-readable term key, e.g. "Fall 2025" """
+    term = " ".join(part for part in (semester, str(year) if year else None) if part)
+    return term or UNSCHEDULED_TERM
+
+
+def _quantize(value: float, places: str = "0.01") -> Decimal:
+    return Decimal(str(value)).quantize(Decimal(places), rounding=ROUND_HALF_UP)
+
+
+def refresh_course_results(
+    db: Session,
+    course_id: int,
+    student_ids: Optional[Collection[UUID]] = None,
+    commit: bool = True,
+    refresh_terms: bool = True
+) -> int:
+    """
+    Recompute final course grades for `student_ids` (default: everyone
+    enrolled) and the term GPAs they feed into
+
+    Called after grade writes with just the affected students, so the cost
+    is proportional to the change rather than the student's whole history.
+    Results of students who are no longer enrolled (removed or dropped)
+    are deleted. Returns the number of course results written.
+    """
+    course = db.execute(
+        select(Course.credits, Course.semester, Course.year).where(Course.id == course_id)
+    ).first()
+    if course is None:
+        return 0
+
+    term = course_term(course.semester, course.year)
+    gradebook = build_gradebook(db, course_id, student_ids)
+
+    rows = []
+    ungraded = []
+    for student in gradebook["students"]:
+        percentage = student["weighted_percentage"]
+        if percentage is None:
+            ungraded.append(student["student_id"])
+            continue
+        letter, points = letter_grade(percentage)
+        rows.append({
+            "student_id": student["student_id"],
+            "course_id": course_id,
+            "term": term,
+            "year": course.year,
+            "credits": course.credits,
+            "percentage": _quantize(percentage),
+            "letter_grade": letter,
+            "grade_points": _quantize(points),
+        })
+
+    if rows:
+        insert = dialect_insert(db, CourseResult)
+        db.execute(
+            insert.on_conflict_do_update(
+                index_elements=["student_id", "course_id"],
+                set_={
+                    column: insert.excluded[column]
+                    for column in ("term", "year", "credits", "percentage", "letter_grade", "grade_points")
+                } | {"updated_at": func.now()},
+            ),
+            rows,
+        )
+    # The gradebook only covers current enrollments; anyone else with a
+    # result here has been removed or dropped since it was written
+    enrolled = {student["student_id"] for student in gradebook["students"]}
+    existing = select(CourseResult.student_id).where(CourseResult.course_id == course_id)
+    if student_ids is not None:
+        existing = existing.where(CourseResult.student_id.in_(student_ids))
+    departed = [student_id for student_id in db.scalars(existing) if student_id not in enrolled]
+
+    removed = ungraded + departed
+    if removed:
+        db.execute(
+            delete(CourseResult).where(
+                CourseResult.course_id == course_id,
+                CourseResult.student_id.in_(removed)
+            )
+        )
+
+    if refresh_terms:
+        affected = [row["student_id"] for row in rows] + removed
+        refresh_term_gpas(db, affected, commit=False)
+
+    if commit:
+        db.commit()
+    return len(rows)
+
+
+def refresh_term_gpas(db: Session, student_ids: Collection[UUID], commit: bool = True):
+    """Rebuild the term GPA rollup rows of the given students from course_results"""
+    if not student_ids:
+        return
+
+    totals = db.execute(
+        select(
+            CourseResult.student_id,
+            CourseResult.term,
+            func.max(CourseResult.year),
+            func.sum(CourseResult.credits),
+            func.sum(CourseResult.credits * CourseResult.grade_points),
+        )
+        .where(CourseResult.student_id.in_(student_ids))
+        .group_by(CourseResult.student_id, CourseResult.term)
+    ).all()
+
+    rows = [
+        {
+            "student_id": student_id,
+            "term": term,
+            "year": year,
+            "credits": credits,
+            "quality_points": _quantize(quality_points),
+            "gpa": _quantize(quality_points / credits) if credits else Decimal("0.00"),
+        }
+        for student_id, term, year, credits, quality_points in totals
+    ]
+
+    # Terms a student no longer has results in
+    stale = delete(TermGpa).where(TermGpa.student_id.in_(student_ids))
+    if rows:
+        stale = stale.where(
+            tuple_(TermGpa.student_id, TermGpa.term).not_in(
+                [(row["student_id"], row["term"]) for row in rows]
+            )
+        )
+    db.execute(stale)
+
+    if rows:
+        insert = dialect_insert(db, TermGpa)
+        db.execute(
+            insert.on_conflict_do_update(
+                index_elements=["student_id", "term"],
+                set_={
+                    column: insert.excluded[column]
+                    for column in ("year", "credits", "quality_points", "gpa")
+                } | {"updated_at": func.now()},
+            ),
+            rows,
+        )
+
+    if commit:
+        db.commit()
+
+
+def get_transcript(db: Session, student_id: UUID) -> dict:
+    """Transcript from the rollups: two indexed reads, no grade scans"""
+    results = db.execute(
+        select(
+            CourseResult.course_id, Course.code, Course.name, CourseResult.term,
+            CourseResult.credits, CourseResult.percentage, CourseResult.letter_grade,
+            CourseResult.grade_points
+        )
+        .join(Course, Course.id == CourseResult.course_id)
+        .where(CourseResult.student_id == student_id)
+        .order_by(Course.code)
+    ).all()
+    terms = db.execute(
+        select(TermGpa.term, TermGpa.year, TermGpa.credits, TermGpa.quality_points, TermGpa.gpa)
+        .where(TermGpa.student_id == student_id)
+        .order_by(TermGpa.year.is_(None), TermGpa.year, TermGpa.term)
+    ).all()
+
+    courses_by_term = {}
+    for row in results:
+        courses_by_term.setdefault(row.term, []).append({
+            "course_id": row.course_id,
+            "code": row.code,
+            "name": row.name,
+            "credits": row.credits,
+            "percentage": float(row.percentage),
+            "letter_grade": row.letter_grade,
+            "grade_points": float(row.grade_points),
+        })
+
+    total_credits = sum(term.credits for term in terms)
+    total_quality = sum(term.quality_points for term in terms)
+
+    return {
+        "student_id": student_id,
+        "terms": [
+            {
+                "term": term.term,
+                "credits": term.credits,
+                "gpa": float(term.gpa),
+                "courses": courses_by_term.get(term.term, []),
+            }
+            for term in terms
+        ],
+        "total_credits": total_credits,
+        "cumulative_gpa": float(_quantize(total_quality / total_credits)) if total_credits else None,
+    }
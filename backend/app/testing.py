@@ -0,0 +1,39 @@
+"""
+Pytest plugin: SQL query budgets for endpoint tests
+
+Enable it with `pytest_plugins = ["app.testing"]` in conftest.py, and set
+SQL_REPEAT_LIMIT in the test environment to fail any request that repeats
+one statement shape (an N+1) too often.
+"""
+
+from contextlib import contextmanager
+from typing import Optional
+
+import pytest
+
+from app.services.query_stats import track_queries
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Context manager asserting how much SQL a block runs
+
+        def test_course_list(client, query_budget):
+            with query_budget(max_queries=3, repeat_limit=1):
+                client.get("/api/v1/courses/")
+    """
+    @contextmanager
+    def budget(max_queries: int, repeat_limit: Optional[int] = None):
+        with track_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"Query budget of {max_queries} exceeded: {stats.report()}"
+        )
+        shape, repeats = stats.most_repeated()
+        if repeat_limit is not None:
+            assert repeats <= repeat_limit, (
+                f"Statement repeated {repeats} times (limit {repeat_limit}): {shape}"
+            )
+
+    return budget
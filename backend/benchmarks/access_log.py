@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Access log benchmark
+
+Drives a trivial ASGI endpoint directly (no server, no socket) and reports
+the median per-request time the event loop spends with:
+
+  - no request logging
+  - the previous logging: BaseHTTPMiddleware with two f-string log lines
+    written synchronously to a file
+  - AccessLogMiddleware with the queue-backed JSON log, at sample rates
+    of 1.0 and 0.1
+
+For the queued cases it also reports the time until the background thread
+has written every record, so the work moved off the loop stays visible.
+
+    python benchmarks/access_log.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+from starlette.responses import PlainTextResponse  # noqa: E402
+
+from app.services import access_log  # noqa: E402
+from app.services.access_log import AccessLogMiddleware, setup_logging, shutdown_logging  # noqa: E402
+
+SCOPE = {
+    "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+    "scheme": "http", "path": "/api/v1/courses/", "raw_path": b"/api/v1/courses/", "query_string": b"",
+    "root_path": "", "headers": [(b"host", b"bench"), (b"accept", b"application/json")],
+    "client": ("10.0.0.1", 50000), "server": ("bench", 80),
+}
+
+
+async def endpoint(scope, receive, send):
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+def previous_logging(app, logger: logging.Logger):
+    """The request logging main.py used before the access log"""
+    async def log_requests(request, call_next):
+        start_time = time.time()
+        logger.info(f"Request: {request.method} {request.url.path}")
+        response = await call_next(request)
+        duration = time.time() - start_time
+        logger.info(f"Response: {response.status_code} - Duration: {duration:.3f}s")
+        return response
+
+    return BaseHTTPMiddleware(app, dispatch=log_requests)
+
+
+async def drive(app, requests: int) -> float:
+    """Seconds per request, sequential requests on one loop"""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def measure(app, requests: int, repeat: int) -> float:
+    return statistics.median(asyncio.run(drive(app, requests)) for _ in range(repeat))
+
+
+def drained() -> float:
+    """Seconds until the listener thread has written everything queued so far"""
+    started = time.perf_counter()
+    records = access_log._listener.queue
+    while not records.empty():
+        time.sleep(0.001)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    log_dir = tempfile.mkdtemp(prefix="access-log-bench-")
+    results = []
+
+    results.append(("no logging", measure(endpoint, args.requests, args.repeat), None))
+
+    previous = logging.getLogger("bench.previous")
+    previous.propagate = False
+    previous.setLevel(logging.INFO)
+    handler = logging.FileHandler(os.path.join(log_dir, "previous.log"))
+    handler.setFormatter(logging.Formatter(access_log.LOG_FORMAT))
+    previous.addHandler(handler)
+    results.append(("previous (sync)", measure(previous_logging(endpoint, previous), args.requests, args.repeat), None))
+    handler.close()
+
+    # setup_logging binds its handlers to the current stdout/stderr
+    streams = sys.stdout, sys.stderr
+    with open(os.path.join(log_dir, "access.log"), "w") as out:
+        sys.stdout = sys.stderr = out
+        setup_logging()
+        sys.stdout, sys.stderr = streams
+        for rate in (1.0, 0.1):
+            access_log.settings.ACCESS_LOG_SAMPLE_RATE = rate
+            per_request = measure(AccessLogMiddleware(endpoint), args.requests, args.repeat)
+            results.append((f"access log @ {rate}", per_request, drained()))
+        shutdown_logging()
+
+    baseline = results[0][1]
+    print(f"{args.requests} requests, median of {args.repeat}; logs in {log_dir}")
+    for label, per_request, drain in results:
+        line = f"{label:>20}: {per_request * 1e6:7.1f} us/request  (+{(per_request - baseline) * 1e6:6.1f} us)"
+        if drain is not None:
+            line += f"  writer drained {drain * 1000:6.1f} ms after the last request"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
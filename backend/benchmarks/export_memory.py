@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Export memory benchmark
+
+Seeds attendance rows into DATABASE_URL (use a scratch database) and
+compares peak Python memory (tracemalloc) of the JSON list response path
+with the streamed NDJSON and CSV exports, at growing row counts. Streamed
+peaks should stay flat while the list path grows with the row count.
+
+    DATABASE_URL=postgresql://... python benchmarks/export_memory.py --rows 50000 200000
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import delete, insert, select  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Attendance, Course, User  # noqa: E402
+from app.schemas import AttendanceResponse  # noqa: E402
+from app.services.export import schema_columns, iter_csv, iter_ndjson  # noqa: E402
+
+
+def seed(db, course_id: int, rows: int, batch: int = 10000):
+    students = [uuid.uuid4() for _ in range(200)]
+    db.execute(insert(User), [
+        {"id": student, "email": f"export-{student.hex[:12]}@example.edu", "name": "Export student", "role": "student"}
+        for student in students
+    ])
+    start = datetime.date(2020, 1, 1)
+    for offset in range(0, rows, batch):
+        db.execute(insert(Attendance), [
+            {
+                "course_id": course_id,
+                "student_id": students[i % len(students)],
+                "date": start + datetime.timedelta(days=i // len(students)),
+                "status": "present" if i % 7 else "absent",
+                "notes": None if i % 3 else "arrived after roll call",
+            }
+            for i in range(offset, min(offset + batch, rows))
+        ])
+    db.commit()
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20, elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[50000, 200000])
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    adapter = TypeAdapter(list[AttendanceResponse])
+
+    for rows in args.rows:
+        db = SessionLocal()
+        course_id = db.execute(
+            insert(Course).values(code=f"EXP-{uuid.uuid4().hex[:6]}", name="Export bench", credits=3)
+            .returning(Course.id)
+        ).scalar_one()
+        seed(db, course_id, rows)
+
+        statement = (
+            select(*schema_columns(Attendance, AttendanceResponse))
+            .where(Attendance.course_id == course_id)
+            .order_by(Attendance.date.desc())
+        )
+
+        def list_path():
+            records = db.query(Attendance).filter(Attendance.course_id == course_id).order_by(Attendance.date.desc()).all()
+            body = adapter.dump_json(records)
+            db.expunge_all()
+            return len(body)
+
+        results = {
+            "json list": measure(list_path),
+            "ndjson": measure(lambda: sum(len(chunk) for chunk in iter_ndjson(statement))),
+            "csv": measure(lambda: sum(len(chunk) for chunk in iter_csv(statement))),
+        }
+        for label, (peak, elapsed, size) in results.items():
+            print(f"{rows:>8} rows {label:>10}: peak {peak:7.1f} MiB  {elapsed:5.2f}s  {size / 2**20:6.1f} MiB out")
+
+        db.execute(delete(Attendance).where(Attendance.course_id == course_id))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
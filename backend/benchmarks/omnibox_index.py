@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Omnibox index benchmark
+
+Seeds announcements and assignments into DATABASE_URL (use a scratch
+database), then times a full index rebuild and a mix of queries as an admin.
+
+    DATABASE_URL=postgresql://... python benchmarks/omnibox_index.py --documents 100000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Announcement, Assignment, Course, User  # noqa: E402
+from app.services.omnibox import Omnibox  # noqa: E402
+
+COMMON = (
+    "algorithm analysis binary calculus database design essay experiment field graph history "
+    "integral journal kinetics lab lecture matrix network optics project quiz reading report "
+    "seminar statistics thermodynamics theory tree vector workshop"
+).split()
+
+# Zipf-distributed vocabulary so term selectivity resembles real text
+WORDS = COMMON + [f"term{i}" for i in range(20000)]
+WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, WEIGHTS, k=words))
+
+
+def seed(db, documents: int, batch: int = 5000):
+    rng = random.Random(7)
+    course_id = db.execute(
+        insert(Course).values(code=f"OMNI-{uuid.uuid4().hex[:6]}", name="Omnibox bench", credits=3)
+        .returning(Course.id)
+    ).scalar_one()
+    half = documents // 2
+    for start in range(0, half, batch):
+        count = min(batch, half - start)
+        db.execute(insert(Announcement), [
+            {"title": sentence(rng, 5), "content": sentence(rng, 60), "target_roles": ["student", "admin"]}
+            for _ in range(count)
+        ])
+        db.execute(insert(Assignment), [
+            {"course_id": course_id, "title": sentence(rng, 5), "description": sentence(rng, 40),
+             "instructions": sentence(rng, 20), "is_published": True}
+            for _ in range(count)
+        ])
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed(db, args.documents)
+        admin = User(id=uuid.uuid4(), email="omnibox-bench@example.edu", name="Bench", role="admin")
+
+        omnibox = Omnibox()
+        start = time.perf_counter()
+        omnibox.rebuild()
+        print(f"rebuild: {len(omnibox._index)} documents in {time.perf_counter() - start:.2f}s")
+
+        for term in ("algorithm", "binary tree", "lab rep", "stat", "term123", "term9 term1", "zzz"):
+            samples = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                omnibox.search(db, admin, term)
+                samples.append((time.perf_counter() - start) * 1000)
+            print(f"{term!r:>15}: p50 {statistics.median(samples):7.2f}ms  max {max(samples):7.2f}ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Read model benchmark
+
+Seeds attendance and notification rows into DATABASE_URL (use a scratch
+database) and fetches them three ways: mapped ORM instances, Core rows,
+and the slotted read models. For each it reports median CPU time to fetch
+and to fetch and serialize, Python memory (tracemalloc) per row at peak and
+retained by the result, and how many objects the session's identity map
+holds afterwards.
+
+    DATABASE_URL=postgresql://... python benchmarks/read_models.py --rows 10000
+"""
+
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import delete, insert  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Attendance, Course, Notification, User  # noqa: E402
+from app.schemas import AttendanceResponseList, NotificationResponseList  # noqa: E402
+from app.services.read_models import ATTENDANCE_ROWS, NOTIFICATION_ROWS  # noqa: E402
+from app.services.serialization import list_response  # noqa: E402
+
+TAG = uuid.uuid4().hex[:8]
+
+
+def seed(db, rows: int):
+    student = uuid.uuid4()
+    db.execute(insert(User), [{"id": student, "email": f"read-{TAG}@example.edu", "name": "Read bench", "role": "student"}])
+    course_id = db.execute(
+        insert(Course).values(code=f"READ-{TAG}", name="Read model bench", credits=3).returning(Course.id)
+    ).scalar_one()
+    start = datetime.date(2000, 1, 1)
+    db.execute(insert(Attendance), [
+        {
+            "course_id": course_id, "student_id": student, "date": start + datetime.timedelta(days=i),
+            "status": "present" if i % 7 else "absent", "notes": None if i % 3 else "left early",
+        }
+        for i in range(rows)
+    ])
+    db.execute(insert(Notification), [
+        {
+            "user_id": student, "title": "Assignment graded", "message": f"Submission {i} was graded",
+            "type": "grade", "reference_type": "assignment", "reference_id": i, "read": i % 2 == 0,
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+    return student, course_id
+
+
+def run(fn, repeat: int):
+    """Median CPU seconds over `repeat` runs; traced peak and retained bytes and identity map size of one run"""
+    samples = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        started = time.process_time()
+        fn(db)
+        samples.append(time.process_time() - started)
+        db.close()
+
+    db = SessionLocal()
+    tracemalloc.start()
+    result = fn(db)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    held = len(db.identity_map)
+    del result
+    db.close()
+    return statistics.median(samples), peak, retained, held
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    student, course_id = seed(db, args.rows)
+
+    cases = [
+        ("attendance", Attendance, Attendance.course_id == course_id, ATTENDANCE_ROWS, AttendanceResponseList),
+        ("notifications", Notification, Notification.user_id == student, NOTIFICATION_ROWS, NotificationResponseList),
+    ]
+
+    print(f"{args.rows} rows, median CPU of {args.repeat}")
+    try:
+        for name, model, where, read_model, adapter in cases:
+            fetchers = {
+                "orm": lambda session: session.query(model).filter(where).all(),
+                "core rows": lambda session: session.query(model).filter(where).with_entities(*read_model.columns).all(),
+                "read model": lambda session: read_model.fetch(session.query(model).filter(where)),
+            }
+            for label, fetch in fetchers.items():
+                fetch_cpu, peak, retained, held = run(fetch, args.repeat)
+                total_cpu, _, _, _ = run(lambda session: list_response(adapter, fetch(session)), args.repeat)
+                print(
+                    f"{name:>13} {label:>10}: fetch {fetch_cpu * 1000:7.1f} ms"
+                    f"  fetch+serialize {total_cpu * 1000:7.1f} ms"
+                    f"  peak {peak / args.rows:5.0f} B/row  retained {retained / args.rows:5.0f} B/row"
+                    f"  identity map {held:>6}"
+                )
+    finally:
+        db.execute(delete(Notification).where(Notification.user_id == student))
+        db.execute(delete(Attendance).where(Attendance.course_id == course_id))
+        db.execute(delete(Course).where(Course.id == course_id))
+        db.execute(delete(User).where(User.id == student))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Registration rush stress test
+
+Fires concurrent registrations for one course at DATABASE_URL (use a scratch
+database), then concurrently drops part of the class, and checks that the
+course is never overbooked and that freed seats go to the waitlist in order.
+Exits non-zero on any violation.
+
+    DATABASE_URL=postgresql://... python benchmarks/registration_stress.py --students 1000 --capacity 100
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Course, CourseEnrollment, CourseWaitlist, User  # noqa: E402
+from app.services.enrollment import register_student, release_seat  # noqa: E402
+
+
+def _register(course_id, student_id):
+    db = SessionLocal()
+    try:
+        return register_student(db, course_id, student_id)["status"]
+    finally:
+        db.close()
+
+
+def _drop(course_id, student_id):
+    db = SessionLocal()
+    try:
+        db.query(CourseEnrollment).filter(
+            CourseEnrollment.course_id == course_id,
+            CourseEnrollment.student_id == student_id
+        ).delete(synchronize_session=False)
+        db.commit()
+        return release_seat(db, course_id)
+    finally:
+        db.close()
+
+
+def check(db, course_id, capacity) -> bool:
+    seats_taken = db.scalar(select(Course.seats_taken).where(Course.id == course_id))
+    enrolled = db.scalar(select(func.count()).where(CourseEnrollment.course_id == course_id))
+    waitlisted = db.scalar(select(func.count()).where(CourseWaitlist.course_id == course_id))
+    ok = enrolled == seats_taken <= capacity
+    print(f"  enrolled={enrolled} seats_taken={seats_taken} capacity={capacity} waitlisted={waitlisted} -> {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--drops", type=int, default=25)
+    parser.add_argument("--threads", type=int, default=64)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    tag = uuid.uuid4().hex[:6]
+    student_ids = [uuid.uuid4() for _ in range(args.students)]
+
+    db = SessionLocal()
+    try:
+        db.execute(insert(User), [
+            {"id": student_id, "email": f"rush-{tag}-{i}@example.edu", "name": f"Student {i}", "role": "student"}
+            for i, student_id in enumerate(student_ids)
+        ])
+        course = Course(code=f"RUSH-{tag}", name="Registration rush", capacity=args.capacity)
+        db.add(course)
+        db.commit()
+        course_id = course.id
+
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            start = time.perf_counter()
+            outcomes = Counter(pool.map(lambda s: _register(course_id, s), student_ids))
+            elapsed = time.perf_counter() - start
+        print(f"{args.students} concurrent registrations in {elapsed:.2f}s: {dict(outcomes)}")
+        ok = check(db, course_id, args.capacity) and outcomes["enrolled"] == min(args.capacity, args.students)
+
+        head = list(db.scalars(
+            select(CourseWaitlist.student_id)
+            .where(CourseWaitlist.course_id == course_id)
+            .order_by(CourseWaitlist.id)
+            .limit(args.drops)
+        ))
+        enrolled = list(db.scalars(
+            select(CourseEnrollment.student_id).where(CourseEnrollment.course_id == course_id).limit(args.drops)
+        ))
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            promoted = [s for s in pool.map(lambda s: _drop(course_id, s), enrolled) if s]
+        print(f"{len(enrolled)} concurrent drops promoted {len(promoted)} waitlisted students")
+        ok = check(db, course_id, args.capacity) and ok
+        ok = ok and set(promoted) == set(head)
+    finally:
+        db.close()
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Search latency benchmark
+
+Seeds users and courses into DATABASE_URL (use a scratch database), then
+times a mix of type-ahead queries through the search service and reports
+p50/p95/max per query shape.
+
+    DATABASE_URL=postgresql://... python benchmarks/search_latency.py --users 200000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Course, User  # noqa: E402
+from app.services.search import create_search_indexes, search_courses, search_users  # noqa: E402
+
+FIRST = ["amelia", "bruno", "chen", "dmitri", "elena", "farah", "gustavo", "hana", "ivan", "jamal",
+         "keiko", "lucas", "maria", "nikhil", "olga", "priya", "quentin", "rosa", "samir", "tomas"]
+LAST = ["anderson", "bianchi", "costa", "dubois", "eriksen", "fischer", "garcia", "hoffmann", "ito",
+        "jensen", "kowalski", "larsen", "moreau", "nakamura", "okafor", "petrov", "quinn", "rossi"]
+
+
+def seed(db, users: int, courses: int, tag: str, batch: int = 10000):
+    rng = random.Random(42)
+    for start in range(0, users, batch):
+        db.execute(insert(User), [
+            {
+                "id": uuid.uuid4(),
+                "email": f"user{i}.{tag}@example.edu",
+                "name": f"{rng.choice(FIRST).title()} {rng.choice(LAST).title()}",
+                "role": "student" if i % 20 else "faculty",
+            }
+            for i in range(start, min(start + batch, users))
+        ])
+    db.execute(insert(Course), [
+        {"code": f"{tag[:3].upper()}{c:04d}", "name": f"{rng.choice(LAST).title()} Seminar {c}", "credits": 3}
+        for c in range(courses)
+    ])
+    db.commit()
+
+
+def timed(fn, runs: int):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1], samples[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    create_search_indexes(engine)
+    tag = uuid.uuid4().hex[:6]
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        seed(db, args.users, args.courses, tag)
+        print(f"seeded {args.users} users, {args.courses} courses in {time.perf_counter() - start:.1f}s")
+
+        cases = [
+            ("user prefix", lambda: search_users(db, "mar")),
+            ("user full name", lambda: search_users(db, "maria rossi")),
+            ("user email", lambda: search_users(db, f"user1234.{tag}")),
+            ("user + role", lambda: search_users(db, "ha", role="faculty")),
+            ("user no match", lambda: search_users(db, "zzzzqx")),
+            ("course code", lambda: search_courses(db, tag[:3])),
+            ("course name", lambda: search_courses(db, "seminar 12")),
+        ]
+        for label, fn in cases:
+            db.expunge_all()
+            p50, p95, worst = timed(fn, args.runs)
+            print(f"{label:>15}: p50 {p50:6.2f}ms  p95 {p95:6.2f}ms  max {worst:6.2f}ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
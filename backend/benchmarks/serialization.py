@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+List serialization benchmark
+
+Seeds rows for each list schema into DATABASE_URL (use a scratch database)
+and times one page through three paths:
+
+  response_model  ORM objects, validated and run through jsonable_encoder
+                  and the default JSON response class, as FastAPI does
+  adapter/orm     ORM objects through the prebuilt list adapter (list_response)
+  adapter/core    Core rows of the schema's columns through the same adapter
+
+Query and serialization time are reported separately, per page.
+
+    DATABASE_URL=postgresql://... python benchmarks/serialization.py --rows 1000 --repeat 20
+"""
+
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from sqlalchemy import delete, insert, select  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Announcement, Attendance, Course, Notification, User  # noqa: E402
+from app.schemas import (  # noqa: E402
+    AnnouncementResponse, AnnouncementResponseList, AttendanceResponse, AttendanceResponseList,
+    NotificationResponse, NotificationResponseList, UserResponse, UserResponseList
+)
+from app.services.serialization import (  # noqa: E402
+    ORJSON_AVAILABLE, DefaultJSONResponse, list_response, schema_columns
+)
+
+TAG = uuid.uuid4().hex[:8]
+NOW = datetime.datetime(2024, 9, 1, 9, 0)
+
+
+def seed(db, rows: int) -> dict:
+    """Insert `rows` of each benchmarked table; the WHERE clause selecting each set"""
+    users = [uuid.uuid4() for _ in range(rows)]
+    db.execute(insert(User), [
+        {
+            "id": user_id, "email": f"ser-{TAG}-{i}@example.edu", "name": f"Student {i}",
+            "role": "student", "department": "Computer Science", "phone": None,
+            "bio": "Second-year student" if i % 2 else None, "is_active": True,
+            "created_at": NOW, "updated_at": NOW,
+        }
+        for i, user_id in enumerate(users)
+    ])
+    course_id = db.execute(
+        insert(Course).values(code=f"SER-{TAG}", name="Serialization bench", credits=3).returning(Course.id)
+    ).scalar_one()
+    db.execute(insert(Attendance), [
+        {
+            "course_id": course_id, "student_id": user_id, "date": NOW.date(),
+            "status": "present" if i % 7 else "absent", "notes": None, "created_at": NOW,
+        }
+        for i, user_id in enumerate(users)
+    ])
+    db.execute(insert(Announcement), [
+        {
+            "title": f"{TAG} notice {i}", "content": "Lab hours move to the west building this week. " * 4,
+            "target_roles": ["student", "faculty"], "priority": "normal", "is_pinned": i % 10 == 0,
+            "created_at": NOW, "updated_at": NOW,
+        }
+        for i in range(rows)
+    ])
+    db.execute(insert(Notification), [
+        {
+            "user_id": users[0], "title": f"{TAG} graded", "message": "Your submission was graded",
+            "type": "grade", "reference_type": "assignment", "reference_id": i, "read": False,
+            "created_at": NOW,
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+    return {
+        User: User.email.like(f"ser-{TAG}-%"),
+        Attendance: Attendance.course_id == course_id,
+        Announcement: Announcement.title.like(f"{TAG} %"),
+        Notification: Notification.user_id == users[0],
+    }
+
+
+def cleanup(db, where: dict):
+    for model in (Notification, Announcement, Attendance, User):
+        db.execute(delete(model).where(where[model]))
+    db.execute(delete(Course).where(Course.code == f"SER-{TAG}"))
+    db.commit()
+
+
+def timed(fn, repeat: int):
+    """Median seconds of `fn` over `repeat` runs, and its last result"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    where = seed(db, args.rows)
+
+    cases = [
+        (User, UserResponse, UserResponseList),
+        (Attendance, AttendanceResponse, AttendanceResponseList),
+        (Announcement, AnnouncementResponse, AnnouncementResponseList),
+        (Notification, NotificationResponse, NotificationResponseList),
+    ]
+
+    print(f"{args.rows} rows per page, median of {args.repeat}; orjson {'on' if ORJSON_AVAILABLE else 'off'}")
+    try:
+        for model, schema, adapter in cases:
+            def fetch_orm():
+                db.expunge_all()
+                return db.query(model).filter(where[model]).all()
+
+            def fetch_core():
+                return db.execute(select(*schema_columns(model, schema)).where(where[model])).all()
+
+            def response_model_path(objects):
+                items = adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+                return DefaultJSONResponse(jsonable_encoder(items)).body
+
+            query_orm, objects = timed(fetch_orm, args.repeat)
+            query_core, rows = timed(fetch_core, args.repeat)
+            results = {
+                "response_model": (query_orm,) + timed(lambda: response_model_path(objects), args.repeat),
+                "adapter/orm": (query_orm,) + timed(lambda: list_response(adapter, objects).body, args.repeat),
+                "adapter/core": (query_core,) + timed(lambda: list_response(adapter, rows).body, args.repeat),
+            }
+            for label, (query, encode, body) in results.items():
+                print(
+                    f"{schema.__name__:>22} {label:>14}: query {query * 1000:7.2f} ms"
+                    f"  serialize {encode * 1000:7.2f} ms  total {(query + encode) * 1000:7.2f} ms"
+                    f"  {len(body) / 1024:6.0f} KiB"
+                )
+    finally:
+        db.rollback()
+        cleanup(db, where)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
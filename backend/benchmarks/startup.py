@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark
+
+Measures, each in a fresh interpreter:
+
+  - import time of app.main
+  - time from launching uvicorn until the first /health request succeeds
+    (import, lifespan startup and the first request together)
+
+Uses DATABASE_URL from the environment; point it at the database the
+service would use, since boot-time database work is part of what is
+measured.
+
+    DATABASE_URL=postgresql://... python benchmarks/startup.py --runs 5
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_seconds() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def first_request_seconds(timeout: float) -> float:
+    port = free_port()
+    # One client for all polls: creating one per poll costs enough CPU to skew the timing
+    client = httpx.Client(timeout=1.0)
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--no-access-log", "--log-level", "warning"],
+        cwd=BACKEND, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+            try:
+                if client.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.005)
+        raise RuntimeError(f"no response within {timeout}s")
+    finally:
+        client.close()
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    imports = [import_seconds() for _ in range(args.runs)]
+    first = [first_request_seconds(args.timeout) for _ in range(args.runs)]
+
+    print(f"median of {args.runs} runs")
+    print(f"  import app.main:        {statistics.median(imports) * 1000:7.0f} ms  (min {min(imports) * 1000:.0f})")
+    print(f"  launch to first request: {statistics.median(first) * 1000:7.0f} ms  (min {min(first) * 1000:.0f})")
+
+
+if __name__ == "__main__":
+    main()
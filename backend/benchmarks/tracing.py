@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tracing overhead benchmark
+
+Drives an ASGI endpoint that opens --spans child spans per request (about
+what a list endpoint's auth, SQL and provider calls produce) through
+TracingMiddleware, and reports the median per-request time without the
+middleware and at several sample rates, exporting to memory.
+
+    python benchmarks/tracing.py --requests 20000 --spans 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from starlette.responses import PlainTextResponse  # noqa: E402
+
+from app.services import tracing  # noqa: E402
+from app.services.tracing import InMemoryExporter, TracingMiddleware, end_span, set_exporter, span, start_span  # noqa: E402
+
+SCOPE = {
+    "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+    "scheme": "http", "path": "/api/v1/courses/", "raw_path": b"/api/v1/courses/", "query_string": b"",
+    "root_path": "", "headers": [(b"host", b"bench")], "client": ("10.0.0.1", 50000), "server": ("bench", 80),
+}
+
+
+def make_endpoint(spans: int):
+    async def endpoint(scope, receive, send):
+        with span("auth.get_current_user"):
+            for _ in range(spans - 1):
+                end_span(start_span("db.query", statement="SELECT 1"))
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    return endpoint
+
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(SCOPE), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def measure(app, requests: int, repeat: int) -> float:
+    return statistics.median(asyncio.run(drive(app, requests)) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--spans", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    endpoint = make_endpoint(args.spans)
+    set_exporter(InMemoryExporter())
+
+    results = [("no middleware", measure(endpoint, args.requests, args.repeat))]
+    for rate in (0.0, 0.01, 0.1, 1.0):
+        tracing.settings.TRACING_SAMPLE_RATE = rate
+        results.append((f"sample rate {rate}", measure(TracingMiddleware(endpoint), args.requests, args.repeat)))
+
+    baseline = results[0][1]
+    print(f"{args.requests} requests, {args.spans} spans each, median of {args.repeat}")
+    for label, per_request in results:
+        print(f"{label:>18}: {per_request * 1e6:7.1f} us/request  (+{(per_request - baseline) * 1e6:6.1f} us)")
+
+
+if __name__ == "__main__":
+    main()
@@ -44,6 +44,8 @@ CREATE TABLE IF NOT EXISTS courses (
     start_date DATE,
     end_date DATE,
     is_active BOOLEAN DEFAULT true,
+    capacity INTEGER CHECK (capacity >= 0),
+    seats_taken INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -58,6 +60,15 @@ CREATE TABLE IF NOT EXISTS course_enrollments (
     UNIQUE(course_id, student_id)
 );
 
+-- Course Waitlists (promoted in arrival order when a seat frees up)
+CREATE TABLE IF NOT EXISTS course_waitlists (
+    id SERIAL PRIMARY KEY,
+    course_id INTEGER NOT NULL REFERENCES courses(id) ON DELETE CASCADE,
+    student_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(course_id, student_id)
+);
+
 -- Assignments
 CREATE TABLE IF NOT EXISTS assignments (
     id SERIAL PRIMARY KEY,
@@ -67,11 +78,13 @@ CREATE TABLE IF NOT EXISTS assignments (
     instructions TEXT,
     due_date TIMESTAMP WITH TIME ZONE,
     max_points INTEGER DEFAULT 100,
+    weight DECIMAL(5,2) DEFAULT 1,
     file_url TEXT,
     allow_late_submission BOOLEAN DEFAULT false,
     late_penalty_percent INTEGER DEFAULT 0,
     created_by UUID REFERENCES users(id),
     is_published BOOLEAN DEFAULT false,
+    publish_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -88,12 +101,36 @@ CREATE TABLE IF NOT EXISTS submissions (
     submitted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     status VARCHAR(50) DEFAULT 'pending' CHECK (status IN ('pending', 'submitted', 'graded', 'late')),
     grade INTEGER,
+    days_late INTEGER DEFAULT 0,
+    effective_grade INTEGER,
     feedback TEXT,
     graded_by UUID REFERENCES users(id),
     graded_at TIMESTAMP WITH TIME ZONE,
     UNIQUE(assignment_id, student_id)
 );
 
+-- Assignment Extensions (per-student due date overrides)
+CREATE TABLE IF NOT EXISTS assignment_extensions (
+    id SERIAL PRIMARY KEY,
+    assignment_id INTEGER NOT NULL REFERENCES assignments(id) ON DELETE CASCADE,
+    student_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    due_date TIMESTAMP WITH TIME ZONE NOT NULL,
+    reason TEXT,
+    granted_by UUID REFERENCES users(id),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(assignment_id, student_id)
+);
+
+-- Assignment Reminders (due date reminders already sent)
+CREATE TABLE IF NOT EXISTS assignment_reminders (
+    id SERIAL PRIMARY KEY,
+    assignment_id INTEGER NOT NULL REFERENCES assignments(id) ON DELETE CASCADE,
+    student_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    lead_hours INTEGER NOT NULL,
+    sent_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(assignment_id, student_id, lead_hours)
+);
+
 -- Attendance
 CREATE TABLE IF NOT EXISTS attendance (
     id SERIAL PRIMARY KEY,
@@ -156,6 +193,34 @@ CREATE TABLE IF NOT EXISTS grades (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Course Results (final grade rollup, maintained on grade writes)
+CREATE TABLE IF NOT EXISTS course_results (
+    id SERIAL PRIMARY KEY,
+    student_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    course_id INTEGER NOT NULL REFERENCES courses(id) ON DELETE CASCADE,
+    term VARCHAR(100) NOT NULL,
+    year INTEGER,
+    credits INTEGER NOT NULL,
+    percentage DECIMAL(5,2) NOT NULL,
+    letter_grade VARCHAR(5) NOT NULL,
+    grade_points DECIMAL(3,2) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(student_id, course_id)
+);
+
+-- Term GPA rollup
+CREATE TABLE IF NOT EXISTS term_gpas (
+    id SERIAL PRIMARY KEY,
+    student_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    term VARCHAR(100) NOT NULL,
+    year INTEGER,
+    credits INTEGER NOT NULL,
+    quality_points DECIMAL(8,2) NOT NULL,
+    gpa DECIMAL(3,2) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(student_id, term)
+);
+
 -- Support Tickets
 CREATE TABLE IF NOT EXISTS support_tickets (
     id SERIAL PRIMARY KEY,
@@ -172,6 +237,46 @@ CREATE TABLE IF NOT EXISTS support_tickets (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Scheduled Jobs (persisted schedule of background jobs)
+CREATE TABLE IF NOT EXISTS scheduled_jobs (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) UNIQUE NOT NULL,
+    interval_seconds INTEGER NOT NULL,
+    next_run_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    last_run_at TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    enabled BOOLEAN DEFAULT true
+);
+
+-- Scheduler Leases (leader election between API workers)
+CREATE TABLE IF NOT EXISTS scheduler_leases (
+    name VARCHAR(100) PRIMARY KEY,
+    holder VARCHAR(255) NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Columns added after the initial release (for existing databases)
+ALTER TABLE assignments ADD COLUMN IF NOT EXISTS weight DECIMAL(5,2) DEFAULT 1;
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS capacity INTEGER CHECK (capacity >= 0);
+-- seats_taken is backfilled only in the run that adds it; afterwards the
+-- enrollment service maintains it and a re-run must not touch live counts
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'courses' AND column_name = 'seats_taken'
+    ) THEN
+        ALTER TABLE courses ADD COLUMN seats_taken INTEGER NOT NULL DEFAULT 0;
+        UPDATE courses SET seats_taken = (
+            SELECT COUNT(*) FROM course_enrollments e
+            WHERE e.course_id = courses.id AND e.status <> 'dropped'
+        );
+    END IF;
+END $$;
+ALTER TABLE assignments ADD COLUMN IF NOT EXISTS publish_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS days_late INTEGER DEFAULT 0;
+ALTER TABLE submissions ADD COLUMN IF NOT EXISTS effective_grade INTEGER;
+
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
 CREATE INDEX IF NOT EXISTS idx_users_department ON users(department);
@@ -181,6 +286,7 @@ CREATE INDEX IF NOT EXISTS idx_enrollments_student ON course_enrollments(student
 CREATE INDEX IF NOT EXISTS idx_enrollments_course ON course_enrollments(course_id);
 CREATE INDEX IF NOT EXISTS idx_assignments_course ON assignments(course_id);
 CREATE INDEX IF NOT EXISTS idx_assignments_due_date ON assignments(due_date);
+CREATE INDEX IF NOT EXISTS idx_assignments_publish_at ON assignments(publish_at) WHERE is_published = false;
 CREATE INDEX IF NOT EXISTS idx_submissions_student ON submissions(student_id);
 CREATE INDEX IF NOT EXISTS idx_submissions_assignment ON submissions(assignment_id);
 CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date);
@@ -191,6 +297,14 @@ CREATE INDEX IF NOT EXISTS idx_notifications_created ON notifications(created_at
 CREATE INDEX IF NOT EXISTS idx_announcements_target ON announcements(target_roles);
 CREATE INDEX IF NOT EXISTS idx_grades_student ON grades(student_id);
 CREATE INDEX IF NOT EXISTS idx_grades_course ON grades(course_id);
+CREATE INDEX IF NOT EXISTS idx_course_results_student ON course_results(student_id);
+CREATE INDEX IF NOT EXISTS idx_term_gpas_student ON term_gpas(student_id);
+CREATE INDEX IF NOT EXISTS idx_grades_course_assignment ON grades(course_id, assignment_id, student_id);
+
+-- Trigram indexes for ranked user/course search (app/services/search.py)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_users_search_trgm ON users USING gin (lower(name || ' ' || email) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_courses_search_trgm ON courses USING gin (lower(code || ' ' || name) gin_trgm_ops);
 
 -- Row Level Security (RLS) Policies
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,49 @@
+"""
+Conditional GET: ETags and 304 responses
+"""
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_current_user
+from app.main import app
+from app.models import User
+
+
+@pytest.fixture
+def client_as(db):
+    """A test client authenticated as whichever user is passed to login()"""
+    current = {}
+    app.dependency_overrides[get_current_user] = lambda: current["user"]
+
+    def login(name: str) -> TestClient:
+        user = User(id=uuid.uuid4(), email=f"{name}@example.edu", name=name, role="student", is_active=True)
+        db.add(user)
+        db.commit()
+        current["user"] = user
+        return client
+
+    client = TestClient(app)
+    yield login
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+def test_unchanged_notifications_answer_304(client_as):
+    client = client_as("alice")
+    first = client.get("/api/v1/notifications/")
+    assert first.status_code == 200
+
+    again = client.get("/api/v1/notifications/", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+
+
+@pytest.mark.parametrize("path", ["/api/v1/notifications/", "/api/v1/assignments/"])
+def test_users_with_identical_data_get_different_etags(client_as, path):
+    """Two users with no rows have the same counts and timestamps, but must not share a validator"""
+    alice_etag = client_as("alice").get(path).headers["ETag"]
+
+    bob = client_as("bob")
+    assert bob.get(path).headers["ETag"] != alice_etag
+    assert bob.get(path, headers={"If-None-Match": alice_etag}).status_code == 200
@@ -0,0 +1,111 @@
+"""
+Seat allocation and waitlist promotion
+"""
+
+import uuid
+
+from sqlalchemy import delete, select
+
+from app.models import Course, CourseEnrollment, CourseWaitlist, User
+from app.services import enrollment
+from app.services.enrollment import register_student, release_seat
+
+
+def _student(db, name: str) -> uuid.UUID:
+    student = User(id=uuid.uuid4(), email=f"{name}@example.edu", name=name, role="student", is_active=True)
+    db.add(student)
+    db.commit()
+    return student.id
+
+
+def _course(db, capacity: int) -> int:
+    course = Course(code=f"C-{uuid.uuid4().hex[:6]}", name="Seats", credits=3, capacity=capacity)
+    db.add(course)
+    db.commit()
+    return course.id
+
+
+def _status(db, course_id: int, student_id: uuid.UUID):
+    return db.scalar(
+        select(CourseEnrollment.status).where(
+            CourseEnrollment.course_id == course_id, CourseEnrollment.student_id == student_id
+        )
+    )
+
+
+def test_register_takes_seat_then_waitlists(db):
+    course_id = _course(db, capacity=1)
+    first, second = _student(db, "first"), _student(db, "second")
+
+    assert register_student(db, course_id, first)["status"] == "enrolled"
+    result = register_student(db, course_id, second)
+
+    assert result == {"status": "waitlisted", "waitlist_position": 1}
+    assert db.scalar(select(Course.seats_taken).where(Course.id == course_id)) == 1
+
+
+def test_dropped_student_on_waitlist_is_promoted_when_seat_frees(db):
+    course_id = _course(db, capacity=1)
+    returning, holder = _student(db, "returning"), _student(db, "holder")
+
+    # Enrolled, then dropped: the row stays behind without holding a seat
+    assert register_student(db, course_id, returning)["status"] == "enrolled"
+    db.query(CourseEnrollment).filter(CourseEnrollment.student_id == returning).update({"status": "dropped"})
+    db.query(Course).filter(Course.id == course_id).update({"seats_taken": 0})
+    db.commit()
+
+    assert register_student(db, course_id, holder)["status"] == "enrolled"
+    assert register_student(db, course_id, returning)["status"] == "waitlisted"
+
+    # The holder leaves (as unenroll_student does) and the seat is passed on
+    db.execute(delete(CourseEnrollment).where(CourseEnrollment.student_id == holder))
+    db.commit()
+    promoted = release_seat(db, course_id)
+
+    assert promoted == returning
+    assert _status(db, course_id, returning) == "active"
+    assert db.scalar(select(Course.seats_taken).where(Course.id == course_id)) == 1
+    assert db.scalar(select(CourseWaitlist.id).where(CourseWaitlist.course_id == course_id)) is None
+
+
+def test_release_seat_without_waitlist_frees_it(db):
+    course_id = _course(db, capacity=1)
+    student = _student(db, "only")
+    register_student(db, course_id, student)
+
+    db.execute(delete(CourseEnrollment).where(CourseEnrollment.student_id == student))
+    db.commit()
+
+    assert release_seat(db, course_id) is None
+    assert db.scalar(select(Course.seats_taken).where(Course.id == course_id)) == 0
+
+
+def test_seat_released_while_registering_is_not_lost(db, monkeypatch):
+    """A release between the failed seat grab and the waitlist insert still reaches the new entry"""
+    course_id = _course(db, capacity=1)
+    holder, late = _student(db, "holder"), _student(db, "late")
+    register_student(db, course_id, holder)
+
+    take_seat = enrollment._take_seat
+    interleaved = []
+
+    def take_seat_then_release(session, course):
+        taken = take_seat(session, course)
+        if not taken and not interleaved:
+            # The holder drops in the gap: the waitlist is still empty, so the seat goes back to the pool
+            interleaved.append(True)
+            session.rollback()
+            session.execute(delete(CourseEnrollment).where(CourseEnrollment.student_id == holder))
+            session.commit()
+            assert release_seat(session, course) is None
+        return taken
+
+    monkeypatch.setattr(enrollment, "_take_seat", take_seat_then_release)
+    result = register_student(db, course_id, late)
+
+    assert interleaved
+    assert result["status"] == "enrolled"
+    assert result["enrollment_id"] is not None
+    assert _status(db, course_id, late) == "active"
+    assert db.scalar(select(Course.seats_taken).where(Course.id == course_id)) == 1
+    assert db.scalar(select(CourseWaitlist.id).where(CourseWaitlist.course_id == course_id)) is None
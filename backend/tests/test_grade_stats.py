@@ -0,0 +1,86 @@
+"""
+Course and assignment grade statistics
+"""
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_current_user
+from app.main import app
+from app.models import Assignment, Course, CourseEnrollment, Grade, Submission, User
+from app.services import grade_stats
+from app.services.grade_stats import course_statistics
+from app.services.gradebook import build_gradebook
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    """Ids repeat across tests, so cached statistics must not carry over"""
+    monkeypatch.setattr(grade_stats, "_cache", grade_stats._StatsCache())
+
+
+def _graded_course(db):
+    """
+    Two enrolled students and one who dropped
+
+    The essay has a submission overridden by a Grade row, and a dropped
+    student's submission; the exam only has a Grade row.
+    """
+    course = Course(code="S-101", name="Stats", credits=3, semester="Fall", year=2025)
+    students = [
+        User(id=uuid.uuid4(), email=f"stats{i}@example.edu", name=f"Stats {i}", role="student", is_active=True)
+        for i in range(3)
+    ]
+    db.add_all([course, *students])
+    db.flush()
+    essay = Assignment(course_id=course.id, title="Essay", max_points=100, is_published=True)
+    exam = Assignment(course_id=course.id, title="Exam", max_points=50, is_published=True)
+    db.add_all([essay, exam])
+    db.flush()
+    db.add_all([
+        CourseEnrollment(course_id=course.id, student_id=students[0].id, status="active"),
+        CourseEnrollment(course_id=course.id, student_id=students[1].id, status="active"),
+        CourseEnrollment(course_id=course.id, student_id=students[2].id, status="dropped"),
+        Submission(assignment_id=essay.id, student_id=students[0].id, grade=60, status="graded"),
+        Submission(assignment_id=essay.id, student_id=students[2].id, grade=10, status="graded"),
+        Grade(student_id=students[0].id, course_id=course.id, assignment_id=essay.id,
+              grade_type="regrade", points=80, max_points=100),
+        Grade(student_id=students[1].id, course_id=course.id, assignment_id=exam.id,
+              grade_type="exam", points=45, max_points=50),
+    ])
+    db.commit()
+    return course.id, essay.id, exam.id
+
+
+def test_course_statistics_match_the_gradebook(db):
+    """Recorded Grade rows count, and override the submission grade for the same assignment"""
+    course_id, essay_id, exam_id = _graded_course(db)
+
+    stats = course_statistics(db, course_id)
+    expected = sorted(s["weighted_percentage"] for s in build_gradebook(db, course_id)["students"])
+
+    assert stats["students"]["count"] == 2
+    assert [stats["students"]["min"], stats["students"]["max"]] == expected == [80.0, 90.0]
+    assert [(a["assignment_id"], a["count"], a["mean"]) for a in stats["assignments"]] == [
+        (essay_id, 1, 80.0), (exam_id, 1, 45.0)
+    ]
+
+
+def test_assignment_statistics_match_course_statistics(db):
+    course_id, essay_id, exam_id = _graded_course(db)
+    admin = User(id=uuid.uuid4(), email="registrar@example.edu", name="Registrar", role="admin", is_active=True)
+    db.add(admin)
+    db.commit()
+
+    app.dependency_overrides[get_current_user] = lambda: admin
+    try:
+        client = TestClient(app)
+        course = client.get(f"/api/v1/courses/{course_id}/grade-statistics").json()
+        assignments = [client.get(f"/api/v1/assignments/{a}/statistics").json() for a in (essay_id, exam_id)]
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    assert assignments == course["assignments"]
+    assert assignments[0]["mean"] == 80.0  # override applied, dropped student left out
@@ -0,0 +1,37 @@
+"""
+Bulk grading
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.models import Assignment, Course, CourseEnrollment, Submission, User
+from app.schemas import BulkGradeItem
+from app.services.grading import apply_bulk_grades
+
+
+def test_bulk_grades_report_the_late_penalised_grade(db):
+    """Students are notified of the grade they will see, not the raw one"""
+    due = datetime.now(timezone.utc) - timedelta(days=5)
+    student = User(id=uuid.uuid4(), email="late@example.edu", name="Late", role="student", is_active=True)
+    grader = User(id=uuid.uuid4(), email="grader@example.edu", name="Grader", role="faculty", is_active=True)
+    course = Course(code="G-101", name="Grading", credits=3, semester="Fall", year=2025)
+    db.add_all([student, grader, course])
+    db.flush()
+    assignment = Assignment(
+        course_id=course.id, title="Essay", max_points=100, due_date=due,
+        late_penalty_percent=10, is_published=True
+    )
+    db.add(assignment)
+    db.flush()
+    db.add_all([
+        CourseEnrollment(course_id=course.id, student_id=student.id, status="active"),
+        Submission(assignment_id=assignment.id, student_id=student.id, status="late",
+                   submitted_at=due + timedelta(days=1, hours=12)),
+    ])
+    db.commit()
+
+    graded, errors = apply_bulk_grades(db, assignment, [(1, BulkGradeItem(student_id=student.id, grade=90))], grader.id)
+
+    assert errors == []
+    assert graded == [(student.id, 72)]  # two started days late at 10% a day
@@ -0,0 +1,98 @@
+"""
+Bulk user provisioning against the mock auth client
+"""
+
+import asyncio
+import uuid
+
+from sqlalchemy import select
+
+from app.models import User
+from app.services.provisioning import provision_users
+from app.services.resilience import ProviderError
+from app.services.supabase import MockAsyncSupabaseClient
+
+
+class FlakyAuthClient(MockAsyncSupabaseClient):
+    """The mock client, with the provider failing for chosen emails"""
+
+    def __init__(self, failing=()):
+        super().__init__("http://auth.test", "service-key")
+        self.failing = set(failing)
+
+    async def create_user(self, email, password=None, user_metadata=None, email_confirm=True):
+        if email in self.failing:
+            raise ProviderError("auth.admin.create_user", 503, "unavailable")
+        return await super().create_user(email, password, user_metadata, email_confirm)
+
+
+def _provision(db, client, rows, chunk_size=500):
+    async def records():
+        for line, record in enumerate(rows, start=2):
+            yield line, record
+
+    return asyncio.run(provision_users(db, records(), client=client, chunk_size=chunk_size))
+
+
+def _statuses(result):
+    return [(row["email"], row["status"]) for row in result["rows"]]
+
+
+def test_created_existing_invalid_and_failed_rows(db):
+    db.add(User(id=uuid.uuid4(), email="known@example.edu", name="Known", role="student", is_active=True))
+    db.commit()
+    client = FlakyAuthClient(failing={"down@example.edu"})
+
+    result = _provision(db, client, [
+        {"email": "new@example.edu", "name": "New", "role": "faculty"},
+        {"email": "Known@example.edu", "name": "Known"},
+        {"email": "not-an-email", "name": "Broken"},
+        {"email": "admin@example.edu", "name": "Admin", "role": "admin"},
+        {"email": "down@example.edu", "name": "Down"},
+    ])
+
+    assert {key: result[key] for key in ("created", "existing", "invalid", "failed")} == {
+        "created": 1, "existing": 1, "invalid": 2, "failed": 1
+    }
+    assert _statuses(result) == [
+        ("new@example.edu", "created"),
+        ("Known@example.edu", "existing"),
+        ("not-an-email", "invalid"),
+        ("admin@example.edu", "invalid"),
+        ("down@example.edu", "failed"),
+    ]
+    created = db.scalars(select(User).where(User.email == "new@example.edu")).one()
+    assert (created.role, str(created.id)) == ("faculty", client.users["new@example.edu"]["id"])
+    assert db.scalar(select(User.id).where(User.email == "down@example.edu")) is None
+
+
+def test_duplicate_emails_within_a_file(db):
+    """Only the first row of an email is provisioned, across chunk boundaries too"""
+    result = _provision(db, FlakyAuthClient(), [
+        {"email": "twice@example.edu", "name": "First"},
+        {"email": "other@example.edu", "name": "Other"},
+        {"email": "TWICE@example.edu", "name": "Second"},
+    ], chunk_size=2)
+
+    assert _statuses(result) == [
+        ("twice@example.edu", "created"),
+        ("other@example.edu", "created"),
+        ("TWICE@example.edu", "invalid"),
+    ]
+    assert result["rows"][2]["detail"] == "Duplicate email in file"
+
+
+def test_rerun_adopts_auth_user_from_interrupted_run(db):
+    """The provider already has the account (email_exists) but the User row was never written"""
+    client = FlakyAuthClient()
+    orphan = asyncio.run(client.create_user("orphan@example.edu", user_metadata={"name": "Orphan"}))
+    rows = [{"email": "orphan@example.edu", "name": "Orphan"}]
+
+    result = _provision(db, client, rows)
+
+    assert _statuses(result) == [("orphan@example.edu", "created")]
+    assert str(result["rows"][0]["user_id"]) == orphan["id"]
+    assert str(db.scalar(select(User.id).where(User.email == "orphan@example.edu"))) == orphan["id"]
+
+    # Running the file again changes nothing
+    assert _statuses(_provision(db, client, rows)) == [("orphan@example.edu", "existing")]
@@ -0,0 +1,84 @@
+"""
+SQL query budgets and the N+1 detector
+"""
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.dependencies import get_current_user
+from app.main import app
+from app.models import Course, CourseEnrollment, User
+from app.services import query_stats
+from app.services.catalog import invalidate_catalog
+from app.services.query_stats import RepeatedQueryError, track_queries
+
+
+@pytest.fixture
+def client(db):
+    """A client signed in as a student, with an empty catalog cache"""
+    user = User(id=uuid.uuid4(), email="budget@example.edu", name="Budget", role="student", is_active=True)
+    db.add(user)
+    db.commit()
+    invalidate_catalog()
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_current_user, None)
+    invalidate_catalog()
+
+
+def _courses_with_rosters(db, courses: int, students: int):
+    faculty = User(id=uuid.uuid4(), email="teacher@example.edu", name="Teacher", role="faculty", is_active=True)
+    roster = [
+        User(id=uuid.uuid4(), email=f"roster{i}@example.edu", name=f"Roster {i}", role="student", is_active=True)
+        for i in range(students)
+    ]
+    db.add_all([faculty, *roster])
+    db.flush()
+    for index in range(courses):
+        course = Course(code=f"Q-{index}", name=f"Queries {index}", credits=3, faculty_id=faculty.id, is_active=True)
+        db.add(course)
+        db.flush()
+        db.add_all([CourseEnrollment(course_id=course.id, student_id=s.id, status="active") for s in roster])
+    db.commit()
+
+
+def test_course_list_query_budget(db, client, query_budget):
+    """The list is one statement however many courses and enrollments it shows"""
+    _courses_with_rosters(db, courses=10, students=5)
+
+    with query_budget(max_queries=1, repeat_limit=1):
+        response = client.get("/api/v1/courses/")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 10
+
+
+def test_query_budget_flags_repeated_statement_shape(db, query_budget):
+    """Per-row lookups share one shape whatever the parameters, and fail the repeat limit"""
+    _courses_with_rosters(db, courses=3, students=1)
+    course_ids = db.scalars(select(Course.id)).all()
+
+    with pytest.raises(AssertionError, match="repeated 3 times"):
+        with query_budget(max_queries=10, repeat_limit=1):
+            for course_id in course_ids:
+                db.scalar(select(Course.name).where(Course.id == course_id))
+
+
+def test_repeat_limit_fails_the_request(db, client, monkeypatch):
+    """With SQL_REPEAT_LIMIT set, the middleware raises as soon as a shape repeats too often"""
+    _courses_with_rosters(db, courses=2, students=1)
+    monkeypatch.setattr(query_stats.settings, "SQL_REPEAT_LIMIT", 0)
+
+    with pytest.raises(RepeatedQueryError, match="likely an N\\+1"):
+        client.get("/api/v1/courses/")
+
+
+def test_in_lists_of_any_length_share_a_shape():
+    with track_queries() as stats:
+        stats.record("SELECT * FROM courses WHERE id IN (?, ?)", 0.001)
+        stats.record("SELECT *\n  FROM courses WHERE id IN (?, ?, ?, ?)", 0.001)
+
+    assert stats.most_repeated() == ("SELECT * FROM courses WHERE id IN (?)", 2)
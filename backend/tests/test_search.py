@@ -0,0 +1,38 @@
+"""
+Search query shape
+"""
+
+import re
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects import postgresql
+
+from app.database import engine
+from app.services.search import _COURSES, _POSTGRES_DDL, _USERS, _backend, create_search_indexes, init_search
+
+
+@pytest.mark.parametrize("index", [_USERS, _COURSES], ids=lambda index: index.table)
+def test_trigram_expression_matches_index(index):
+    """PostgreSQL only uses the GIN index when the query repeats its expression exactly"""
+    compiled = str(index.expression.compile(dialect=postgresql.dialect()))
+    ddl = next(statement for statement in _POSTGRES_DDL if f" ON {index.table} " in statement)
+    indexed = re.search(r"gin \((.*) gin_trgm_ops\)", ddl).group(1)
+
+    assert compiled.replace(f"{index.table}.", "") == indexed
+
+
+def test_startup_check_does_not_create_fts_tables(db):
+    """init_search only looks for the FTS tables; init-db creates them"""
+    init_search(engine)
+    assert _backend(db) == "like"
+    assert "users_fts" not in inspect(engine).get_table_names()
+
+    try:
+        create_search_indexes(engine)
+        assert _backend(db) == "fts"
+    finally:
+        with engine.begin() as conn:
+            for index in (_USERS, _COURSES):
+                conn.execute(text(f"DROP TABLE IF EXISTS {index.fts_table}"))
+        init_search(engine)
@@ -0,0 +1,28 @@
+"""
+Supabase client selection
+"""
+
+import pytest
+
+from app.services import supabase
+from app.services.supabase import AsyncSupabaseClient, MockAsyncSupabaseClient, MockSupabaseClient
+
+
+@pytest.mark.parametrize("url, mock", [("", False), ("https://project.supabase.co", True)])
+def test_mock_clients_when_unconfigured_or_requested(monkeypatch, url, mock):
+    monkeypatch.setattr(supabase.settings, "SUPABASE_URL", url)
+    monkeypatch.setattr(supabase.settings, "SUPABASE_MOCK", mock)
+
+    assert isinstance(supabase._create_async_client(url, "key"), MockAsyncSupabaseClient)
+    assert isinstance(supabase._create_client(url, "key"), MockSupabaseClient)
+
+
+def test_real_async_client_when_configured(monkeypatch):
+    """The async client needs no SDK, so a configured project is always used"""
+    monkeypatch.setattr(supabase.settings, "SUPABASE_URL", "https://project.supabase.co")
+    monkeypatch.setattr(supabase.settings, "SUPABASE_MOCK", False)
+    monkeypatch.setattr(supabase, "SUPABASE_AVAILABLE", False)
+
+    assert type(supabase._create_async_client(supabase.settings.SUPABASE_URL, "key")) is AsyncSupabaseClient
+    with pytest.raises(RuntimeError):
+        supabase._create_client(supabase.settings.SUPABASE_URL, "key")
@@ -0,0 +1,20 @@
+"""
+Request tracing
+"""
+
+import pytest
+
+from app.services.tracing import InMemoryExporter, SpanExporter
+
+
+def test_exporter_without_export_fails_when_built():
+    class Incomplete(SpanExporter):
+        def shutdown(self):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_builtin_exporters_are_complete():
+    assert isinstance(InMemoryExporter(), SpanExporter)
@@ -0,0 +1,85 @@
+"""
+Course result and term GPA rollups
+"""
+
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, func, select
+
+from app.dependencies import get_current_user
+from app.main import app
+from app.models import Assignment, Course, CourseEnrollment, CourseResult, Grade, TermGpa, User
+from app.services.transcript import refresh_course_results
+
+
+def _graded_enrollment(db):
+    student = User(id=uuid.uuid4(), email="graded@example.edu", name="Graded", role="student", is_active=True)
+    course = Course(code="T-101", name="Rollups", credits=3, semester="Fall", year=2025)
+    db.add_all([student, course])
+    db.flush()
+    assignment = Assignment(course_id=course.id, title="Final", max_points=100, is_published=True)
+    db.add(assignment)
+    db.flush()
+    db.add_all([
+        CourseEnrollment(course_id=course.id, student_id=student.id, status="active"),
+        Grade(student_id=student.id, course_id=course.id, assignment_id=assignment.id,
+              grade_type="final", points=85, max_points=100),
+    ])
+    db.commit()
+    return student.id, course.id
+
+
+def _counts(db, student_id):
+    results = db.scalar(select(func.count()).where(CourseResult.student_id == student_id))
+    terms = db.scalar(select(func.count()).where(TermGpa.student_id == student_id))
+    return results, terms
+
+
+def test_results_follow_grades(db):
+    student_id, course_id = _graded_enrollment(db)
+
+    assert refresh_course_results(db, course_id) == 1
+    assert _counts(db, student_id) == (1, 1)
+
+
+def test_unenrolled_student_result_is_removed(db):
+    student_id, course_id = _graded_enrollment(db)
+    refresh_course_results(db, course_id)
+
+    db.execute(delete(CourseEnrollment).where(CourseEnrollment.student_id == student_id))
+    db.commit()
+    refresh_course_results(db, course_id, [student_id])
+
+    assert _counts(db, student_id) == (0, 0)
+
+
+def test_dropped_student_result_is_removed_on_full_recompute(db):
+    student_id, course_id = _graded_enrollment(db)
+    refresh_course_results(db, course_id)
+
+    db.query(CourseEnrollment).filter(CourseEnrollment.student_id == student_id).update({"status": "dropped"})
+    db.commit()
+    refresh_course_results(db, course_id)
+
+    assert _counts(db, student_id) == (0, 0)
+
+
+def test_course_term_change_moves_results_and_gpas(db):
+    student_id, course_id = _graded_enrollment(db)
+    refresh_course_results(db, course_id)
+    admin = User(id=uuid.uuid4(), email="registrar@example.edu", name="Registrar", role="admin", is_active=True)
+    db.add(admin)
+    db.commit()
+
+    app.dependency_overrides[get_current_user] = lambda: admin
+    try:
+        response = TestClient(app).put(f"/api/v1/courses/{course_id}", json={"semester": "Spring", "year": 2026, "credits": 4})
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    assert response.status_code == 200
+    db.expire_all()
+    result = db.scalars(select(CourseResult).where(CourseResult.student_id == student_id)).one()
+    assert (result.term, result.year, result.credits) == ("Spring 2026", 2026, 4)
+    assert db.scalars(select(TermGpa.term).where(TermGpa.student_id == student_id)).all() == ["Spring 2026"]